@@ -0,0 +1,117 @@
+"""
+JWT authentication that avoids a ``User`` SELECT on every request.
+
+The user columns in ``CACHED_FIELDS`` are kept in the shared Django cache,
+keyed by user id and by a per-user version. Saving or deleting a user bumps
+the version, right away and again once the transaction commits, so every
+process stops seeing the old values together: a deactivated or demoted user
+loses access on their next request. Building the key from the version also
+means that a reader racing a save cannot put stale values back under the
+current key. Bulk ``QuerySet.update()`` calls on users bypass the signals
+and must call ``user_cache.invalidate`` themselves.
+
+``request.user`` is a real ``User`` instance built from those columns with
+the others deferred, so it can be assigned to foreign keys and compared like
+any user. Callers may rely on ``CACHED_FIELDS`` without a query. Reading
+any other field (``password``, ``last_login``, ``last_active``,
+``updated_at``) costs a query per field, so views that need them should
+fetch the user explicitly.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from config.cache import invalidate_tags, tag_versions
+
+User = get_user_model()
+
+# Everything but the credentials and the columns that change on their own
+# (sign-ins, activity, saves).
+CACHED_FIELDS = (
+    "id",
+    "email",
+    "phone",
+    "first_name",
+    "last_name",
+    "is_active",
+    "is_alumni",
+    "is_staff",
+    "is_superuser",
+    "is_staff_member",
+    "is_admin",
+    "date_joined",
+    "created_at",
+)
+
+
+class UserCache:
+    """``CACHED_FIELDS`` values per user id, in the shared cache."""
+
+    key_prefix = "auth:user:"
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+    def tag(self, user_id):
+        return f"auth-user:{user_id}"
+
+    def get(self, user_id):
+        user_id = str(user_id)
+        (version,) = tag_versions([self.tag(user_id)])
+        key = f"{self.key_prefix}{user_id}:{version}"
+        values = cache.get(key)
+        if values is None:
+            values = (
+                User._default_manager.filter(pk=user_id).values(*CACHED_FIELDS).first()
+            )
+            if values is None:
+                return None
+            cache.set(key, values, self.ttl)
+        return values
+
+    def invalidate(self, user_id):
+        tag = self.tag(user_id)
+        invalidate_tags(tag)
+        # Again after commit, in case a request read the old row meanwhile.
+        transaction.on_commit(lambda: invalidate_tags(tag))
+
+
+user_cache = UserCache(ttl=getattr(settings, "AUTH_USER_CACHE_TTL", 60 * 15))
+
+_loaded_fields = [
+    field.attname
+    for field in User._meta.concrete_fields
+    if field.attname in CACHED_FIELDS
+]
+
+
+def build_user(values):
+    """A ``User`` with only ``CACHED_FIELDS`` loaded; the rest are deferred."""
+    return User.from_db(
+        DEFAULT_DB_ALIAS, _loaded_fields, [values[name] for name in _loaded_fields]
+    )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Revocation compares against the password hash, which is not cached.
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        values = user_cache.get(user_id)
+        if values is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not values["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return build_user(values)
@@ -1,15 +1,92 @@
+import hashlib
+import re
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
-from django.db.models import Q
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+from django.db import transaction
 
 UserModel = get_user_model()
 
+PHONE_RE = re.compile(r"^\d{10}$")
+
+
+class NegativeCache:
+    """Identifiers known not to match any user, in the shared cache.
+
+    Every process sees the same entries, so ``discard`` on signup lets the
+    new user sign in everywhere at once. It deletes the entry right away and
+    again once the transaction commits, in case a failed login added it back
+    meanwhile.
+    """
+
+    key_prefix = "auth:unknown:"
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+    def key(self, lookup):
+        field, value = lookup
+        # Hashed: identifiers may hold characters some cache backends refuse.
+        digest = hashlib.sha256(value.encode()).hexdigest()
+        return f"{self.key_prefix}{field}:{digest}"
+
+    def __contains__(self, lookup):
+        return cache.get(self.key(lookup)) is not None
+
+    def add(self, lookup):
+        cache.set(self.key(lookup), 1, self.ttl)
+
+    def discard(self, lookup):
+        key = self.key(lookup)
+        cache.delete(key)
+        transaction.on_commit(lambda: cache.delete(key))
+
+
+unknown_identifiers = NegativeCache(getattr(settings, "AUTH_NEGATIVE_CACHE_TTL", 60))
+
+_dummy_hash = None
+
+
+def dummy_hash():
+    # Hashed lazily with the default hasher so a failed lookup costs the same
+    # as a real password check.
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = make_password("dummy-password")
+    return _dummy_hash
+
+
+def identifier_lookup(username):
+    """Route an identifier to the single indexed column it can match."""
+    if "@" in username:
+        return "email", UserModel.objects.normalize_email(username)
+    if PHONE_RE.match(username):
+        return "phone", username
+    return None
+
 
 class EmailOrPhoneBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            user = UserModel.objects.get(Q(email=username) | Q(phone=username))
-        except UserModel.DoesNotExist:
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        user = None
+        lookup = identifier_lookup(username.strip())
+        if lookup is not None and lookup not in unknown_identifiers:
+            field, value = lookup
+            try:
+                user = UserModel._default_manager.get(**{field: value})
+            except UserModel.DoesNotExist:
+                unknown_identifiers.add(lookup)
+
+        if user is None:
+            # Run the hasher anyway so timing does not reveal unknown accounts.
+            check_password(password, dummy_hash())
             return None
 
         if user.check_password(password) and self.user_can_authenticate(user):
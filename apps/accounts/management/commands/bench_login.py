@@ -0,0 +1,70 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure /api/token/ throughput under concurrent load for valid logins, "
+        "wrong passwords and unknown identifiers. Benchmark users are removed "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--users", type=int, default=20)
+
+    def handle(self, *args, **options):
+        # Throttling would otherwise cap the run at the anonymous rate limit.
+        self.view = TokenObtainPairView.as_view(throttle_classes=[])
+        self.factory = APIRequestFactory()
+        tag = uuid.uuid4().hex[:8]
+        password = "bench-password-1"
+
+        users = [
+            User.objects.create_user(
+                email=f"bench-login-{tag}-{n}@example.invalid",
+                password=password,
+                is_active=True,
+            )
+            for n in range(options["users"])
+        ]
+        try:
+            scenarios = {
+                "valid": lambda n: (users[n % len(users)].email, password),
+                "wrong password": lambda n: (users[n % len(users)].email, "nope"),
+                "unknown email": lambda n: (f"nobody-{n % 50}@example.invalid", "x"),
+                "unknown phone": lambda n: (f"{9000000000 + n % 50}", "x"),
+            }
+            for name, credentials in scenarios.items():
+                rate, statuses = self.run(credentials, **options)
+                self.stdout.write(f"{name:15} {rate:8.1f} req/s  statuses={statuses}")
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def run(self, credentials, requests, concurrency, **options):
+        def login(n):
+            email, password = credentials(n)
+            request = self.factory.post(
+                "/api/token/", {"email": email, "password": password}, format="json"
+            )
+            try:
+                return self.view(request).status_code
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            codes = list(pool.map(login, range(requests)))
+        elapsed = time.perf_counter() - started
+        statuses = {code: codes.count(code) for code in sorted(set(codes))}
+        return requests / elapsed, statuses
@@ -0,0 +1,130 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import viewsets
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.accounts.models import UserProfile
+from apps.accounts.views import UserViewSet
+from apps.jobs.models import Company, JobApplication, JobPosting
+from apps.jobs.views import JobApplicationViewSet
+
+User = get_user_model()
+
+
+class FullUserViewSet(UserViewSet):
+    list = viewsets.ModelViewSet.list
+
+
+class FullJobApplicationViewSet(JobApplicationViewSet):
+    list = viewsets.ModelViewSet.list
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure rows/s served by /api/accounts/users/ and job application "
+        "lists with the full nested serializers, the default row projection "
+        "and a narrow ?fields= projection. Seed data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        self.factory = APIRequestFactory()
+        try:
+            with transaction.atomic():
+                viewer = self.seed(options["rows"])
+                self.report(viewer, **options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def report(self, viewer, page_size, repeat, **options):
+        cases = [
+            ("users", "/api/accounts/users/", FullUserViewSet, UserViewSet, "id,email"),
+            (
+                "applications",
+                "/api/applications/",
+                FullJobApplicationViewSet,
+                JobApplicationViewSet,
+                "id,status,applied_at",
+            ),
+        ]
+        for name, path, full, slim, narrow in cases:
+            modes = [
+                ("full serializer", full, {}),
+                ("row serializer", slim, {}),
+                ("?fields= rows", slim, {"fields": narrow}),
+            ]
+            for mode, viewset, params in modes:
+                rate = self.measure(viewer, path, viewset, params, page_size, repeat)
+                self.stdout.write(f"{name:13} {mode:16} {rate:10.1f} rows/s")
+
+    def measure(self, viewer, path, viewset, params, page_size, repeat):
+        view = viewset.as_view({"get": "list"}, throttle_classes=[])
+        params = {"page_size": page_size, "skip_count": "true", **params}
+        rows = 0
+        started = time.perf_counter()
+        for page in range(1, repeat + 1):
+            request = self.factory.get(path, {**params, "page": page})
+            force_authenticate(request, user=viewer)
+            response = view(request)
+            response.render()
+            rows += len(response.data["results"])
+        return rows / (time.perf_counter() - started)
+
+    def seed(self, count):
+        tag = uuid.uuid4().hex[:8]
+        password = make_password(None)
+        users = User.objects.bulk_create(
+            User(
+                email=f"bench-serializers-{tag}-{n}@example.invalid",
+                first_name="Bench",
+                last_name=str(n),
+                password=password,
+                is_active=True,
+            )
+            for n in range(count)
+        )
+        UserProfile.objects.bulk_create(
+            UserProfile(
+                user=user,
+                location="Kathmandu",
+                graduation_year=2000 + n % 25,
+                degree="BSc",
+                major="Computer Science",
+                current_company="Bench Co",
+            )
+            for n, user in enumerate(users)
+            if n % 2 == 0
+        )
+        company = Company.objects.create(name=f"Bench {tag}")
+        job = JobPosting.objects.create(
+            title="Benchmark engineer",
+            company=company,
+            posted_by=users[0],
+            description="Benchmark posting.",
+            requirements="None.",
+            location="Kathmandu",
+            job_type="full_time",
+            experience_level="mid",
+            expires_at=timezone.now() + timedelta(days=30),
+        )
+        JobApplication.objects.bulk_create(
+            JobApplication(job=job, applicant=user, cover_letter="Hello.")
+            for user in users
+        )
+        return users[0]
@@ -0,0 +1,73 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.test.utils import override_settings
+
+from apps.accounts.models import UserProfile
+
+User = get_user_model()
+
+
+def eager_profile(sender, instance, created, **kwargs):
+    # The receiver removed in favour of lazy profiles, kept here for comparison.
+    if created:
+        UserProfile.objects.create(user=instance)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare signup throughput with eagerly created profiles (the old "
+        "post_save receiver) against lazily materialised ones. All writes are "
+        "rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument(
+            "--real-hasher",
+            action="store_true",
+            help="Keep the configured password hasher instead of a fast one, "
+            "which otherwise dominates the timing.",
+        )
+
+    def handle(self, *args, **options):
+        hashers = settings.PASSWORD_HASHERS
+        if not options["real_hasher"]:
+            hashers = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+        with override_settings(PASSWORD_HASHERS=hashers):
+            eager = self.measure(options["users"], eager=True)
+            lazy = self.measure(options["users"], eager=False)
+
+        self.stdout.write(f"eager profile: {eager:10.1f} signups/s")
+        self.stdout.write(f"lazy profile:  {lazy:10.1f} signups/s")
+        self.stdout.write(self.style.SUCCESS(f"speedup:       {lazy / eager:10.2f}x"))
+
+    def measure(self, count, eager):
+        if eager:
+            post_save.connect(eager_profile, sender=User, dispatch_uid="bench_eager")
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                for n in range(count):
+                    User.objects.create_user(
+                        email=f"bench-signup-{n}@example.invalid",
+                        password="bench-password",
+                        first_name="Bench",
+                        last_name=str(n),
+                    )
+                elapsed = time.perf_counter() - started
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            post_save.disconnect(sender=User, dispatch_uid="bench_eager")
+        return count / elapsed
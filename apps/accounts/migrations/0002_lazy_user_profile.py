@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:30
+
+import apps.accounts.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='user',
+            field=apps.accounts.models.ProfileOneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -2,9 +2,8 @@ import uuid
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.core.validators import RegexValidator
 from django.db import models, IntegrityError
+from django.db.models.fields.related_descriptors import ReverseOneToOneDescriptor
 from django.conf import settings
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 
 
 class CustomUserManager(BaseUserManager):
@@ -92,8 +91,38 @@ class User(AbstractUser):
         ]
 
 
+class DefaultProfileDescriptor(ReverseOneToOneDescriptor):
+    """
+    ``user.profile`` falls back to an unsaved, all-defaults ``UserProfile``
+    instead of raising when the row does not exist yet. The fallback is cached
+    on the user, so edits to it stick and saving it creates the row.
+    """
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        try:
+            return super().__get__(instance, cls)
+        except self.RelatedObjectDoesNotExist:
+            return self.related.related_model(user=instance)
+
+
+class ProfileOneToOneField(models.OneToOneField):
+    related_accessor_class = DefaultProfileDescriptor
+
+
+class UserProfileManager(models.Manager):
+    def materialize(self, user):
+        """Return ``user``'s profile, creating its row on first use."""
+        profile = user.profile
+        if profile.pk is None:
+            profile, _ = self.get_or_create(user=user)
+            user.profile = profile
+        return profile
+
+
 class UserProfile(models.Model):
-    user = models.OneToOneField(
+    user = ProfileOneToOneField(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="profile"
     )
     avatar = models.ImageField(upload_to="avatars/", null=True, blank=True)
@@ -128,6 +157,8 @@ class UserProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = UserProfileManager()
+
     def __str__(self):
         return f"{self.user.get_full_name()} - Profile"
 
@@ -140,9 +171,3 @@ class UserProfile(models.Model):
         ]
         verbose_name = "User Profile"
         verbose_name_plural = "User Profiles"
-
-
-@receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        UserProfile.objects.create(user=instance)
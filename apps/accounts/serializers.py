@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from apps.accounts.models import UserProfile
+from config.serializers import FieldsProjectionMixin, RowSerializer, file_url
 
 User = get_user_model()
 
@@ -12,7 +13,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ["user"]
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(FieldsProjectionMixin, serializers.ModelSerializer):
     profile = UserProfileSerializer(read_only=True)
     password = serializers.CharField(write_only=True, min_length=8)
 
@@ -43,3 +44,59 @@ class UserSerializer(serializers.ModelSerializer):
             instance.set_password(password)
         instance.save()
         return instance
+
+
+PROFILE_FIELDS = [
+    field.name
+    for field in UserProfile._meta.concrete_fields
+    if field.name not in UserProfileSerializer.Meta.exclude
+]
+
+
+class UserRowSerializer(RowSerializer):
+    """Read-only user list rows, in the shape ``UserSerializer`` gives them.
+
+    A user whose profile row was never saved gets the defaults the detail
+    endpoint shows for it, not nulls.
+    """
+
+    fields = {
+        "id": "id",
+        "first_name": "first_name",
+        "last_name": "last_name",
+        "email": "email",
+        "phone": "phone",
+        "is_active": "is_active",
+        "is_alumni": "is_alumni",
+        "is_staff_member": "is_staff_member",
+        "is_admin": "is_admin",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+        "last_active": "last_active",
+        "profile": {
+            # The profile's user is the row's user, with or without a profile row.
+            "user": "id",
+            **{
+                name: f"profile__{name}"
+                for name in PROFILE_FIELDS
+                if name != "user"
+            },
+        },
+    }
+    # Contact details are not listed to anonymous callers.
+    private_fields = ("email", "phone")
+
+    def to_representation(self, row):
+        data = super().to_representation(row)
+        profile = data.get("profile")
+        if profile is not None:
+            for name, value in profile.items():
+                field = UserProfile._meta.get_field(name)
+                if value is None and not field.null:
+                    profile[name] = field.get_default()
+            profile["avatar"] = file_url(
+                UserProfile._meta.get_field("avatar"),
+                profile["avatar"],
+                self.context.get("request"),
+            )
+        return data
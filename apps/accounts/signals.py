@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.accounts.authentication import user_cache
+from apps.accounts.backends import unknown_identifiers
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_unknown_identifiers(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {"email", "phone"} & set(update_fields):
+        return
+    unknown_identifiers.discard(("email", instance.email))
+    if instance.phone:
+        unknown_identifiers.discard(("phone", instance.phone))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
@@ -1,3 +1,171 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+import orjson
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.authentication import CachedJWTAuthentication
+from apps.accounts.backends import (
+    EmailOrPhoneBackend,
+    NegativeCache,
+    unknown_identifiers,
+)
+from apps.accounts.models import UserProfile
+from apps.accounts.views import UserViewSet
+
+User = get_user_model()
+
+USERS_URL = "/api/accounts/users/"
+
+
+def make_user(email, phone, **fields):
+    return User.objects.create_user(
+        email=email, password="x", is_active=True, phone=phone, **fields
+    )
+
+
+def api_client(user=None):
+    client = APIClient()
+    if user is not None:
+        client.force_authenticate(user)
+    return client
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class UserListPrivacyTests(TestCase):
+    def setUp(self):
+        self.member = make_user("member@example.com", "555-0100")
+        self.staff = make_user("staff@example.com", "555-0101", is_staff=True)
+
+    def test_anonymous_list_omits_contact_details(self):
+        response = api_client().get(USERS_URL)
+        self.assertEqual(response.status_code, 200)
+        for row in response.data["results"]:
+            self.assertNotIn("email", row)
+
+    def test_anonymous_cannot_project_contact_details(self):
+        response = api_client().get(USERS_URL, {"fields": "id,email,phone"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_member_sees_contact_details(self):
+        response = api_client(self.member).get(USERS_URL, {"fields": "id,email"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("email", response.data["results"][0])
+
+    def test_stream_requires_staff(self):
+        for user in (None, self.member):
+            response = api_client(user).get(USERS_URL, {"stream": "true"})
+            self.assertIn(response.status_code, (401, 403))
+
+    def test_staff_can_stream(self):
+        response = api_client(self.staff).get(
+            USERS_URL, {"stream": "true", "fields": "id,email"}
+        )
+        self.assertEqual(response.status_code, 200)
+        rows = orjson.loads(b"".join(response.streaming_content))
+        self.assertEqual(
+            {row["email"] for row in rows}, {"member@example.com", "staff@example.com"}
+        )
+
+    def test_stream_is_bounded(self):
+        with mock.patch.object(UserViewSet, "stream_max_rows", 1):
+            response = api_client(self.staff).get(USERS_URL, {"stream": "true"})
+            rows = orjson.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(rows), 1)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class UserListShapeTests(TestCase):
+    def setUp(self):
+        self.member = make_user("member@example.com", "555-0100")
+        self.alumnus = make_user("alumnus@example.com", "555-0102")
+        profile = UserProfile.objects.materialize(self.alumnus)
+        profile.location = "Kathmandu"
+        profile.mentor_skills = ["Rust"]
+        profile.save()
+        self.client = api_client(self.member)
+
+    def test_rows_match_the_detail_endpoint(self):
+        rows = self.client.get(USERS_URL).json()["results"]
+        self.assertEqual(len(rows), 2)
+        for row in rows:
+            detail = self.client.get(f"{USERS_URL}{row['id']}/").json()
+            self.assertEqual(row, detail)
+        without_profile = next(row for row in rows if row["id"] == str(self.member.pk))
+        self.assertEqual(without_profile["profile"]["location"], "")
+        self.assertEqual(without_profile["profile"]["mentor_skills"], [])
+
+    def test_fields_narrow_the_rows(self):
+        rows = self.client.get(USERS_URL, {"fields": "id,profile"}).json()["results"]
+        self.assertEqual({tuple(row) for row in rows}, {("id", "profile")})
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = make_user("member@example.com", "5550000001", first_name="Ada")
+        self.token = AccessToken.for_user(self.user)
+
+    def authenticate(self):
+        return CachedJWTAuthentication().get_user(self.token)
+
+    def test_cached_fields_need_no_query(self):
+        self.authenticate()
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+            self.assertEqual(
+                (user.pk, user.email, user.first_name, user.is_staff),
+                (self.user.pk, "member@example.com", "Ada", False),
+            )
+
+    def test_deactivation_applies_to_the_next_request(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_demotion_applies_to_the_next_request(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.assertTrue(self.authenticate().is_staff)
+        self.user.is_staff = False
+        self.user.save(update_fields=["is_staff"])
+        self.assertFalse(self.authenticate().is_staff)
+
+    def test_deleted_user_is_rejected(self):
+        self.authenticate()
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+
+class NegativeCacheTests(TestCase):
+    email = "newcomer@example.com"
+
+    def setUp(self):
+        cache.clear()
+
+    def log_in(self):
+        return EmailOrPhoneBackend().authenticate(
+            None, username=self.email, password="x"
+        )
+
+    def test_unknown_identifier_skips_the_database(self):
+        self.assertIsNone(self.log_in())
+        self.assertIn(("email", self.email), unknown_identifiers)
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.log_in())
+
+    def test_signup_clears_the_entry_for_every_process(self):
+        # Another worker's view of the same cache.
+        elsewhere = NegativeCache(ttl=60)
+        self.assertIsNone(self.log_in())
+        self.assertIn(("email", self.email), elsewhere)
+        with self.captureOnCommitCallbacks(execute=True):
+            user = make_user(self.email, "5550000002")
+        self.assertNotIn(("email", self.email), elsewhere)
+        self.assertEqual(self.log_in(), user)
@@ -1,17 +1,25 @@
 from rest_framework import viewsets, permissions
 from django.contrib.auth import get_user_model
 from apps.accounts.models import UserProfile
-from apps.accounts.serializers import UserSerializer, UserProfileSerializer
+from apps.accounts.serializers import (
+    UserProfileSerializer,
+    UserRowSerializer,
+    UserSerializer,
+)
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from config.serializers import ProjectedListMixin
 
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+class UserViewSet(ProjectedListMixin, viewsets.ModelViewSet):
+    queryset = User.objects.select_related("profile").order_by("-created_at", "-pk")
     serializer_class = UserSerializer
+    row_serializer_class = UserRowSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    # A full dump of the user table is for staff only.
+    stream_permission_classes = [permissions.IsAdminUser]
 
     @action(
         detail=False,
@@ -20,7 +28,9 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated],
     )
     def me(self, request):
-        serializer = self.get_serializer(request.user)
+        # request.user only carries the cached auth columns; load the full row.
+        user = self.get_queryset().get(pk=request.user.pk)
+        serializer = self.get_serializer(user)
         return Response(serializer.data)
 
 
@@ -34,11 +44,19 @@ class UserProfileViewSet(viewsets.ModelViewSet):
 
     @action(
         detail=False,
-        methods=["get"],
+        methods=["get", "put", "patch"],
         url_path="me",
         permission_classes=[permissions.IsAuthenticated],
     )
     def my_profile(self, request):
-        profile = request.user.profile
-        serializer = self.get_serializer(profile)
+        # Profiles are created lazily; the first visit or write materialises one.
+        profile = UserProfile.objects.materialize(request.user)
+        if request.method == "GET":
+            serializer = self.get_serializer(profile)
+        else:
+            serializer = self.get_serializer(
+                profile, data=request.data, partial=request.method == "PATCH"
+            )
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
         return Response(serializer.data)
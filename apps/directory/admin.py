@@ -1,7 +1,19 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.translation import gettext_lazy as _
 
-from apps.directory.models import AlumniConnection, AlumniProfile
+from apps.directory.models import AlumniConnection, AlumniImport, AlumniProfile
+
+
+class AlumniImportForm(forms.Form):
+    file = forms.FileField(help_text=_("CSV with a header row, or NDJSON."))
+    format = forms.ChoiceField(choices=[("csv", "CSV"), ("ndjson", "NDJSON")])
+    activate = forms.BooleanField(
+        required=False, help_text=_("Mark imported users as active.")
+    )
 
 
 @admin.register(AlumniProfile)
@@ -45,10 +57,86 @@ class AlumniProfileAdmin(admin.ModelAdmin):
     )
     readonly_fields = ("created_at", "updated_at")
 
+    change_list_template = "admin/directory/alumniprofile/change_list.html"
+
     @admin.display(description="User Email")
     def user_email(self, obj):
         return getattr(obj.user, "email", "-")
 
+    def get_urls(self):
+        return [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name="directory_alumniprofile_import",
+            ),
+            *super().get_urls(),
+        ]
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            return redirect("admin:directory_alumniprofile_changelist")
+
+        form = AlumniImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            # Hashing and inserting a large file takes far longer than a
+            # request may; the process_alumni_imports worker runs it.
+            queued = AlumniImport.objects.create(
+                file=form.cleaned_data["file"],
+                format=form.cleaned_data["format"],
+                activate=form.cleaned_data["activate"],
+                requested_by=request.user,
+            )
+            messages.success(
+                request,
+                _("Import queued; its progress is listed under Alumni Imports."),
+            )
+            return redirect("admin:directory_alumniimport_change", queued.pk)
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "form": form,
+            "title": _("Import alumni"),
+        }
+        return TemplateResponse(
+            request, "admin/directory/alumniprofile/import.html", context
+        )
+
+
+@admin.register(AlumniImport)
+class AlumniImportAdmin(admin.ModelAdmin):
+    list_display = (
+        "created_at",
+        "requested_by",
+        "status",
+        "created_count",
+        "rejected_count",
+        "finished_at",
+    )
+    list_filter = ("status",)
+    fields = (
+        "file",
+        "format",
+        "activate",
+        "requested_by",
+        "status",
+        "created_count",
+        "rejected_count",
+        "errors",
+        "created_at",
+        "started_at",
+        "finished_at",
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        # Uploaded through the "Import alumni" view on Alumni Profiles.
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("requested_by")
+
 
 @admin.register(AlumniConnection)
 class AlumniConnectionAdmin(admin.ModelAdmin):
@@ -0,0 +1,309 @@
+"""
+In-memory index of accepted ``AlumniConnection`` edges.
+
+User UUIDs are interned to dense integers and the undirected adjacency is
+held in CSR form: ``offsets[n]:offsets[n + 1]`` slices ``targets`` to give the
+sorted neighbours of node ``n``. Saves made after the build land in small
+per-node overlays (``added``/``removed``) and are folded back into the CSR
+arrays once the overlay grows past ``compact_threshold``.
+
+Readers take no lock. The arrays and their overlays live in one
+``Adjacency`` whose arrays are never modified; compaction builds a new one
+and publishes it with a single attribute assignment, so a reader never pairs
+new offsets with old targets.
+
+Each worker process keeps its own copy. Once it is older than
+``DIRECTORY_GRAPH_MAX_AGE`` seconds ``get_graph`` rebuilds it in a background
+thread, still serving the old copy meanwhile, so that edges written by other
+processes eventually show up. Edges this process applies while a build's
+query runs are recorded and replayed onto the new copy before it replaces
+the old one.
+"""
+
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict, deque
+
+from django.conf import settings
+from django.db import connection
+
+from apps.directory.models import AlumniConnection
+
+
+class Adjacency:
+    """CSR arrays, and the overlays of edges changed since they were built."""
+
+    def __init__(self, offsets, targets):
+        self.offsets = offsets
+        self.targets = targets
+        self.added = defaultdict(set)
+        self.removed = defaultdict(set)
+        self.overlay_size = 0
+
+    def base_neighbours(self, node):
+        if node + 1 >= len(self.offsets):
+            return ()
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+    def has_base_edge(self, a, b):
+        row = self.base_neighbours(a)
+        position = bisect_left(row, b)
+        return position < len(row) and row[position] == b
+
+    def neighbours(self, node):
+        result = set(self.base_neighbours(node))
+        removed = self.removed.get(node)
+        if removed:
+            result -= removed
+        added = self.added.get(node)
+        if added:
+            result |= added
+        return result
+
+
+class ConnectionGraph:
+    compact_threshold = 10_000
+
+    def __init__(self):
+        self.index = {}
+        self.ids = []
+        self.adjacency = Adjacency(array("l", [0]), array("l"))
+        self.lock = threading.RLock()
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def from_edges(cls, edges):
+        graph = cls()
+        pairs = array("l")
+        for a, b in edges:
+            if a != b:
+                pairs.append(graph.intern(a))
+                pairs.append(graph.intern(b))
+        graph.load(pairs)
+        return graph
+
+    @classmethod
+    def from_database(cls):
+        edges = (
+            AlumniConnection.objects.filter(status="accepted")
+            .values_list("requester_id", "receiver_id")
+            .iterator(chunk_size=10_000)
+        )
+        return cls.from_edges(edges)
+
+    def intern(self, user_id):
+        node = self.index.get(user_id)
+        if node is None:
+            node = self.index[user_id] = len(self.ids)
+            self.ids.append(user_id)
+        return node
+
+    def load(self, pairs):
+        """Build the CSR arrays from a flat ``[a0, b0, a1, b1, ...]`` array."""
+        size = len(self.ids)
+        degree = array("l", [0]) * (size + 1)
+        for node in pairs:
+            degree[node + 1] += 1
+        offsets = array("l", degree)
+        for node in range(size):
+            offsets[node + 1] += offsets[node]
+
+        targets = array("l", [0]) * len(pairs)
+        cursor = array("l", offsets[:-1])
+        for position in range(0, len(pairs), 2):
+            a, b = pairs[position], pairs[position + 1]
+            targets[cursor[a]] = b
+            cursor[a] += 1
+            targets[cursor[b]] = a
+            cursor[b] += 1
+
+        for node in range(size):
+            start, end = offsets[node], offsets[node + 1]
+            if end - start > 1:
+                # Sorting also lets duplicate edges collapse in neighbours().
+                targets[start:end] = array("l", sorted(targets[start:end]))
+
+        self.adjacency = Adjacency(offsets, targets)
+
+    def neighbours(self, node):
+        return self.adjacency.neighbours(node)
+
+    def add_edge(self, a, b):
+        with self.lock:
+            a, b = self.intern(a), self.intern(b)
+            adjacency = self.adjacency
+            for x, y in ((a, b), (b, a)):
+                adjacency.removed[x].discard(y)
+                if not adjacency.has_base_edge(x, y):
+                    adjacency.added[x].add(y)
+            self._bump(adjacency)
+
+    def remove_edge(self, a, b):
+        with self.lock:
+            a, b = self.index.get(a), self.index.get(b)
+            if a is None or b is None:
+                return
+            adjacency = self.adjacency
+            for x, y in ((a, b), (b, a)):
+                adjacency.added[x].discard(y)
+                if adjacency.has_base_edge(x, y):
+                    adjacency.removed[x].add(y)
+            self._bump(adjacency)
+
+    def _bump(self, adjacency):
+        adjacency.overlay_size += 1
+        if adjacency.overlay_size >= self.compact_threshold:
+            self.compact()
+
+    def compact(self):
+        with self.lock:
+            adjacency = self.adjacency
+            pairs = array("l")
+            for node in range(len(self.ids)):
+                for other in adjacency.neighbours(node):
+                    if node < other:
+                        pairs.append(node)
+                        pairs.append(other)
+            self.load(pairs)
+
+    # Queries take and return user UUIDs.
+
+    def connections_of(self, user_id):
+        node = self.index.get(user_id)
+        if node is None:
+            return []
+        return [self.ids[other] for other in self.neighbours(node)]
+
+    def mutual(self, user_id, other_id):
+        a, b = self.index.get(user_id), self.index.get(other_id)
+        if a is None or b is None:
+            return []
+        return [self.ids[node] for node in self.neighbours(a) & self.neighbours(b)]
+
+    def second_degree(self, user_id, exclude=()):
+        """Count shared neighbours for every friend-of-a-friend of ``user_id``."""
+        node = self.index.get(user_id)
+        if node is None:
+            return Counter()
+        direct = self.neighbours(node)
+        skip = direct | {node} | {self.index[pk] for pk in exclude if pk in self.index}
+        shared = Counter()
+        for friend in direct:
+            for candidate in self.neighbours(friend):
+                if candidate not in skip:
+                    shared[candidate] += 1
+        return Counter({self.ids[node]: count for node, count in shared.items()})
+
+    def shortest_path(self, user_id, other_id, max_depth=6):
+        """Bidirectional BFS; returns the list of UUIDs on the path, or None."""
+        start, goal = self.index.get(user_id), self.index.get(other_id)
+        if start is None or goal is None:
+            return None
+        if start == goal:
+            return [user_id]
+
+        parents = ({start: None}, {goal: None})
+        frontiers = (deque([start]), deque([goal]))
+        depth = 0
+        while frontiers[0] and frontiers[1] and depth < max_depth:
+            # Expand the smaller frontier one full level.
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            seen, other_seen = parents[side], parents[1 - side]
+            for _ in range(len(frontiers[side])):
+                node = frontiers[side].popleft()
+                for neighbour in self.neighbours(node):
+                    if neighbour in seen:
+                        continue
+                    seen[neighbour] = node
+                    if neighbour in other_seen:
+                        return self._join(parents, neighbour)
+                    frontiers[side].append(neighbour)
+            depth += 1
+        return None
+
+    def _join(self, parents, meeting):
+        path = []
+        node = meeting
+        while node is not None:
+            path.append(node)
+            node = parents[0][node]
+        path.reverse()
+        node = parents[1][meeting]
+        while node is not None:
+            path.append(node)
+            node = parents[1][node]
+        return [self.ids[node] for node in path]
+
+
+_graph = None
+# Held for a whole build, so that only one runs at a time.
+_build_lock = threading.Lock()
+# Held briefly to apply an edge, or to publish a built graph.
+_graph_lock = threading.Lock()
+# Edges applied since the running build started, or None.
+_journal = None
+_rebuilding = threading.Event()
+
+
+def get_graph():
+    graph = _graph
+    if graph is None:
+        with _build_lock:
+            if _graph is None:
+                _build()
+            return _graph
+
+    max_age = getattr(settings, "DIRECTORY_GRAPH_MAX_AGE", 300)
+    if time.monotonic() - graph.built_at > max_age and not _rebuilding.is_set():
+        _rebuilding.set()
+        threading.Thread(target=_rebuild, daemon=True).start()
+    return graph
+
+
+def _rebuild():
+    try:
+        with _build_lock:
+            _build()
+    finally:
+        connection.close()
+        _rebuilding.clear()
+
+
+def _build():
+    """Load a new graph, replay edges applied meanwhile, then publish it."""
+    global _graph, _journal
+    with _graph_lock:
+        _journal = []
+    try:
+        graph = ConnectionGraph.from_database()
+        with _graph_lock:
+            for edge in _journal:
+                _apply(graph, *edge)
+            _graph = graph
+    finally:
+        with _graph_lock:
+            _journal = None
+
+
+def apply_edge(requester_id, receiver_id, accepted):
+    """Apply a committed connection change to the process-local graph."""
+    with _graph_lock:
+        if _journal is not None:
+            _journal.append((requester_id, receiver_id, accepted))
+        if _graph is not None:
+            _apply(_graph, requester_id, receiver_id, accepted)
+
+
+def _apply(graph, requester_id, receiver_id, accepted):
+    if accepted:
+        graph.add_edge(requester_id, receiver_id)
+    else:
+        graph.remove_edge(requester_id, receiver_id)
+
+
+def reset_graph():
+    global _graph
+    with _graph_lock:
+        _graph = None
@@ -0,0 +1,302 @@
+"""
+Streaming bulk import of alumni from CSV or NDJSON.
+
+Rows are validated in chunks and written with ``bulk_create``, so no
+per-row ``post_save`` handlers run. Passwords, when a row carries one, are
+hashed in a process pool. Rows without a password get an unusable password
+and are expected to go through password reset. A bad row is reported and
+skipped; it never aborts the rest of the import.
+
+Hashing dominates the cost of rows that carry a password, by far more than
+the inserts. Imports therefore run from ``manage.py import_alumni``, or from
+the ``process_alumni_imports`` worker for files uploaded in the admin, and
+never inside a web request.
+"""
+
+import csv
+import io
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from apps.accounts.models import UserProfile
+from apps.directory.models import AlumniImport, AlumniProfile
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+USER_FIELDS = ("email", "phone", "first_name", "last_name")
+PROFILE_FIELDS = (
+    "bio",
+    "location",
+    "graduation_year",
+    "degree",
+    "major",
+    "current_company",
+    "current_position",
+    "linkedin_url",
+    "website_url",
+)
+ALUMNI_FIELDS = ("graduation_year", "major", "degree", "current_company")
+LIST_FIELDS = ("skills", "achievements")
+# Columns the import never sets keep their model defaults; skip validating them.
+PROFILE_UNCHECKED = [
+    field.name for field in UserProfile._meta.fields if field.name not in PROFILE_FIELDS
+]
+# Rejected rows kept on a queued ``AlumniImport``.
+MAX_STORED_ERRORS = 100
+
+
+def read_rows(stream, format="csv"):
+    """Yield ``(line_number, row)`` from a text stream.
+
+    Lines that cannot be parsed yield the exception in place of the row.
+    """
+    if format == "ndjson":
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, e
+                continue
+            yield line_number, (
+                row if isinstance(row, dict) else ValueError("Expected a JSON object.")
+            )
+    else:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def error(self, line_number, message):
+        self.errors.append((line_number, message))
+
+    def __str__(self):
+        return f"{self.created} created, {len(self.errors)} rejected"
+
+
+class AlumniImporter:
+    def __init__(self, chunk_size=2000, workers=None, activate=False):
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.activate = activate
+        self.seen_emails = set()
+        self.seen_phones = set()
+
+    def run(self, rows):
+        result = ImportResult()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            chunk = []
+            for line_number, row in rows:
+                chunk.append((line_number, row))
+                if len(chunk) >= self.chunk_size:
+                    self.import_chunk(chunk, pool, result)
+                    chunk = []
+            if chunk:
+                self.import_chunk(chunk, pool, result)
+        return result
+
+    def import_chunk(self, chunk, pool, result):
+        pending = []
+        for line_number, row in chunk:
+            try:
+                pending.append((line_number, *self.build(row)))
+            except ValidationError as e:
+                result.error(line_number, "; ".join(_messages(e)))
+            except (TypeError, ValueError) as e:
+                result.error(line_number, str(e))
+
+        pending = self.drop_duplicates(pending, result)
+        if not pending:
+            return
+
+        passwords = [password for _, _, _, _, password in pending]
+        to_hash = [password for password in passwords if password]
+        hashed = iter(pool.map(make_password, to_hash, chunksize=64))
+        for (_, user, _, _, _), password in zip(pending, passwords):
+            user.password = next(hashed) if password else make_password(None)
+
+        users = [user for _, user, _, _, _ in pending]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users, ignore_conflicts=True)
+                inserted = set(
+                    User.objects.filter(pk__in=[user.pk for user in users]).values_list(
+                        "pk", flat=True
+                    )
+                )
+                UserProfile.objects.bulk_create(
+                    profile
+                    for _, user, profile, _, _ in pending
+                    if profile is not None and user.pk in inserted
+                )
+                AlumniProfile.objects.bulk_create(
+                    alumni
+                    for _, user, _, alumni, _ in pending
+                    if alumni is not None and user.pk in inserted
+                )
+        except DatabaseError as e:
+            for line_number, *_ in pending:
+                result.error(line_number, f"Database error: {e}")
+            return
+
+        for line_number, user, profile, alumni, _ in pending:
+            if user.pk not in inserted:
+                result.error(line_number, "Conflicts with an existing user.")
+            else:
+                # Indexing reads both; a missing one must not cost a query.
+                User.profile.related.set_cached_value(user, profile)
+                User.alumni_profile.related.set_cached_value(user, alumni)
+        result.created += len(inserted)
+        self.after_chunk([user for user in users if user.pk in inserted])
+
+    def after_chunk(self, users):
+        # bulk_create skips the post_save handlers that keep search and the
+        # response cache in sync. The users carry their profiles already.
+        from apps.directory.search import index_users
+        from config.cache import invalidate_tags
+
+        index_users(users)
+        invalidate_tags("directory.profiles")
+
+    def build(self, row):
+        if isinstance(row, Exception):
+            raise row
+        values = {
+            key.strip().lower(): _clean(value) for key, value in row.items() if key
+        }
+
+        user = User(
+            is_active=self.activate,
+            **{field: values.get(field) or "" for field in USER_FIELDS},
+        )
+        user.email = User.objects.normalize_email(user.email)
+        user.phone = user.phone or None
+        user.clean_fields(exclude=["password"])
+
+        # Profiles are materialised lazily, so only rows with profile data need one.
+        profile = None
+        profile_values = {
+            field: values[field] for field in PROFILE_FIELDS if values.get(field)
+        }
+        if profile_values:
+            profile = UserProfile(user=user, **profile_values)
+            profile.clean_fields(exclude=PROFILE_UNCHECKED)
+
+        alumni = None
+        if all(values.get(field) for field in ("graduation_year", "major", "degree")):
+            alumni = AlumniProfile(
+                user=user,
+                **{
+                    field: values[field] for field in ALUMNI_FIELDS if values.get(field)
+                },
+                **{field: _list(values.get(field)) for field in LIST_FIELDS},
+            )
+            alumni.clean_fields(exclude=["user"])
+
+        return user, profile, alumni, values.get("password") or None
+
+    def drop_duplicates(self, pending, result):
+        """Reject rows whose email or phone is taken, in the database or file."""
+        emails = {user.email for _, user, *_ in pending}
+        phones = {user.phone for _, user, *_ in pending if user.phone}
+        taken_emails = set(
+            User.objects.filter(email__in=emails).values_list("email", flat=True)
+        )
+        taken_phones = set(
+            User.objects.filter(phone__in=phones).values_list("phone", flat=True)
+        )
+
+        kept = []
+        for entry in pending:
+            line_number, user = entry[0], entry[1]
+            if user.email in taken_emails or user.email in self.seen_emails:
+                result.error(line_number, f"Email {user.email} is already in use.")
+            elif user.phone and (
+                user.phone in taken_phones or user.phone in self.seen_phones
+            ):
+                result.error(line_number, f"Phone {user.phone} is already in use.")
+            else:
+                self.seen_emails.add(user.email)
+                if user.phone:
+                    self.seen_phones.add(user.phone)
+                kept.append(entry)
+        return kept
+
+
+def claim_import():
+    """Mark the oldest pending ``AlumniImport`` running and return it, or None."""
+    with transaction.atomic():
+        queued = (
+            AlumniImport.objects.select_for_update(skip_locked=True)
+            .filter(status="pending")
+            .order_by("created_at")
+            .first()
+        )
+        if queued is not None:
+            queued.status = "running"
+            queued.started_at = timezone.now()
+            queued.save(update_fields=["status", "started_at"])
+    return queued
+
+
+def run_import(queued):
+    """Import a claimed ``AlumniImport`` file and record the outcome on it."""
+    try:
+        with queued.file.open("rb") as raw:
+            stream = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+            result = AlumniImporter(activate=queued.activate).run(
+                read_rows(stream, queued.format)
+            )
+    except Exception:
+        logger.exception("Alumni import %s failed", queued.pk)
+        queued.status = "failed"
+        queued.finished_at = timezone.now()
+        queued.save(update_fields=["status", "finished_at"])
+        return None
+
+    queued.status = "done"
+    queued.created_count = result.created
+    queued.rejected_count = len(result.errors)
+    queued.errors = [list(error) for error in result.errors[:MAX_STORED_ERRORS]]
+    queued.finished_at = timezone.now()
+    # The rows are in the database now; keep no copy of the upload around.
+    queued.file.delete(save=False)
+    queued.save()
+    return result
+
+
+def _clean(value):
+    return value.strip() if isinstance(value, str) else value
+
+
+def _list(value):
+    if not value:
+        return []
+    if isinstance(value, list):
+        return value
+    return [item.strip() for item in str(value).split(";") if item.strip()]
+
+
+def _messages(error):
+    if hasattr(error, "message_dict"):
+        return [
+            f"{field}: {message}"
+            for field, messages in error.message_dict.items()
+            for message in messages
+        ]
+    return error.messages
@@ -0,0 +1,44 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.directory.importers import AlumniImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import alumni (users, profiles, alumni profiles) from CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file; '-' reads stdin.")
+        parser.add_argument("--format", choices=["csv", "ndjson"])
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--workers", type=int, help="Password hashing processes (default: CPUs)."
+        )
+        parser.add_argument(
+            "--activate", action="store_true", help="Mark imported users active."
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        format = options["format"] or (
+            "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+        )
+        importer = AlumniImporter(
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+            activate=options["activate"],
+        )
+
+        if path == "-":
+            result = importer.run(read_rows(sys.stdin, format))
+        else:
+            if not os.path.exists(path):
+                raise CommandError(f"No such file: {path}")
+            with open(path, newline="", encoding="utf-8-sig") as stream:
+                result = importer.run(read_rows(stream, format))
+
+        for line_number, message in result.errors:
+            self.stderr.write(f"line {line_number}: {message}")
+        self.stdout.write(self.style.SUCCESS(f"Import finished: {result}."))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.directory import importers
+
+
+class Command(BaseCommand):
+    help = (
+        "Run alumni imports queued from the admin, oldest first. Runs until "
+        "stopped unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sleep", type=float, default=10.0, help="Seconds to wait when idle."
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Drain the queue once and exit."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            while True:
+                queued = importers.claim_import()
+                if queued is None:
+                    break
+                result = importers.run_import(queued)
+                if result is None:
+                    self.stderr.write(f"Import {queued.pk} failed.")
+                else:
+                    self.stdout.write(f"Import {queued.pk} finished: {result}.")
+            if options["once"]:
+                return
+            connection.close()
+            time.sleep(options["sleep"])
@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.directory import search
+from apps.directory.models import SearchDocument
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild the alumni directory full-text search index from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        backend = search.get_backend()
+        with transaction.atomic():
+            backend.clear()
+            # Bypass post_delete: the index table has already been emptied.
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {SearchDocument._meta.db_table}")
+
+        users = User.objects.select_related("profile", "alumni_profile").order_by("pk")
+        total = 0
+        batch = []
+        for user in users.iterator(chunk_size=batch_size):
+            batch.append(user)
+            if len(batch) >= batch_size:
+                search.index_users(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            search.index_users(batch)
+            total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} users."))
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def install_search_index(apps, schema_editor):
+    from apps.directory.search import backend_for
+
+    with schema_editor.connection.cursor() as cursor:
+        backend_for(schema_editor.connection.vendor).install(cursor)
+
+
+def uninstall_search_index(apps, schema_editor):
+    from apps.directory.search import backend_for
+
+    with schema_editor.connection.cursor() as cursor:
+        backend_for(schema_editor.connection.vendor).uninstall(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('directory', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('full_name', models.CharField(blank=True, max_length=301)),
+                ('graduation_year', models.PositiveIntegerField(blank=True, null=True)),
+                ('major', models.CharField(blank=True, max_length=201)),
+                ('degree', models.CharField(blank=True, max_length=201)),
+                ('company', models.CharField(blank=True, max_length=201)),
+                ('position', models.CharField(blank=True, max_length=201)),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('skills', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Search Document',
+                'verbose_name_plural': 'Search Documents',
+            },
+        ),
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("directory", "0002_search_document"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="alumniconnection",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="connection_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="alumniprofile",
+            index=models.Index(
+                fields=["-graduation_year", "user"], name="alumni_grad_year_user_idx"
+            ),
+        ),
+    ]
@@ -25,6 +25,9 @@ class AlumniProfile(models.Model):
         indexes = [
             models.Index(fields=["graduation_year"]),
             models.Index(fields=["major"]),
+            models.Index(
+                fields=["-graduation_year", "user"], name="alumni_grad_year_user_idx"
+            ),
         ]
         verbose_name = "Alumni Profile"
         verbose_name_plural = "Alumni Profiles"
@@ -65,7 +68,76 @@ class AlumniConnection(models.Model):
         indexes = [
             models.Index(fields=["requester", "receiver"]),
             models.Index(fields=["status"]),
+            models.Index(fields=["-created_at", "-id"], name="connection_created_idx"),
         ]
         verbose_name = "Alumni Connection"
         verbose_name_plural = "Alumni Connections"
         ordering = ["-created_at"]
+
+
+class SearchDocument(models.Model):
+    """Flattened, denormalised copy of a user's searchable fields.
+
+    Rows are maintained by ``apps.directory.signals`` and mirrored into the
+    database-specific full-text index owned by ``apps.directory.search``.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name="search_document"
+    )
+    full_name = models.CharField(max_length=301, blank=True)
+    graduation_year = models.PositiveIntegerField(null=True, blank=True)
+    major = models.CharField(max_length=201, blank=True)
+    degree = models.CharField(max_length=201, blank=True)
+    company = models.CharField(max_length=201, blank=True)
+    position = models.CharField(max_length=201, blank=True)
+    location = models.CharField(max_length=100, blank=True)
+    skills = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.full_name
+
+    class Meta:
+        verbose_name = "Search Document"
+        verbose_name_plural = "Search Documents"
+
+
+class AlumniImport(models.Model):
+    """An uploaded import file, queued for the ``process_alumni_imports`` worker."""
+
+    FORMAT_CHOICES = [("csv", "CSV"), ("ndjson", "NDJSON")]
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    file = models.FileField(upload_to="imports/")
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default="csv")
+    activate = models.BooleanField(default=False)
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    created_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(default=0)
+    # The first rejected rows, as [line number, message] pairs.
+    errors = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.file.name} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "created_at"], name="alumni_import_queue_idx"
+            ),
+        ]
+        verbose_name = "Alumni Import"
+        verbose_name_plural = "Alumni Imports"
+        ordering = ["-created_at"]
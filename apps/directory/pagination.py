@@ -0,0 +1,6 @@
+from config.pagination import KeysetPagination
+
+
+class AlumniProfilePagination(KeysetPagination):
+    # Mirrors AlumniProfile.Meta.ordering, with the primary key as tiebreaker.
+    ordering = ("-graduation_year", "user__first_name", "user__last_name", "pk")
@@ -0,0 +1,316 @@
+"""
+Full-text search over the alumni directory.
+
+Every searchable user owns one ``SearchDocument`` row. The active backend
+mirrors those rows into a database-native inverted index (an FTS5 virtual
+table on SQLite, a GIN-indexed ``tsvector`` table on PostgreSQL) and answers
+ranked prefix queries against it. Inactive users and private profiles
+have no document.
+"""
+
+import re
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from apps.directory.models import SearchDocument
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_QUERY_TOKENS = 8
+
+# Column order is shared by both backends; weights follow the same order.
+INDEXED_COLUMNS = (
+    "full_name",
+    "skills",
+    "major",
+    "company",
+    "position",
+    "degree",
+    "location",
+)
+# User columns a document depends on; saves touching none of them (such as
+# the ``last_login`` update on every login) need no reindex.
+USER_FIELDS = ("first_name", "last_name", "is_active")
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())[:MAX_QUERY_TOKENS]
+
+
+class BaseSearchBackend:
+    table = "directory_search_index"
+
+    def install(self, cursor):
+        raise NotImplementedError
+
+    def uninstall(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def upsert(self, documents):
+        raise NotImplementedError
+
+    def delete(self, document_ids):
+        if not document_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(document_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE doc_id IN ({placeholders})",
+                list(document_ids),
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def search(self, query, limit=20, offset=0):
+        """Return ``[(document_id, rank), ...]`` best match first."""
+        raise NotImplementedError
+
+    @staticmethod
+    def values(document):
+        return [getattr(document, column) or "" for column in INDEXED_COLUMNS]
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """FTS5 index ranked with bm25(); ``doc_id`` doubles as the FTS rowid."""
+
+    weights = (10.0, 5.0, 4.0, 4.0, 4.0, 2.0, 1.0)
+
+    def install(self, cursor):
+        columns = ", ".join(INDEXED_COLUMNS)
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            f"{columns}, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+    def upsert(self, documents):
+        if not documents:
+            return
+        self.delete([document.pk for document in documents])
+        columns = ", ".join(INDEXED_COLUMNS)
+        placeholders = ", ".join(["%s"] * (len(INDEXED_COLUMNS) + 1))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, {columns}) VALUES ({placeholders})",
+                [[document.pk, *self.values(document)] for document in documents],
+            )
+
+    def delete(self, document_ids):
+        if not document_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(document_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})",
+                list(document_ids),
+            )
+
+    def search(self, query, limit=20, offset=0):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        match = " ".join(f'"{token}"*' for token in tokens)
+        weights = ", ".join(str(weight) for weight in self.weights)
+        with connection.cursor() as cursor:
+            # bm25() is negative, lower is better.
+            cursor.execute(
+                f"SELECT rowid, -bm25({self.table}, {weights}) AS rank "
+                f"FROM {self.table} WHERE {self.table} MATCH %s "
+                f"ORDER BY bm25({self.table}, {weights}) LIMIT %s OFFSET %s",
+                [match, limit, offset],
+            )
+            return cursor.fetchall()
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """``tsvector`` side table with a GIN index, ranked with ts_rank()."""
+
+    config = "simple"
+    # setweight() label per column in INDEXED_COLUMNS.
+    labels = ("A", "B", "B", "B", "B", "C", "C")
+
+    def install(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            f"doc_id bigint PRIMARY KEY, vector tsvector NOT NULL)"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_vector_idx "
+            f"ON {self.table} USING gin (vector)"
+        )
+
+    def upsert(self, documents):
+        if not documents:
+            return
+        vector = " || ".join(
+            f"setweight(to_tsvector('{self.config}', %s), '{label}')"
+            for label in self.labels
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (doc_id, vector) VALUES (%s, {vector}) "
+                f"ON CONFLICT (doc_id) DO UPDATE SET vector = EXCLUDED.vector",
+                [[document.pk, *self.values(document)] for document in documents],
+            )
+
+    def search(self, query, limit=20, offset=0):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        tsquery = " & ".join(f"{token}:*" for token in tokens)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT doc_id, ts_rank(vector, query) AS rank "
+                f"FROM {self.table}, to_tsquery('{self.config}', %s) query "
+                f"WHERE vector @@ query ORDER BY rank DESC, doc_id "
+                f"LIMIT %s OFFSET %s",
+                [tsquery, limit, offset],
+            )
+            return cursor.fetchall()
+
+
+BACKENDS = {
+    "sqlite": SQLiteFTSBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def backend_for(vendor):
+    path = getattr(settings, "DIRECTORY_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    return BACKENDS[vendor]()
+
+
+def get_backend():
+    return backend_for(connection.vendor)
+
+
+def build_document(user):
+    """Fold ``User``, ``UserProfile`` and ``AlumniProfile`` into one document.
+
+    Returns ``None`` for users who should not appear in directory search.
+    """
+    if not user.is_active:
+        return None
+    profile = _related(user, "profile")
+    alumni = _related(user, "alumni_profile")
+    if profile is not None and profile.privacy_level == "private":
+        return None
+
+    def merged(*values):
+        seen = []
+        for value in values:
+            if value and value not in seen:
+                seen.append(value)
+        return " ".join(seen)
+
+    skills = []
+    if alumni is not None:
+        skills.extend(alumni.skills or [])
+    if profile is not None:
+        skills.extend(profile.mentor_skills or [])
+
+    return SearchDocument(
+        user=user,
+        full_name=user.get_full_name(),
+        graduation_year=(
+            getattr(alumni, "graduation_year", None)
+            or getattr(profile, "graduation_year", None)
+        ),
+        major=merged(getattr(alumni, "major", ""), getattr(profile, "major", "")),
+        degree=merged(getattr(alumni, "degree", ""), getattr(profile, "degree", "")),
+        company=merged(
+            getattr(alumni, "current_company", ""),
+            getattr(profile, "current_company", ""),
+        ),
+        position=merged(
+            getattr(alumni, "current_job", ""),
+            getattr(profile, "current_position", ""),
+        ),
+        location=getattr(profile, "location", ""),
+        skills=merged(*(str(skill) for skill in skills)),
+    )
+
+
+def _related(user, name):
+    try:
+        return getattr(user, name)
+    except ObjectDoesNotExist:
+        return None
+
+
+def index_users(users):
+    """Rebuild search documents for ``users`` (already loaded instances)."""
+    backend = get_backend()
+    documents = {}
+    hidden = []
+    for user in users:
+        document = build_document(user)
+        if document is None:
+            hidden.append(user.pk)
+        else:
+            documents[user.pk] = document
+
+    with transaction.atomic():
+        existing = dict(
+            SearchDocument.objects.filter(
+                user_id__in=[*documents, *hidden]
+            ).values_list("user_id", "pk")
+        )
+        removed = [existing[pk] for pk in hidden if pk in existing]
+        if removed:
+            # Deleting the rows fires post_delete, which drops the index entries.
+            SearchDocument.objects.filter(pk__in=removed).delete()
+
+        to_update = []
+        to_create = []
+        for user_id, document in documents.items():
+            if user_id in existing:
+                document.pk = existing[user_id]
+                to_update.append(document)
+            else:
+                to_create.append(document)
+        if to_update:
+            SearchDocument.objects.bulk_update(
+                to_update, [*INDEXED_COLUMNS, "graduation_year"]
+            )
+        if to_create:
+            SearchDocument.objects.bulk_create(to_create)
+            if any(document.pk is None for document in to_create):
+                # Backends without RETURNING leave pks unset.
+                ids = dict(
+                    SearchDocument.objects.filter(
+                        user_id__in=[document.user_id for document in to_create]
+                    ).values_list("user_id", "pk")
+                )
+                for document in to_create:
+                    document.pk = ids[document.user_id]
+        backend.upsert(to_update + to_create)
+
+
+def index_user_ids(user_ids):
+    from django.contrib.auth import get_user_model
+
+    users = (
+        get_user_model()
+        .objects.filter(pk__in=list(user_ids))
+        .select_related("profile", "alumni_profile")
+    )
+    index_users(users)
+
+
+def search(query, limit=20, offset=0):
+    """Return matching ``SearchDocument`` rows in relevance order."""
+    hits = get_backend().search(query, limit=limit, offset=offset)
+    documents = SearchDocument.objects.in_bulk([doc_id for doc_id, _ in hits])
+    results = []
+    for doc_id, rank in hits:
+        document = documents.get(doc_id)
+        if document is not None:
+            document.rank = rank
+            results.append(document)
+    return results
@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from apps.directory.models import AlumniConnection, AlumniProfile
+from apps.directory.models import AlumniConnection, AlumniProfile, SearchDocument
 
 User = get_user_model()
 
@@ -25,3 +25,30 @@ class AlumniConnectionSerializer(serializers.ModelSerializer):
         model = AlumniConnection
         fields = "__all__"
         read_only_fields = ("created_at", "updated_at", "status")
+
+
+class SearchResultSerializer(serializers.ModelSerializer):
+    user = serializers.PrimaryKeyRelatedField(read_only=True)
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = SearchDocument
+        fields = (
+            "user",
+            "full_name",
+            "graduation_year",
+            "major",
+            "degree",
+            "company",
+            "position",
+            "location",
+            "rank",
+        )
+
+
+class ConnectionUserSerializer(serializers.ModelSerializer):
+    mutual_count = serializers.IntegerField(read_only=True, required=False)
+
+    class Meta:
+        model = User
+        fields = ("id", "first_name", "last_name", "mutual_count")
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.accounts.models import UserProfile
+from apps.directory import graph, search
+from apps.directory.models import AlumniConnection, AlumniProfile, SearchDocument
+from config.cache import USER_DISPLAY_FIELDS, invalidate_on_change
+
+invalidate_on_change(AlumniProfile, "directory.profiles")
+invalidate_on_change(
+    get_user_model(),
+    "directory.profiles",
+    "directory.connections",
+    fields=USER_DISPLAY_FIELDS,
+)
+invalidate_on_change(AlumniConnection, "directory.connections")
+
+
+def schedule_reindex(user_id):
+    transaction.on_commit(lambda: search.index_user_ids([user_id]))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reindex_user(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (
+        update_fields is not None and not set(update_fields) & set(search.USER_FIELDS)
+    ):
+        return
+    schedule_reindex(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_save, sender=AlumniProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_delete, sender=AlumniProfile)
+def reindex_profile_owner(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_reindex(instance.user_id)
+
+
+@receiver(post_delete, sender=SearchDocument)
+def drop_search_document(sender, instance, **kwargs):
+    search.get_backend().delete([instance.pk])
+
+
+@receiver(post_save, sender=AlumniConnection)
+@receiver(post_delete, sender=AlumniConnection)
+def update_connection_graph(sender, instance, signal, raw=False, **kwargs):
+    if raw:
+        return
+    accepted = signal is post_save and instance.status == "accepted"
+    edge = (instance.requester_id, instance.receiver_id, accepted)
+    transaction.on_commit(lambda: graph.apply_edge(*edge))
@@ -1,3 +1,242 @@
-from django.test import TestCase
+import io
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.accounts.models import UserProfile
+from apps.directory import graph, search
+from apps.directory.importers import AlumniImporter, read_rows
+from apps.directory.models import (
+    AlumniConnection,
+    AlumniImport,
+    AlumniProfile,
+    SearchDocument,
+)
+
+User = get_user_model()
+
+
+def make_user(email, **fields):
+    return User.objects.create_user(
+        email=email, password="x", is_active=fields.pop("is_active", True), **fields
+    )
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class DirectorySearchTests(TestCase):
+    def make_user(self, email, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return make_user(email, **fields)
+
+    def found(self, query):
+        return [document.user_id for document in search.search(query)]
+
+    def test_private_profiles_are_not_indexed(self):
+        user = self.make_user("ada@example.com", first_name="Ada")
+        self.assertEqual(self.found("ada"), [user.pk])
+
+        profile = UserProfile.objects.materialize(user)
+        profile.privacy_level = "private"
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        self.assertEqual(self.found("ada"), [])
+        self.assertFalse(SearchDocument.objects.exists())
+
+    def test_inactive_users_are_not_indexed(self):
+        self.make_user("grace@example.com", first_name="Grace", is_active=False)
+        self.assertEqual(self.found("grace"), [])
+
+        user = self.make_user("alan@example.com", first_name="Alan")
+        self.assertEqual(self.found("alan"), [user.pk])
+        user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save(update_fields=["is_active"])
+        self.assertEqual(self.found("alan"), [])
+
+    def test_login_does_not_reindex(self):
+        user = self.make_user("ada@example.com", first_name="Ada")
+        with mock.patch.object(search, "index_user_ids") as index_user_ids:
+            with self.captureOnCommitCallbacks(execute=True):
+                update_last_login(None, user)
+        index_user_ids.assert_not_called()
+
+    def test_names_outrank_skills_and_prefixes_match(self):
+        by_skill = self.make_user("a@example.com", first_name="Ada")
+        with self.captureOnCommitCallbacks(execute=True):
+            AlumniProfile.objects.create(
+                user=by_skill,
+                graduation_year=2010,
+                major="Physics",
+                degree="BSc",
+                skills=["Rust"],
+            )
+        by_name = self.make_user("b@example.com", first_name="Ben", last_name="Rust")
+        self.assertEqual(self.found("rus"), [by_name.pk, by_skill.pk])
+        self.assertEqual(self.found("rust physics"), [by_skill.pk])
+
+    def test_endpoint(self):
+        user = self.make_user("ada@example.com", first_name="Ada")
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get("/api/directory/search/", {"q": "ada"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["user"] for row in response.json()["results"]], [str(user.pk)]
+        )
+
+
+class ConnectionGraphTests(TestCase):
+    def setUp(self):
+        # a - b - c - d, and a - e - c
+        self.graph = graph.ConnectionGraph.from_edges(
+            [("a", "b"), ("b", "c"), ("c", "d"), ("a", "e"), ("e", "c"), ("b", "a")]
+        )
+
+    def test_queries(self):
+        self.assertEqual(sorted(self.graph.connections_of("a")), ["b", "e"])
+        self.assertEqual(sorted(self.graph.mutual("a", "c")), ["b", "e"])
+        self.assertEqual(self.graph.second_degree("a"), {"c": 2})
+        self.assertEqual(len(self.graph.shortest_path("a", "d")), 4)
+        self.assertIsNone(self.graph.shortest_path("a", "z"))
+
+    def test_overlay_and_compaction(self):
+        self.graph.compact_threshold = 3
+        before = self.graph.adjacency
+        self.graph.add_edge("a", "d")
+        self.graph.remove_edge("b", "c")
+        self.assertEqual(sorted(self.graph.connections_of("a")), ["b", "d", "e"])
+        self.assertEqual(sorted(self.graph.connections_of("c")), ["d", "e"])
+        self.assertIs(self.graph.adjacency, before)
+
+        self.graph.add_edge("d", "f")
+        after = self.graph.adjacency
+        self.assertIsNot(after, before)
+        self.assertFalse(after.added or after.removed)
+        self.assertEqual(sorted(self.graph.connections_of("d")), ["a", "c", "f"])
+        # A reader still holding the old arrays sees a consistent graph.
+        self.assertEqual(
+            sorted(self.graph.ids[node] for node in before.neighbours(0)),
+            ["b", "d", "e"],
+        )
+
+
+class GraphBuildTests(TestCase):
+    def setUp(self):
+        graph.reset_graph()
+        self.addCleanup(graph.reset_graph)
+        self.alice = make_user("alice@example.com")
+        self.bob = make_user("bob@example.com")
+        self.carol = make_user("carol@example.com")
+
+    def connect(self, requester, receiver):
+        with self.captureOnCommitCallbacks(execute=True):
+            return AlumniConnection.objects.create(
+                requester=requester, receiver=receiver, status="accepted"
+            )
+
+    def test_saved_connections_update_the_loaded_graph(self):
+        self.connect(self.alice, self.bob)
+        connections = graph.get_graph()
+        self.assertEqual(connections.connections_of(self.alice.pk), [self.bob.pk])
+
+        connection = self.connect(self.alice, self.carol)
+        self.assertEqual(
+            set(connections.connections_of(self.alice.pk)), {self.bob.pk, self.carol.pk}
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            connection.delete()
+        self.assertEqual(connections.connections_of(self.alice.pk), [self.bob.pk])
+
+    def test_rebuild_replays_edges_applied_during_its_query(self):
+        old = graph.get_graph()
+        load = graph.ConnectionGraph.from_database
+
+        def from_database():
+            built = load()
+            # Committed after the rebuild's query read the table.
+            graph.apply_edge(self.alice.pk, self.carol.pk, True)
+            return built
+
+        with mock.patch.object(graph.ConnectionGraph, "from_database", from_database):
+            graph._build()
+        new = graph.get_graph()
+        self.assertIsNot(new, old)
+        self.assertEqual(new.connections_of(self.alice.pk), [self.carol.pk])
+        self.assertIsNone(graph._journal)
+
+
+def alumni_csv(count, start=0, profiles=True):
+    lines = ["email,first_name,graduation_year,major,degree,skills,location"]
+    profile = "2015,Physics,BSc,Rust;Go,Berlin" if profiles else ",,,,"
+    lines += [
+        f"alum{n}@example.com,Alum{n},{profile}" for n in range(start, start + count)
+    ]
+    return "\n".join(lines) + "\n"
+
+
+class AlumniImporterTests(TestCase):
+    def run_import(self, text):
+        return AlumniImporter(activate=True).run(read_rows(io.StringIO(text)))
+
+    def test_rows_are_created_indexed_or_rejected(self):
+        text = alumni_csv(2) + "alum0@example.com,Again,,,,,\nnot-an-email,Bad,,,,,\n"
+        result = self.run_import(text)
+        self.assertEqual(result.created, 2)
+        self.assertEqual(sorted(line for line, _ in result.errors), [4, 5])
+        self.assertEqual(AlumniProfile.objects.count(), 2)
+        self.assertEqual(
+            UserProfile.objects.get(user__email="alum1@example.com").location, "Berlin"
+        )
+        self.assertEqual(
+            sorted(document.full_name for document in search.search("rust")),
+            ["Alum0", "Alum1"],
+        )
+
+    def test_indexing_costs_no_query_per_user(self):
+        queries = []
+        for start, count in ((0, 2), (10, 12)):
+            text = alumni_csv(count, start, profiles=False)
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(self.run_import(text).created, count)
+            queries.append(len(context))
+        self.assertEqual(queries[0], queries[1])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class QueuedImportTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.admin = User.objects.create_superuser(
+            email="admin@example.com", password="x"
+        )
+        self.client.force_login(self.admin)
+
+    def test_admin_upload_is_queued_for_the_worker(self):
+        response = self.client.post(
+            "/directory/alumniprofile/import/",
+            {
+                "file": SimpleUploadedFile("alumni.csv", alumni_csv(3).encode()),
+                "format": "csv",
+                "activate": "on",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        queued = AlumniImport.objects.get()
+        self.assertEqual((queued.status, queued.requested_by), ("pending", self.admin))
+        self.assertFalse(User.objects.filter(email__startswith="alum").exists())
+
+        call_command("process_alumni_imports", "--once", stdout=io.StringIO())
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.created_count), ("done", 3))
+        self.assertFalse(queued.file)
+        self.assertEqual(User.objects.filter(email__startswith="alum").count(), 3)
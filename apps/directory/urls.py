@@ -1,11 +1,16 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from apps.directory.views import AlumniConnectionViewSet, AlumniProfileViewSet
+from apps.directory.views import (
+    AlumniConnectionViewSet,
+    AlumniProfileViewSet,
+    DirectorySearchViewSet,
+)
 
 router = DefaultRouter()
 router.register(r"profiles", AlumniProfileViewSet)
 router.register(r"connections", AlumniConnectionViewSet)
+router.register(r"search", DirectorySearchViewSet, basename="directory-search")
 
 urlpatterns = [
     path("", include(router.urls)),
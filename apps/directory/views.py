@@ -1,26 +1,149 @@
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from apps.directory import search
+from apps.directory.graph import get_graph
+from apps.directory.pagination import AlumniProfilePagination
 from apps.directory.models import AlumniConnection, AlumniProfile
 from apps.directory.serializers import (
     AlumniConnectionSerializer,
     AlumniProfileSerializer,
+    ConnectionUserSerializer,
+    SearchResultSerializer,
 )
+from config.cache import CacheResponseMixin
+from config.pagination import CreatedAtKeysetPagination
+
+User = get_user_model()
 
 
-class AlumniProfileViewSet(viewsets.ModelViewSet):
+class AlumniProfileViewSet(CacheResponseMixin, viewsets.ModelViewSet):
     queryset = AlumniProfile.objects.select_related("user").all()
     serializer_class = AlumniProfileSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = AlumniProfilePagination
+    cache_tags = ("directory.profiles",)
+    cache_scope = "public"
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class AlumniConnectionViewSet(viewsets.ModelViewSet):
+class AlumniConnectionViewSet(CacheResponseMixin, viewsets.ModelViewSet):
     queryset = AlumniConnection.objects.select_related("requester", "receiver").all()
     serializer_class = AlumniConnectionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
+    cache_tags = ("directory.connections",)
+
+    # Suggestion score weights: one point per shared connection, plus a bonus
+    # for sharing the requesting user's graduation year or major.
+    same_year_weight = 0.5
+    same_major_weight = 0.25
 
     def perform_create(self, serializer):
         serializer.save(requester=self.request.user)
+
+    @action(detail=False, methods=["get"])
+    def mutual(self, request):
+        """Accepted connections shared with ``?user=<id>``."""
+        other = self._user_param()
+        users = self._users(get_graph().mutual(request.user.pk, other))
+        return Response(ConnectionUserSerializer(users, many=True).data)
+
+    @action(detail=False, methods=["get"])
+    def suggestions(self, request):
+        """Second-degree contacts ranked by shared connections and cohort."""
+        limit = min(self._int_param("limit", 10), 50)
+        me = request.user.pk
+        known = AlumniConnection.objects.filter(
+            Q(requester=me) | Q(receiver=me)
+        ).values_list("requester_id", "receiver_id")
+        exclude = {pk for pair in known for pk in pair}
+
+        shared = get_graph().second_degree(me, exclude=exclude)
+        candidates = dict(shared.most_common(limit * 5))
+        profiles = {
+            profile["user_id"]: profile
+            for profile in AlumniProfile.objects.filter(
+                user_id__in=[me, *candidates]
+            ).values("user_id", "graduation_year", "major")
+        }
+        mine = profiles.get(me, {})
+
+        def score(user_id):
+            profile = profiles.get(user_id, {})
+            value = float(candidates[user_id])
+            if mine and profile.get("graduation_year") == mine["graduation_year"]:
+                value += self.same_year_weight
+            if mine and profile.get("major") == mine["major"]:
+                value += self.same_major_weight
+            return value
+
+        ranked = sorted(candidates, key=score, reverse=True)[:limit]
+        users = self._users(ranked)
+        for user in users:
+            user.mutual_count = candidates[user.pk]
+        return Response(ConnectionUserSerializer(users, many=True).data)
+
+    @action(detail=False, methods=["get"])
+    def path(self, request):
+        """Shortest chain of accepted connections to ``?user=<id>``."""
+        other = self._user_param()
+        path = get_graph().shortest_path(request.user.pk, other)
+        if path is None:
+            return Response({"distance": None, "path": []})
+        return Response(
+            {
+                "distance": len(path) - 1,
+                "path": ConnectionUserSerializer(self._users(path), many=True).data,
+            }
+        )
+
+    def _user_param(self):
+        try:
+            return uuid.UUID(self.request.query_params.get("user", ""))
+        except ValueError:
+            raise ValidationError({"user": "A valid user id is required."})
+
+    def _int_param(self, name, default):
+        try:
+            return max(int(self.request.query_params.get(name, default)), 1)
+        except ValueError:
+            return default
+
+    @staticmethod
+    def _users(user_ids):
+        """Load users in the order of ``user_ids``."""
+        users = User.objects.only("id", "first_name", "last_name").in_bulk(user_ids)
+        return [users[pk] for pk in user_ids if pk in users]
+
+
+class DirectorySearchViewSet(viewsets.ViewSet):
+    """Ranked prefix search over names, education, employers and skills."""
+
+    permission_classes = [IsAuthenticated]
+    default_limit = 20
+    max_limit = 50
+
+    def list(self, request):
+        query = request.query_params.get("q", "").strip()
+        limit = self._int_param("limit", self.default_limit, upper=self.max_limit)
+        offset = self._int_param("offset", 0)
+        results = search.search(query, limit=limit, offset=offset) if query else []
+        serializer = SearchResultSerializer(results, many=True)
+        return Response({"query": query, "results": serializer.data})
+
+    def _int_param(self, name, default, upper=None):
+        try:
+            value = max(int(self.request.query_params.get(name, default)), 0)
+        except ValueError:
+            value = default
+        return min(value, upper) if upper is not None else value
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from events.models import Event, EventRegistration
+from apps.events.models import Event, EventRegistration
 
 
 class EventRegistrationInline(admin.TabularInline):
@@ -32,7 +32,7 @@ class EventAdmin(admin.ModelAdmin):
         "end_date",
         "registration_deadline",
     )
-    search_fields = ("title", "description", "location", "organizer__username")
+    search_fields = ("title", "description", "location", "organizer__email")
     date_hierarchy = "start_date"
     inlines = [EventRegistrationInline]
     autocomplete_fields = ["organizer"]
@@ -96,6 +96,6 @@ class EventRegistrationAdmin(admin.ModelAdmin):
         "registration_date",
     )
     list_filter = ("status", "registration_date", "event")
-    search_fields = ("event__title", "user__username")
+    search_fields = ("event__title", "user__email")
     autocomplete_fields = ["event", "user"]
     readonly_fields = ("registration_date",)
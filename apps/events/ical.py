@@ -0,0 +1,206 @@
+"""
+iCalendar (RFC 5545) feeds of events.
+
+Feeds are streamed one ``VEVENT`` at a time from a server-side cursor. Each
+response carries an ETag derived from a cheap fingerprint query, so
+subscribed calendar clients that poll with ``If-None-Match`` get a 304
+without the feed being rendered. Rendered public feeds are also kept in the
+cache under that ETag.
+"""
+
+import datetime
+import hashlib
+
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.renderers import BaseRenderer
+
+from apps.events.models import Event
+from config.cache import default_timeout
+
+FEED_SALT = "apps.events.ical.feed"
+PRODID = "-//AlumniVerse//Events//EN"
+FEED_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "location",
+    "is_virtual",
+    "virtual_link",
+    "start_date",
+    "end_date",
+    "status",
+    "created_at",
+    "updated_at",
+)
+
+
+class ICalendarRenderer(BaseRenderer):
+    """Lets ``text/calendar`` requests through content negotiation.
+
+    Feed views return their own streaming response; this only renders error
+    bodies, as plain text.
+    """
+
+    media_type = "text/calendar"
+    format = "ics"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and "detail" in data:
+            data = data["detail"]
+        return str(data or "").encode(self.charset)
+
+
+def feed_token(user):
+    return signing.dumps(str(user.pk), salt=FEED_SALT)
+
+
+def feed_user_id(token):
+    """The user id a feed token was issued for, or None if it is invalid."""
+    try:
+        return signing.loads(token, salt=FEED_SALT)
+    except signing.BadSignature:
+        return None
+
+
+def public_events():
+    return Event.objects.filter(
+        status__in=["published", "completed", "cancelled"],
+        is_public=True,
+        start_date__isnull=False,
+    )
+
+
+def user_events(user_id):
+    return Event.objects.filter(
+        Q(organizer_id=user_id)
+        | Q(
+            registrations__user_id=user_id,
+            registrations__status__in=["registered", "attended", "waitlist"],
+        ),
+        start_date__isnull=False,
+    ).distinct()
+
+
+def feed_response(request, events, name, public):
+    """A streamed ``.ics`` response for ``events``, honouring conditional GET."""
+    if public:
+        fingerprint = events.aggregate(count=Count("pk"), changed=Max("updated_at"))
+        fingerprint = f"{fingerprint['count']}:{fingerprint['changed']}"
+    else:
+        # A user's feed also changes when a registration does, which the
+        # events' updated_at does not reflect; hash the membership instead.
+        fingerprint = ",".join(
+            f"{pk}:{changed}"
+            for pk, changed in events.order_by("pk").values_list("pk", "updated_at")
+        )
+    etag = f'"{hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest()}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        cache_key = f"events:ical:{etag}"
+        body = cache.get(cache_key) if public else None
+        if body is not None:
+            response = HttpResponse(body)
+        else:
+            chunks = render_calendar(
+                events.values(*FEED_FIELDS).order_by("start_date", "pk"), name
+            )
+            if public:
+                chunks = _caching(chunks, cache_key)
+            response = StreamingHttpResponse(chunks)
+    response["Content-Type"] = "text/calendar; charset=utf-8"
+    response["ETag"] = etag
+    if public:
+        patch_cache_control(response, public=True, max_age=default_timeout())
+    else:
+        patch_cache_control(response, private=True, max_age=0)
+    return response
+
+
+def _caching(chunks, key):
+    rendered = []
+    for chunk in chunks:
+        rendered.append(chunk)
+        yield chunk
+    cache.set(key, b"".join(rendered), default_timeout())
+
+
+def render_calendar(rows, name):
+    """Yield the encoded lines of a ``VCALENDAR`` holding ``rows``."""
+    yield _lines(
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape(name)}",
+    )
+    stamp = _utc(datetime.datetime.now(datetime.timezone.utc))
+    for row in rows.iterator(chunk_size=500):
+        yield _lines(*event_lines(row, stamp))
+    yield _lines("END:VCALENDAR")
+
+
+def event_lines(row, stamp):
+    end = row["end_date"] or row["start_date"]
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{row['id']}@alumniverse",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_utc(row['start_date'])}",
+        f"DTEND:{_utc(end)}",
+        f"SUMMARY:{escape(row['title'])}",
+        f"CREATED:{_utc(row['created_at'])}",
+        f"LAST-MODIFIED:{_utc(row['updated_at'])}",
+        f"STATUS:{'CANCELLED' if row['status'] == 'cancelled' else 'CONFIRMED'}",
+    ]
+    if row["description"]:
+        lines.append(f"DESCRIPTION:{escape(row['description'])}")
+    if row["location"]:
+        lines.append(f"LOCATION:{escape(row['location'])}")
+    if row["is_virtual"] and row["virtual_link"]:
+        lines.append(f"URL:{row['virtual_link']}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def escape(text):
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """Split a content line into 75-octet pieces (RFC 5545, 3.1)."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return encoded
+    pieces = []
+    start = 0
+    limit = 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split inside a multi-byte UTF-8 sequence.
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        pieces.append(encoded[start:end])
+        start = end
+        limit = 74  # Continuation lines start with a space.
+    return b"\r\n ".join(pieces)
+
+
+def _lines(*lines):
+    return b"".join(fold(line) + b"\r\n" for line in lines)
+
+
+def _utc(value):
+    return value.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
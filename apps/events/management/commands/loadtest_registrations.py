@@ -0,0 +1,137 @@
+import random
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+
+from apps.events import registration
+from apps.events.models import Event, EventCapacity, EventRegistration
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Register many users for one event concurrently, cancel some seated "
+        "registrations concurrently, and check that no seat was oversold and "
+        "that the waitlist was promoted in order. The event and users are "
+        "removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--seats", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--cancel", type=int, default=100)
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8]
+        password = make_password(None)
+        users = User.objects.bulk_create(
+            User(email=f"loadtest-{tag}-{n}@example.invalid", password=password)
+            for n in range(options["users"])
+        )
+        event = Event.objects.create(
+            title=f"Load test reunion {tag}",
+            organizer=users[0],
+            event_type="reunion",
+            status="published",
+            max_attendess=options["seats"],
+        )
+        try:
+            self.run(
+                event,
+                users,
+                options["seats"],
+                options["concurrency"],
+                options["cancel"],
+            )
+        finally:
+            event.delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def run(self, event, users, seats, concurrency, cancel):
+        started = time.perf_counter()
+        outcomes = self.concurrently(
+            concurrency, lambda user: registration.register(event, user).status, users
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"register: {len(users) / elapsed:8.1f} req/s  {dict(Counter(outcomes))}"
+        )
+
+        waiting = list(
+            EventRegistration.objects.filter(event=event, status="waitlist")
+            .order_by("registration_date", "pk")
+            .values_list("pk", flat=True)
+        )
+        seated = list(
+            EventRegistration.objects.filter(event=event, status="registered")
+        )
+        to_cancel = random.sample(seated, min(cancel, len(seated)))
+        started = time.perf_counter()
+        outcomes = self.concurrently(
+            concurrency,
+            lambda instance: registration.cancel(instance).status,
+            to_cancel,
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"cancel:   {len(to_cancel) / max(elapsed, 1e-9):8.1f} req/s  "
+            f"{dict(Counter(outcomes))}"
+        )
+        self.verify(event, seats, waiting, len(to_cancel))
+
+    def concurrently(self, concurrency, task, items):
+        def call(item):
+            try:
+                return task(item)
+            except (DatabaseError, registration.RegistrationError) as e:
+                return f"error: {type(e).__name__}"
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(call, items))
+
+    def verify(self, event, seats, waiting, cancelled):
+        counts = Counter(
+            EventRegistration.objects.filter(event=event).values_list(
+                "status", flat=True
+            )
+        )
+        capacity = EventCapacity.objects.get(event=event)
+        seats_taken = capacity.seats_taken
+        self.stdout.write(f"final:    {dict(counts)}  seats_taken={seats_taken}")
+
+        problems = []
+        if counts["registered"] > seats:
+            problems.append(f"oversold: {counts['registered']} > {seats}")
+        if counts["registered"] != seats_taken:
+            problems.append(
+                f"counter drift: {seats_taken} taken, {counts['registered']} seated"
+            )
+        for status, total in counts.items():
+            if getattr(capacity, f"{status}_count") != total:
+                problems.append(f"{status}_count drift")
+        if counts["waitlist"] and counts["registered"] < seats:
+            problems.append("free seats left while users are waitlisted")
+        promoted = set(
+            EventRegistration.objects.filter(
+                pk__in=waiting, status="registered"
+            ).values_list("pk", flat=True)
+        )
+        expected = set(waiting[: len(promoted)])
+        if promoted != expected:
+            problems.append("waitlist was not promoted in FIFO order")
+        if len(promoted) > cancelled:
+            problems.append(f"{len(promoted)} promoted for {cancelled} cancellations")
+
+        if problems:
+            raise CommandError("; ".join(problems))
+        self.stdout.write(self.style.SUCCESS(f"OK: {len(promoted)} promoted in order"))
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from apps.events.models import Event, EventCapacity, EventRegistration
+from apps.events.registration import SEATED, STATUSES, ensure_capacity
+
+COUNT_FIELDS = [f"{status}_count" for status in STATUSES]
+
+
+def recount(event_ids=None):
+    """Per-event ``{status: total}`` from ``event_registrations``."""
+    registrations = EventRegistration.objects.all()
+    if event_ids is not None:
+        registrations = registrations.filter(event_id__in=event_ids)
+    counts = {}
+    for row in registrations.values("event_id", "status").annotate(total=Count("pk")):
+        counts.setdefault(row["event_id"], {})[row["status"]] = row["total"]
+    return counts
+
+
+def expected_values(counts, capacity):
+    values = {f"{status}_count": counts.get(status, 0) for status in STATUSES}
+    values["seats_taken"] = sum(counts.get(status, 0) for status in SEATED)
+    values["max_seats"] = capacity.event.max_attendess
+    return values
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute per-event registration counters and seats taken from "
+        "event_registrations, fixing any that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Report drift without fixing it."
+        )
+
+    def handle(self, *args, **options):
+        for event in Event.objects.filter(capacity__isnull=True).iterator():
+            ensure_capacity(event)
+
+        counts = recount()
+        drifted = []
+        capacities = EventCapacity.objects.select_related("event").only(
+            "event__max_attendess", "seats_taken", "max_seats", *COUNT_FIELDS
+        )
+        for capacity in capacities.iterator(chunk_size=2000):
+            values = expected_values(counts.get(capacity.event_id, {}), capacity)
+            if any(getattr(capacity, name) != value for name, value in values.items()):
+                drifted.append(capacity.event_id)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{len(drifted)} events have drifted counters.")
+            return
+
+        for event_id in drifted:
+            # Lock the counter row and count again, so registrations made since
+            # the first pass are not overwritten.
+            with transaction.atomic():
+                capacity = (
+                    EventCapacity.objects.select_for_update(of=("self",))
+                    .select_related("event")
+                    .get(event_id=event_id)
+                )
+                values = expected_values(
+                    recount([event_id]).get(event_id, {}), capacity
+                )
+                EventCapacity.objects.filter(event_id=event_id).update(**values)
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {len(drifted)} events."))
@@ -0,0 +1,195 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:23
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Event",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("title", models.CharField(max_length=255)),
+                ("description", models.TextField(blank=True, null=True)),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("networking", "Networking"),
+                            ("reunion", "Reunion"),
+                            ("workshop", "Workshop"),
+                            ("webinar", "Webinar"),
+                            ("social", "Social"),
+                            ("career", "Career"),
+                            ("fundraising", "Fundraising"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("start_date", models.DateTimeField(blank=True, null=True)),
+                ("end_date", models.DateTimeField(blank=True, null=True)),
+                ("location", models.CharField(blank=True, max_length=255, null=True)),
+                ("is_virtual", models.BooleanField(default=False)),
+                ("virtual_link", models.URLField(blank=True, null=True)),
+                ("max_attendess", models.PositiveIntegerField(blank=True, null=True)),
+                ("registration_deadline", models.DateTimeField(blank=True, null=True)),
+                ("is_public", models.BooleanField(default=True)),
+                ("requires_approval", models.BooleanField(default=False)),
+                (
+                    "featured_image",
+                    models.ImageField(blank=True, null=True, upload_to="events/"),
+                ),
+                ("tags", models.JSONField(blank=True, default=list, null=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("draft", "Draft"),
+                            ("published", "Published"),
+                            ("cancelled", "Cancelled"),
+                            ("completed", "Completed"),
+                        ],
+                        default="draft",
+                        max_length=50,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "organizer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="organized_events",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "events",
+            },
+        ),
+        migrations.CreateModel(
+            name="EventRegistration",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("registered", "Registered"),
+                            ("attended", "Attended"),
+                            ("cancelled", "Cancelled"),
+                            ("waitlist", "Waitlist"),
+                        ],
+                        default="registered",
+                        max_length=50,
+                    ),
+                ),
+                ("registration_date", models.DateTimeField(auto_now_add=True)),
+                ("special_requirements", models.TextField(blank=True, null=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="registrations",
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="event_registrations",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "event_registrations",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["title"], name="events_title_245cc9_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["start_date"], name="events_start_d_6c01fc_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["end_date"], name="events_end_dat_f7b00b_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["organizer"], name="events_organiz_1c7a2e_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["status"], name="events_status_8890b6_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["event_type"], name="events_event_t_c9f56c_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["is_public"], name="events_is_publ_cf11db_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["tags"], name="events_tags_ada5a8_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["created_at"], name="events_created_9e2206_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["updated_at"], name="events_updated_1a904d_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["registration_deadline"], name="events_registr_bad500_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["location"], name="events_locatio_2a4a74_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["-created_at", "-id"], name="event_created_idx"),
+        ),
+        migrations.AlterUniqueTogether(
+            name="eventregistration",
+            unique_together={("event", "user")},
+        ),
+    ]
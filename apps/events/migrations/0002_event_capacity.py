@@ -0,0 +1,65 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def create_capacities(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    EventCapacity = apps.get_model("events", "EventCapacity")
+    events = Event.objects.annotate(
+        seated=Count(
+            "registrations",
+            filter=Q(registrations__status__in=["registered", "attended"]),
+        )
+    ).values_list("pk", "max_attendess", "seated")
+    EventCapacity.objects.bulk_create(
+        (
+            EventCapacity(event_id=pk, max_seats=max_seats, seats_taken=seated)
+            for pk, max_seats, seated in events.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventCapacity",
+            fields=[
+                (
+                    "event",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="capacity",
+                        serialize=False,
+                        to="events.event",
+                    ),
+                ),
+                ("max_seats", models.PositiveIntegerField(blank=True, null=True)),
+                ("seats_taken", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Event Capacity",
+                "verbose_name_plural": "Event Capacities",
+                "db_table": "event_capacity",
+            },
+        ),
+        migrations.RunPython(create_capacities, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="eventregistration",
+            index=models.Index(
+                fields=["event", "status", "registration_date"],
+                name="registration_queue_idx",
+            ),
+        ),
+    ]
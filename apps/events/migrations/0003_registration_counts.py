@@ -0,0 +1,54 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:44
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counts(apps, schema_editor):
+    EventCapacity = apps.get_model("events", "EventCapacity")
+    EventRegistration = apps.get_model("events", "EventRegistration")
+    counts = {}
+    for row in EventRegistration.objects.values("event_id", "status").annotate(
+        total=Count("pk")
+    ):
+        counts.setdefault(row["event_id"], {})[row["status"]] = row["total"]
+    capacities = list(EventCapacity.objects.filter(event_id__in=counts))
+    for capacity in capacities:
+        for status, total in counts[capacity.event_id].items():
+            setattr(capacity, f"{status}_count", total)
+    EventCapacity.objects.bulk_update(
+        capacities,
+        ["registered_count", "attended_count", "waitlist_count", "cancelled_count"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0002_event_capacity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="eventcapacity",
+            name="attended_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="eventcapacity",
+            name="cancelled_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="eventcapacity",
+            name="registered_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="eventcapacity",
+            name="waitlist_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
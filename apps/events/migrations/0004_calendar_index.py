@@ -0,0 +1,22 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_registration_counts"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["status", "is_public", "start_date", "end_date"],
+                name="event_calendar_idx",
+            ),
+        ),
+    ]
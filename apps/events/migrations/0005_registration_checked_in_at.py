@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0004_calendar_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="eventregistration",
+            name="checked_in_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,8 @@
 import uuid
+from django.contrib.auth import get_user_model
 from django.db import models
-from apps.users.models import User
+
+User = get_user_model()
 
 # Create your models here.
 
@@ -29,7 +31,7 @@ EVENT_REGISTRATION_STATUS_CHOICE = [
 
 
 class Event(models.Model):
-    id = models.AutoField(primary_key=True, default=uuid.uuid4)
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     organizer = models.ForeignKey(
@@ -46,7 +48,7 @@ class Event(models.Model):
     is_public = models.BooleanField(default=True)
     requires_approval = models.BooleanField(default=False)
     featured_image = models.ImageField(upload_to="events/", blank=True, null=True)
-    tags = models.JSONFIELD(default=list, blank=True, null=True)
+    tags = models.JSONField(default=list, blank=True, null=True)
     status = models.CharField(
         max_length=50, choices=EVENT_STATUS_CHOICE, default="draft"
     )
@@ -71,11 +73,18 @@ class Event(models.Model):
             models.Index(fields=["updated_at"]),
             models.Index(fields=["registration_deadline"]),
             models.Index(fields=["location"]),
+            models.Index(fields=["-created_at", "-id"], name="event_created_idx"),
+            # Calendar overlap queries: equality on status/is_public, range on
+            # start_date, with end_date checked from the index entry.
+            models.Index(
+                fields=["status", "is_public", "start_date", "end_date"],
+                name="event_calendar_idx",
+            ),
         ]
 
 
 class EventRegistration(models.Model):
-    id = models.AutoField(primary_key=True, default=uuid.uuid4)
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     event = models.ForeignKey(
         Event, on_delete=models.CASCADE, related_name="registrations"
     )
@@ -87,10 +96,47 @@ class EventRegistration(models.Model):
     )
     registration_date = models.DateTimeField(auto_now_add=True)
     special_requirements = models.TextField(blank=True, null=True)
+    checked_in_at = models.DateTimeField(blank=True, null=True)
 
     class Meta:
         db_table = "event_registrations"
         unique_together = (("event", "user"),)
+        indexes = [
+            # Waitlist promotion takes the oldest waiting registration first.
+            models.Index(
+                fields=["event", "status", "registration_date"],
+                name="registration_queue_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} - {self.event.title}"
+
+
+class EventCapacity(models.Model):
+    """Seat and registration counters for an event.
+
+    Kept in its own row so that seat allocation never locks the ``events``
+    row itself, and so that saving an ``Event`` can never write back stale
+    counts. ``max_seats`` mirrors ``Event.max_attendess``; null means
+    unlimited. The ``*_count`` columns count registrations per status and
+    are maintained by ``apps.events.registration``.
+    """
+
+    event = models.OneToOneField(
+        Event, on_delete=models.CASCADE, primary_key=True, related_name="capacity"
+    )
+    max_seats = models.PositiveIntegerField(blank=True, null=True)
+    seats_taken = models.PositiveIntegerField(default=0)
+    registered_count = models.PositiveIntegerField(default=0)
+    attended_count = models.PositiveIntegerField(default=0)
+    waitlist_count = models.PositiveIntegerField(default=0)
+    cancelled_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "event_capacity"
+        verbose_name = "Event Capacity"
+        verbose_name_plural = "Event Capacities"
 
     def __str__(self):
-        return f"{self.user.username} - {self.event.title}"
+        return f"{self.event_id}: {self.seats_taken}/{self.max_seats or '∞'}"
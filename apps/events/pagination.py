@@ -0,0 +1,8 @@
+from config.pagination import KeysetPagination
+
+
+class RegistrationPagination(KeysetPagination):
+    """Registrations in sign-up order, which is also waitlist order."""
+
+    ordering = ("registration_date", "pk")
+    page_size = 50
@@ -0,0 +1,167 @@
+"""
+Seat allocation for event registrations.
+
+Every event has one ``EventCapacity`` row. A seat is taken with a single
+conditional ``UPDATE ... SET seats_taken = seats_taken + 1 WHERE
+seats_taken < max_seats``. The database serialises concurrent updates of
+that row and re-checks the condition for each of them, so a burst of
+registrations cannot oversell. Registrations that do not get a seat are
+waitlisted. A freed seat goes to the oldest waitlisted registration.
+
+The same row carries per-status registration counts. Every change of a
+registration's status made here adjusts them in the statement that moves
+the seat, so they stay exact without counting ``event_registrations``.
+Changes made elsewhere (the admin, raw SQL) are repaired by
+``reconcile_event_counts``.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.events.models import EventCapacity, EventRegistration
+from config.cache import invalidate_tags
+
+STATUSES = ("registered", "attended", "waitlist", "cancelled")
+SEATED = ("registered", "attended")
+CLOSED_EVENT_STATUSES = ("cancelled", "completed")
+
+
+class RegistrationError(Exception):
+    pass
+
+
+def ensure_capacity(event):
+    EventCapacity.objects.bulk_create(
+        [EventCapacity(event=event, max_seats=event.max_attendess)],
+        ignore_conflicts=True,
+    )
+
+
+def count_changes(**deltas):
+    """``registered=1, waitlist=-1`` to ``UPDATE`` expressions on the counts."""
+    return {
+        f"{status}_count": F(f"{status}_count") + delta
+        for status, delta in deltas.items()
+        if delta
+    }
+
+
+def adjust_counts(event_id, **deltas):
+    changes = count_changes(**deltas)
+    if changes:
+        EventCapacity.objects.filter(event_id=event_id).update(**changes)
+
+
+def take_seat(event_id, **deltas):
+    """Claim one seat and apply ``deltas``; returns False when full."""
+    return bool(
+        EventCapacity.objects.filter(event_id=event_id)
+        .filter(Q(max_seats__isnull=True) | Q(seats_taken__lt=F("max_seats")))
+        .update(seats_taken=F("seats_taken") + 1, **count_changes(**deltas))
+    )
+
+
+def release_seat(event_id, **deltas):
+    EventCapacity.objects.filter(event_id=event_id, seats_taken__gt=0).update(
+        seats_taken=F("seats_taken") - 1, **count_changes(**deltas)
+    )
+
+
+def change_status(registration, status):
+    """Move ``registration`` to ``status``, keeping seats and counts in step.
+
+    Returns the previous status, or None if it already had ``status``.
+    """
+    registrations = EventRegistration.objects.filter(pk=registration.pk)
+    with transaction.atomic():
+        # Write before reading so the row lock (on SQLite, the database write
+        # lock) is held from the start and concurrent changes queue up.
+        for previous in STATUSES:
+            if previous != status and registrations.filter(status=previous).update(
+                status=status
+            ):
+                break
+        else:
+            return None
+
+        deltas = {previous: -1, status: 1}
+        if previous in SEATED and status not in SEATED:
+            release_seat(registration.event_id, **deltas)
+            promote_waitlist(registration.event_id)
+        elif status in SEATED and previous not in SEATED:
+            if not take_seat(registration.event_id, **deltas):
+                raise RegistrationError("This event is full.")
+        else:
+            adjust_counts(registration.event_id, **deltas)
+        transaction.on_commit(lambda: invalidate_tags("events"))
+    registration.status = status
+    return previous
+
+
+def register(event, user, special_requirements=None):
+    """Register ``user``, seated if a seat is free and waitlisted otherwise."""
+    if event.status in CLOSED_EVENT_STATUSES:
+        raise RegistrationError("This event is no longer open for registration.")
+    if event.registration_deadline and event.registration_deadline < timezone.now():
+        raise RegistrationError("The registration deadline has passed.")
+
+    ensure_capacity(event)
+    try:
+        with transaction.atomic():
+            # The seat and the registration commit together or not at all.
+            status = "registered"
+            if not take_seat(event.pk, registered=1):
+                status = "waitlist"
+                adjust_counts(event.pk, waitlist=1)
+            return EventRegistration.objects.create(
+                event=event,
+                user=user,
+                status=status,
+                special_requirements=special_requirements,
+            )
+    except IntegrityError:
+        raise RegistrationError("You have already registered for this event.")
+
+
+def cancel(registration, delete=False):
+    """Cancel (or delete) a registration, passing its seat to the waitlist."""
+    with transaction.atomic():
+        change_status(registration, "cancelled")
+        if delete:
+            EventRegistration.objects.filter(pk=registration.pk).delete()
+            adjust_counts(registration.event_id, cancelled=-1)
+    return registration
+
+
+def promote_waitlist(event_id):
+    """Seat waitlisted registrations, oldest first, while seats are free.
+
+    Returns the promoted registrations.
+    """
+    promoted = []
+    with transaction.atomic():
+        while True:
+            candidate = (
+                EventRegistration.objects.select_for_update(skip_locked=True)
+                .filter(event_id=event_id, status="waitlist")
+                .order_by("registration_date", "pk")
+                .first()
+            )
+            if candidate is None or not take_seat(event_id, registered=1, waitlist=-1):
+                return promoted
+            candidate.status = "registered"
+            candidate.save(update_fields=["status"])
+            promoted.append(candidate)
+
+
+def sync_capacity(event):
+    """Apply a changed ``max_attendess`` and fill any seats it opened up."""
+    ensure_capacity(event)
+    changed = (
+        EventCapacity.objects.filter(event=event)
+        .exclude(max_seats=event.max_attendess)
+        .update(max_seats=event.max_attendess)
+    )
+    if changed:
+        promote_waitlist(event.pk)
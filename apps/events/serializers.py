@@ -1,16 +1,20 @@
-from events.models import (
+from django.contrib.auth import get_user_model
+from rest_framework import serializers
+
+from apps.events import checkin, registration as seats
+from apps.events.models import (
     Event,
     EventRegistration,
 )
-from rest_framework import serializers
+from config.serializers import RowSerializer
 
-from apps.users.models import User
+User = get_user_model()
 
 
 class OrganizerSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ("id", "username", "email")
+        fields = ("id", "first_name", "last_name", "email")
 
 
 class EventRegistrationSerializer(serializers.ModelSerializer):
@@ -28,9 +32,52 @@ class EventRegistrationSerializer(serializers.ModelSerializer):
             "user_id",
             "status",
             "registration_date",
+            "checked_in_at",
             "special_requirements",
         ]
-        read_only_fields = ("id", "registration_date")
+        # Status is managed by seat allocation; see apps.events.registration.
+        read_only_fields = ("id", "status", "registration_date", "checked_in_at")
+
+
+class EventRegistrationUpdateSerializer(EventRegistrationSerializer):
+    """Updates keep the event and the user: moving a registration would
+    bypass seat allocation. Cancel it and register again instead."""
+
+    class Meta(EventRegistrationSerializer.Meta):
+        fields = [
+            field
+            for field in EventRegistrationSerializer.Meta.fields
+            if field != "user_id"
+        ]
+        read_only_fields = (*EventRegistrationSerializer.Meta.read_only_fields, "event")
+
+    def validate(self, attrs):
+        errors = {}
+        event = self.initial_data.get("event")
+        if event is not None and str(event) != str(self.instance.event_id):
+            errors["event"] = (
+                "A registration cannot move to another event; cancel it and "
+                "register for the other event."
+            )
+        user_id = self.initial_data.get("user_id")
+        if user_id is not None and str(user_id) != str(self.instance.user_id):
+            errors["user_id"] = "A registration cannot be given to another user."
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+
+class RegistrationStatusSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=seats.STATUSES)
+
+
+class CheckInSerializer(serializers.Serializer):
+    """A batch of scans. Each scan is checked by ``checkin.check_in``, which
+    rejects a malformed one without failing the rest of the batch."""
+
+    scans = serializers.ListField(
+        child=serializers.JSONField(), max_length=checkin.MAX_BATCH
+    )
 
 
 class EventSerializer(serializers.ModelSerializer):
@@ -38,7 +85,18 @@ class EventSerializer(serializers.ModelSerializer):
     organizer_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), source="organizer", write_only=True
     )
-    registrations = EventRegistrationSerializer(many=True, read_only=True)
+    registered_count = serializers.IntegerField(
+        source="capacity.registered_count", read_only=True
+    )
+    attended_count = serializers.IntegerField(
+        source="capacity.attended_count", read_only=True
+    )
+    waitlist_count = serializers.IntegerField(
+        source="capacity.waitlist_count", read_only=True
+    )
+    cancelled_count = serializers.IntegerField(
+        source="capacity.cancelled_count", read_only=True
+    )
 
     class Meta:
         model = Event
@@ -63,7 +121,10 @@ class EventSerializer(serializers.ModelSerializer):
             "status",
             "created_at",
             "updated_at",
-            "registrations",
+            "registered_count",
+            "attended_count",
+            "waitlist_count",
+            "cancelled_count",
         ]
         read_only_fields = ("id", "created_at", "updated_at")
 
@@ -71,6 +132,12 @@ class EventSerializer(serializers.ModelSerializer):
 # Optional: for event listing only
 class EventListSerializer(serializers.ModelSerializer):
     organizer = OrganizerSerializer(read_only=True)
+    registered_count = serializers.IntegerField(
+        source="capacity.registered_count", read_only=True
+    )
+    waitlist_count = serializers.IntegerField(
+        source="capacity.waitlist_count", read_only=True
+    )
 
     class Meta:
         model = Event
@@ -84,4 +151,21 @@ class EventListSerializer(serializers.ModelSerializer):
             "is_virtual",
             "status",
             "organizer",
+            "max_attendess",
+            "registered_count",
+            "waitlist_count",
         ]
+
+
+class EventCalendarSerializer(RowSerializer):
+    fields = {
+        "id": "id",
+        "title": "title",
+        "event_type": "event_type",
+        "status": "status",
+        "start_date": "start_date",
+        "end_date": "end_date",
+        "location": "location",
+        "is_virtual": "is_virtual",
+        "is_public": "is_public",
+    }
@@ -0,0 +1,17 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.events import registration
+from apps.events.models import Event, EventRegistration
+from config.cache import USER_DISPLAY_FIELDS, invalidate_on_change
+
+invalidate_on_change(Event, "events")
+invalidate_on_change(EventRegistration, "events")
+invalidate_on_change(get_user_model(), "events", fields=USER_DISPLAY_FIELDS)
+
+
+@receiver(post_save, sender=Event)
+def sync_event_capacity(sender, instance, raw=False, **kwargs):
+    if not raw:
+        registration.sync_capacity(instance)
@@ -1,3 +1,357 @@
-from django.test import TestCase
+import base64
+import datetime
 
-# Create your tests here.
+import orjson
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.events import checkin, registration as seats
+from apps.events.models import Event, EventCapacity, EventRegistration
+
+User = get_user_model()
+
+
+def make_user(email):
+    return User.objects.create_user(email=email, password="x", is_active=True)
+
+
+def make_event(organizer, max_attendess=None, **fields):
+    return Event.objects.create(
+        title=fields.pop("title", "Reunion"),
+        organizer=organizer,
+        event_type="reunion",
+        status="published",
+        max_attendess=max_attendess,
+        **fields,
+    )
+
+
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def capacity(event):
+    return EventCapacity.objects.get(event=event)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class RegistrationUpdateTests(TestCase):
+    def setUp(self):
+        self.organizer = make_user("organizer@example.com")
+        self.attendee = make_user("attendee@example.com")
+        self.event = make_event(self.organizer, max_attendess=1)
+        self.other_event = make_event(self.organizer, max_attendess=1, title="Gala")
+        seats.register(self.other_event, make_user("seated@example.com"))
+        self.registration = seats.register(self.event, self.attendee)
+        self.url = f"/api/registrations/{self.registration.pk}/"
+
+    def test_cannot_move_registration_to_another_event(self):
+        response = api_client(self.attendee).patch(
+            self.url, {"event": str(self.other_event.pk)}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.registration.refresh_from_db()
+        self.assertEqual(self.registration.event_id, self.event.pk)
+        self.assertEqual(capacity(self.event).seats_taken, 1)
+        self.assertEqual(capacity(self.other_event).seats_taken, 1)
+
+    def test_cannot_give_registration_to_another_user(self):
+        other = make_user("other@example.com")
+        response = api_client(self.attendee).patch(
+            self.url, {"user_id": str(other.pk)}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.registration.refresh_from_db()
+        self.assertEqual(self.registration.user_id, self.attendee.pk)
+
+    def test_registrant_can_update_special_requirements(self):
+        response = api_client(self.attendee).patch(
+            self.url, {"special_requirements": "Step-free access"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.registration.refresh_from_db()
+        self.assertEqual(self.registration.special_requirements, "Step-free access")
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class OrganizerUpdateTests(TestCase):
+    def setUp(self):
+        self.organizer = make_user("organizer@example.com")
+        self.attendee = make_user("attendee@example.com")
+        self.event = make_event(self.organizer, max_attendess=5)
+        self.registration = seats.register(self.event, self.attendee)
+        self.url = f"/api/registrations/{self.registration.pk}/"
+
+    def test_organizer_cannot_reassign_user(self):
+        other = make_user("other@example.com")
+        response = api_client(self.organizer).patch(
+            self.url, {"user_id": str(other.pk)}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.registration.refresh_from_db()
+        self.assertEqual(self.registration.user_id, self.attendee.pk)
+
+    def test_organizer_cannot_edit_details(self):
+        response = api_client(self.organizer).patch(
+            self.url, {"special_requirements": "None"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_organizer_status_change_keeps_counts(self):
+        response = api_client(self.organizer).patch(
+            self.url, {"status": "cancelled"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], "cancelled")
+        counts = capacity(self.event)
+        self.assertEqual((counts.seats_taken, counts.cancelled_count), (0, 1))
+
+    def test_organizer_check_in_sets_checked_in_at(self):
+        response = api_client(self.organizer).patch(
+            self.url, {"status": "attended"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.registration.refresh_from_db()
+        self.assertEqual(self.registration.status, "attended")
+        self.assertIsNotNone(self.registration.checked_in_at)
+        counts = capacity(self.event)
+        self.assertEqual((counts.registered_count, counts.attended_count), (0, 1))
+
+    def test_registrant_cannot_change_status(self):
+        response = api_client(self.attendee).patch(
+            self.url, {"status": "attended"}, format="json"
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.event = make_event(make_user("organizer@example.com"))
+        self.url = f"/api/events/{self.event.pk}/"
+        self.etag = APIClient().get(self.url)["ETag"]
+
+    def get(self, if_none_match):
+        return APIClient().get(self.url, HTTP_IF_NONE_MATCH=if_none_match)
+
+    def test_matching_tags(self):
+        strong = self.etag.removeprefix("W/")
+        for header in (self.etag, strong, f'"other", {self.etag}', "*"):
+            with self.subTest(header=header):
+                response = self.get(header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], self.etag)
+
+    def test_other_tags(self):
+        for header in ('"other"', 'W/"other", "again"', self.etag[:-2] + '"', ""):
+            with self.subTest(header=header):
+                self.assertEqual(self.get(header).status_code, 200)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class RegistrationCursorTests(TestCase):
+    def setUp(self):
+        self.event = make_event(make_user("organizer@example.com"))
+        self.registrations = [
+            seats.register(self.event, make_user(f"guest{n}@example.com"), None)
+            for n in range(5)
+        ]
+        self.url = f"/api/events/{self.event.pk}/registrations/"
+
+    def cursor(self, position):
+        return base64.urlsafe_b64encode(orjson.dumps(position)).decode().rstrip("=")
+
+    def test_pages_follow_sign_up_order(self):
+        client = APIClient()
+        seen = []
+        url = f"{self.url}?cursor=&page_size=2"
+        while url:
+            page = client.get(url).json()
+            self.assertLessEqual(len(page["results"]), 2)
+            seen += [row["id"] for row in page["results"]]
+            url = page["next"]
+        self.assertEqual(
+            seen, [str(registration.pk) for registration in self.registrations]
+        )
+
+    def test_malformed_cursors_are_not_found(self):
+        valid_date = self.registrations[0].registration_date.isoformat()
+        for cursor in (
+            "%%%",
+            self.cursor({"a": 1}),
+            self.cursor([valid_date]),
+            self.cursor(["yesterday", str(self.registrations[0].pk)]),
+            self.cursor([valid_date, "not-a-uuid"]),
+            self.cursor([None, str(self.registrations[0].pk)]),
+            self.cursor([[valid_date], str(self.registrations[0].pk)]),
+            self.cursor([1, 2]),
+        ):
+            with self.subTest(cursor=cursor):
+                response = APIClient().get(self.url, {"cursor": cursor})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {"detail": "Invalid cursor."})
+
+
+class SeatAllocationTests(TestCase):
+    def setUp(self):
+        self.event = make_event(make_user("organizer@example.com"), max_attendess=2)
+        self.guests = [make_user(f"guest{n}@example.com") for n in range(4)]
+
+    def register_all(self):
+        return [seats.register(self.event, guest) for guest in self.guests]
+
+    def counts(self):
+        row = capacity(self.event)
+        return (
+            row.seats_taken,
+            row.registered_count,
+            row.waitlist_count,
+            row.cancelled_count,
+        )
+
+    def test_seats_then_waitlist(self):
+        statuses = [registration.status for registration in self.register_all()]
+        self.assertEqual(statuses, ["registered", "registered", "waitlist", "waitlist"])
+        self.assertEqual(self.counts(), (2, 2, 2, 0))
+
+    def test_registering_twice_is_refused(self):
+        seats.register(self.event, self.guests[0])
+        with self.assertRaises(seats.RegistrationError):
+            seats.register(self.event, self.guests[0])
+        self.assertEqual(self.counts(), (1, 1, 0, 0))
+
+    def test_closed_event_is_refused(self):
+        self.event.status = "cancelled"
+        with self.assertRaises(seats.RegistrationError):
+            seats.register(self.event, self.guests[0])
+
+    def test_cancelling_promotes_the_oldest_waitlisted(self):
+        first, _, oldest_waiting, next_waiting = self.register_all()
+        seats.cancel(first)
+        self.assertEqual(
+            EventRegistration.objects.get(pk=oldest_waiting.pk).status, "registered"
+        )
+        self.assertEqual(
+            EventRegistration.objects.get(pk=next_waiting.pk).status, "waitlist"
+        )
+        self.assertEqual(self.counts(), (2, 2, 1, 1))
+
+    def test_deleting_a_waitlisted_registration_frees_no_seat(self):
+        registrations = self.register_all()
+        seats.cancel(registrations[3], delete=True)
+        self.assertFalse(
+            EventRegistration.objects.filter(pk=registrations[3].pk).exists()
+        )
+        self.assertEqual(self.counts(), (2, 2, 1, 0))
+
+    def test_raising_capacity_seats_the_waitlist(self):
+        self.register_all()
+        self.event.max_attendess = 3
+        seats.sync_capacity(self.event)
+        self.assertEqual(self.counts(), (3, 3, 1, 0))
+
+    def test_seating_a_waitlisted_registration_needs_a_free_seat(self):
+        waiting = self.register_all()[2]
+        with self.assertRaises(seats.RegistrationError):
+            seats.change_status(waiting, "registered")
+        self.assertEqual(self.counts(), (2, 2, 2, 0))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class CheckInTests(TestCase):
+    def setUp(self):
+        self.organizer = make_user("organizer@example.com")
+        self.event = make_event(self.organizer, max_attendess=2)
+        self.seated = [
+            seats.register(self.event, make_user(f"guest{n}@example.com"))
+            for n in range(2)
+        ]
+        self.waiting = seats.register(self.event, make_user("late@example.com"))
+        self.now = timezone.now()
+
+    def scan(self, registration, minutes_ago):
+        return {
+            "token": checkin.qr_token(registration),
+            "scanned_at": (
+                self.now - datetime.timedelta(minutes=minutes_ago)
+            ).isoformat(),
+        }
+
+    def batch(self):
+        return [
+            self.scan(self.seated[0], 5),
+            self.scan(self.seated[1], 3),
+            # The same ticket scanned twice; the earlier scan wins.
+            self.scan(self.seated[0], 9),
+            self.scan(self.waiting, 1),
+            {"token": "forged:token"},
+        ]
+
+    def test_batch(self):
+        result = checkin.check_in(self.event, self.batch()).as_dict()
+        self.assertEqual(result["checked_in"], 2)
+        self.assertEqual(result["duplicates"], 1)
+        self.assertEqual(
+            sorted(rejection["reason"] for rejection in result["rejected"]),
+            ["invalid token", "registration is waitlist"],
+        )
+        first, second = (
+            EventRegistration.objects.get(pk=registration.pk)
+            for registration in self.seated
+        )
+        self.assertEqual(first.status, "attended")
+        # Each row gets its own time from the CASE expression.
+        self.assertEqual(first.checked_in_at, self.now - datetime.timedelta(minutes=9))
+        self.assertEqual(second.checked_in_at, self.now - datetime.timedelta(minutes=3))
+        row = capacity(self.event)
+        self.assertEqual(
+            (row.registered_count, row.attended_count, row.seats_taken), (0, 2, 2)
+        )
+
+    def test_retrying_a_batch_changes_nothing(self):
+        checkin.check_in(self.event, self.batch())
+        result = checkin.check_in(self.event, self.batch())
+        self.assertEqual((result.checked_in, result.duplicates), (0, 3))
+        self.assertEqual(capacity(self.event).attended_count, 2)
+
+    def test_ticket_for_another_event_is_rejected(self):
+        other = make_event(self.organizer)
+        stranger = seats.register(other, make_user("stranger@example.com"))
+        result = checkin.check_in(self.event, [checkin.qr_token(stranger)])
+        self.assertEqual(result.rejected[0]["reason"], "not registered for this event")
+
+    def test_only_the_organizer_uploads_scans(self):
+        url = f"/api/events/{self.event.pk}/check-in/"
+        response = api_client(self.seated[0].user).post(
+            url, {"scans": self.batch()}, format="json"
+        )
+        self.assertEqual(response.status_code, 403)
+        response = api_client(self.organizer).post(
+            url, {"scans": self.batch()}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["checked_in"], 2)
+
+    def test_malformed_bodies_are_rejected(self):
+        client = api_client(self.organizer)
+        check_in = f"/api/events/{self.event.pk}/check-in/"
+        set_status = f"/api/registrations/{self.seated[0].pk}/status/"
+        for url, body in (
+            (check_in, [self.scan(self.seated[0], 1)]),
+            (check_in, {"scans": "not-a-list"}),
+            (check_in, {"scans": [{}] * (checkin.MAX_BATCH + 1)}),
+            (set_status, ["attended"]),
+            (set_status, {"status": "lost"}),
+        ):
+            with self.subTest(url=url, body=str(body)[:40]):
+                response = client.post(url, body, format="json")
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(capacity(self.event).attended_count, 0)
+
+        response = client.post(set_status, {"status": "attended"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "attended")
@@ -1,5 +1,5 @@
 from rest_framework.routers import DefaultRouter
-from events.views import EventViewSet, EventRegistrationViewSet
+from apps.events.views import EventViewSet, EventRegistrationViewSet
 
 router = DefaultRouter()
 router.register(r"events", EventViewSet)
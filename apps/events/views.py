@@ -1,24 +1,40 @@
+import datetime
+from urllib.parse import urlencode
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.decorators import action
+from rest_framework.reverse import reverse
 
-from events.models import Event, EventRegistration
-from events.serializers import (
+from apps.events import checkin, ical, registration as seats
+from apps.events.models import Event, EventRegistration
+from apps.events.pagination import RegistrationPagination
+from apps.events.serializers import (
+    CheckInSerializer,
+    EventCalendarSerializer,
     EventSerializer,
     EventListSerializer,
     EventRegistrationSerializer,
+    EventRegistrationUpdateSerializer,
+    RegistrationStatusSerializer,
 )
-from apps.users.models import User
+from config.cache import CacheResponseMixin
+from config.pagination import TRUTHY, CreatedAtKeysetPagination
+from config.renderers import ORJSONRenderer
 
 
-class EventViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Event.objects.all()
-        .select_related("organizer")
-        .prefetch_related("registrations")
-    )
+class EventViewSet(CacheResponseMixin, viewsets.ModelViewSet):
+    queryset = Event.objects.all().select_related("organizer", "capacity")
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = CreatedAtKeysetPagination
+    cache_tags = ("events",)
+    cache_scope = "public"
+    # Longest window the calendar endpoint serves in one request.
+    calendar_max_days = 92
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -47,35 +63,219 @@ class EventViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=["get"], url_path="registrations")
     def registrations(self, request, pk=None):
-        """Get all registrations for a specific event"""
+        """Registrations for an event in sign-up order, a page at a time.
+
+        ``?status=`` narrows to one registration status.
+        """
         event = self.get_object()
         registrations = event.registrations.select_related("user")
-        serializer = EventRegistrationSerializer(registrations, many=True)
+        wanted = request.query_params.get("status")
+        if wanted:
+            registrations = registrations.filter(status=wanted)
+        paginator = RegistrationPagination()
+        page = paginator.paginate_queryset(
+            registrations.order_by(*paginator.ordering), request, view=self
+        )
+        serializer = EventRegistrationSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=["get"])
+    def calendar(self, request):
+        """Events overlapping ``?start=`` to ``?end=`` (dates or datetimes).
+
+        Defaults to published events; ``?status=``, ``?event_type=`` and
+        ``?is_public=`` filter further. Anonymous callers only see public
+        events.
+        """
+        return self.cached_response(self.calendar_events, request)
+
+    def calendar_events(self, request):
+        start = self._window_param("start")
+        end = self._window_param("end")
+        if end <= start:
+            raise ValidationError({"end": "Must be after start."})
+        if end - start > datetime.timedelta(days=self.calendar_max_days):
+            raise ValidationError(
+                {"end": f"The window is limited to {self.calendar_max_days} days."}
+            )
+
+        params = request.query_params
+        events = Event.objects.filter(
+            status=params.get("status", "published"),
+            start_date__lt=end,
+        ).filter(
+            Q(end_date__gte=start) | Q(end_date__isnull=True, start_date__gte=start)
+        )
+        if not request.user.is_authenticated:
+            events = events.filter(is_public=True)
+        elif "is_public" in params:
+            events = events.filter(is_public=params["is_public"].lower() in TRUTHY)
+        if params.get("event_type"):
+            events = events.filter(event_type=params["event_type"])
+
+        serializer_class = EventCalendarSerializer
+        rows = events.values(*serializer_class.lookups(serializer_class.fields))
+        serializer = serializer_class(
+            rows.order_by("start_date", "pk"),
+            many=True,
+            context=self.get_serializer_context(),
+        )
         return Response(serializer.data)
 
+    def _window_param(self, name):
+        value = self.request.query_params.get(name, "")
+        try:
+            moment = parse_datetime(value)
+            if moment is None:
+                day = parse_date(value)
+                if day is not None:
+                    moment = datetime.datetime.combine(day, datetime.time.min)
+        except ValueError:
+            moment = None
+        if moment is None:
+            raise ValidationError({name: "Expected an ISO 8601 date or datetime."})
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"feed\.ics",
+        permission_classes=[permissions.AllowAny],
+        renderer_classes=[ical.ICalendarRenderer, ORJSONRenderer],
+    )
+    def feed(self, request):
+        """iCalendar feed of public events, or of one user's with ``?token=``."""
+        token = request.query_params.get("token")
+        if token is None:
+            return ical.feed_response(
+                request, ical.public_events(), "AlumniVerse events", public=True
+            )
+        user_id = ical.feed_user_id(token)
+        if user_id is None:
+            raise PermissionDenied("Invalid calendar feed token.")
+        return ical.feed_response(
+            request, ical.user_events(user_id), "My AlumniVerse events", public=False
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="feed-url",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def feed_url(self, request):
+        """The caller's personal feed URL, to subscribe to from a calendar app."""
+        url = reverse("event-feed", request=request)
+        return Response(
+            {"url": f"{url}?{urlencode({'token': ical.feed_token(request.user)})}"}
+        )
+
+    @action(detail=True, methods=["get"])
+    def roster(self, request, pk=None):
+        """Signed roster of seated registrations for offline check-in."""
+        event = self.get_object()
+        if event.organizer_id != request.user.pk:
+            raise PermissionDenied("Only the organizer can download the roster.")
+        return Response(checkin.roster(event))
+
+    @action(detail=True, methods=["post"], url_path="check-in")
+    def check_in(self, request, pk=None):
+        """Apply a batch of scanned QR tokens: ``{"scans": [{"token",
+        "scanned_at"}, ...]}``. Safe to retry.
+        """
+        event = self.get_object()
+        if event.organizer_id != request.user.pk:
+            raise PermissionDenied("Only the organizer can check attendees in.")
+        serializer = CheckInSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        scans = serializer.validated_data["scans"]
+        return Response(checkin.check_in(event, scans).as_dict())
+
 
 class EventRegistrationViewSet(viewsets.ModelViewSet):
     queryset = EventRegistration.objects.all().select_related("event", "user")
     serializer_class = EventRegistrationSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def perform_create(self, serializer):
-        user = self.request.user
-        event = serializer.validated_data["event"]
-
-        # Check for duplicate registration
-        if EventRegistration.objects.filter(event=event, user=user).exists():
-            raise PermissionDenied("You have already registered for this event.")
+    def get_serializer_class(self):
+        if self.action in ("update", "partial_update"):
+            return EventRegistrationUpdateSerializer
+        return EventRegistrationSerializer
 
-        serializer.save(user=user)
+    def perform_create(self, serializer):
+        try:
+            serializer.instance = seats.register(
+                serializer.validated_data["event"],
+                self.request.user,
+                serializer.validated_data.get("special_requirements"),
+            )
+        except seats.RegistrationError as e:
+            raise PermissionDenied(str(e))
 
     def perform_update(self, serializer):
+        """The registrant may edit their details; the organizer may only
+        change the status, as with ``POST .../status/``."""
         registration = serializer.instance
-        if registration.user != self.request.user:
-            raise PermissionDenied("You can only update your own registration.")
-        serializer.save()
+        user_id = self.request.user.pk
+        is_organizer = registration.event.organizer_id == user_id
+        if registration.user_id != user_id:
+            if not is_organizer:
+                raise PermissionDenied(
+                    "Only the registrant or the event organizer can update a "
+                    "registration."
+                )
+            other = sorted(set(self.request.data) - {"status"})
+            if other:
+                raise ValidationError(
+                    {field: "Organizers can only change the status." for field in other}
+                )
+        if "status" in self.request.data:
+            if not is_organizer:
+                raise PermissionDenied("Only the organizer can change the status.")
+            self._change_status(registration, self.request.data)
+        if registration.user_id == user_id:
+            serializer.save()
 
     def perform_destroy(self, instance):
         if instance.user != self.request.user:
             raise PermissionDenied("You can only cancel your own registration.")
-        instance.delete()
+        seats.cancel(instance, delete=True)
+
+    @action(detail=True, methods=["post"])
+    def cancel(self, request, pk=None):
+        """Cancel a registration, handing its seat to the waitlist."""
+        registration = self.get_object()
+        if registration.user != request.user:
+            raise PermissionDenied("You can only cancel your own registration.")
+        registration = seats.cancel(registration)
+        return Response(self.get_serializer(registration).data)
+
+    @action(detail=True, methods=["get"])
+    def ticket(self, request, pk=None):
+        """The QR token to present at the door."""
+        registration = self.get_object()
+        if registration.user_id != request.user.pk:
+            raise PermissionDenied("You can only view your own ticket.")
+        if registration.status not in seats.SEATED:
+            raise PermissionDenied("Only seated registrations have a ticket.")
+        return Response({"token": checkin.qr_token(registration)})
+
+    @action(detail=True, methods=["post"], url_path="status")
+    def set_status(self, request, pk=None):
+        """Let the organizer move a registration to another status."""
+        registration = self.get_object()
+        if registration.event.organizer_id != request.user.pk:
+            raise PermissionDenied("Only the organizer can change the status.")
+        self._change_status(registration, request.data)
+        return Response(self.get_serializer(registration).data)
+
+    def _change_status(self, registration, data):
+        serializer = RegistrationStatusSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        status_value = serializer.validated_data["status"]
+        try:
+            checkin.set_status(registration, status_value)
+        except seats.RegistrationError as e:
+            raise PermissionDenied(str(e))
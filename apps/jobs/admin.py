@@ -1,5 +1,5 @@
 from django.contrib import admin
-from jobs.models import Company, JobPosting, JobApplication
+from apps.jobs.models import Company, JobPosting, JobApplication
 
 
 class JobApplicationInline(admin.TabularInline):
@@ -48,7 +48,7 @@ class JobPostingAdmin(admin.ModelAdmin):
         "company__name",
         "location",
         "skills_required",
-        "posted_by__username",
+        "posted_by__email",
     )
     date_hierarchy = "created_at"
     autocomplete_fields = ("company", "posted_by")
@@ -112,6 +112,6 @@ class JobApplicationAdmin(admin.ModelAdmin):
         "last_updated",
     )
     list_filter = ("status", "applied_at", "last_updated")
-    search_fields = ("job__title", "applicant__username")
+    search_fields = ("job__title", "applicant__email")
     autocomplete_fields = ("job", "applicant")
     readonly_fields = ("applied_at", "last_updated")
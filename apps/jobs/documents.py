@@ -0,0 +1,348 @@
+"""
+Uploaded documents: resumes and application attachments.
+
+Uploads are read in ``CHUNK_SIZE`` pieces, hashed, and written to a
+temporary file, so memory use does not grow with the file size. The SHA-256
+of the content names the stored file (``documents/ab/cd/<sha256><ext>``) and
+is unique in ``StoredDocument``. A document that is uploaded again, by
+anyone, is linked to the existing row instead of being stored twice. The
+link (``DocumentOwner``) keeps the name each owner uploaded it under.
+
+Large files can be sent through a resumable ``UploadSession``. Chunks are
+written to a partial file under ``JOBS_UPLOAD_SESSION_DIR`` at the offset
+given in ``Content-Range``, and ``received`` records how far the upload
+got, so an interrupted upload continues from there. Completing a session
+stores the file like any other upload.
+
+Text is extracted later, outside the request, by the ``process_documents``
+command. It claims a batch of rows in a short transaction and parses them
+after the commit, so no row lock is held while a file is read.
+"""
+
+import datetime
+import hashlib
+import html
+import io
+import os
+import re
+import tempfile
+import zipfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.jobs.models import DocumentOwner, StoredDocument, UploadSession
+
+CHUNK_SIZE = 64 * 1024
+CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".doc": "application/msword",
+    ".docx": (
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    ),
+    ".odt": "application/vnd.oasis.opendocument.text",
+    ".rtf": "application/rtf",
+    ".txt": "text/plain",
+}
+XML_TAG_RE = re.compile(rb"<[^>]+>")
+# A claim older than this is taken to belong to a worker that died.
+CLAIM_TIMEOUT = datetime.timedelta(minutes=30)
+
+
+class UploadError(Exception):
+    pass
+
+
+def max_size():
+    return getattr(settings, "JOBS_UPLOAD_MAX_SIZE", 10 * 1024 * 1024)
+
+
+def extension(filename):
+    return os.path.splitext(filename or "")[1].lower()
+
+
+def check_type(filename):
+    """The content type for ``filename``; only document formats are accepted."""
+    content_type = CONTENT_TYPES.get(extension(filename))
+    if content_type is None:
+        raise UploadError(
+            f"Unsupported file type. Allowed: {', '.join(sorted(CONTENT_TYPES))}."
+        )
+    return content_type
+
+
+def copy(read, out, limit, digest=None):
+    """Copy ``read(n)`` chunks into ``out`` until EOF or ``limit`` bytes.
+
+    Returns the number of bytes copied; raises UploadError past ``limit``.
+    """
+    copied = 0
+    while True:
+        chunk = read(min(CHUNK_SIZE, limit - copied + 1))
+        if not chunk:
+            return copied
+        copied += len(chunk)
+        if copied > limit:
+            raise UploadError(f"Received more than the expected {limit} bytes.")
+        if digest is not None:
+            digest.update(chunk)
+        out.write(chunk)
+
+
+def file_digest(fileobj):
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def storage_name(sha256, filename):
+    return f"documents/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension(filename)}"
+
+
+def store(fileobj, sha256, size, filename, owner):
+    """The ``StoredDocument`` for this content, storing it if it is new.
+
+    ``filename`` is recorded for ``owner`` alone, and set on the returned
+    instance for the response.
+    """
+    content_type = check_type(filename)
+    filename = os.path.basename(filename)[:255]
+    document = StoredDocument.objects.filter(sha256=sha256).first()
+    if document is None:
+        fileobj.seek(0)
+        name = default_storage.save(storage_name(sha256, filename), File(fileobj))
+        try:
+            with transaction.atomic():
+                document = StoredDocument.objects.create(
+                    sha256=sha256,
+                    file=name,
+                    size=size,
+                    content_type=content_type,
+                )
+        except IntegrityError:
+            # Someone stored the same content concurrently; keep theirs.
+            default_storage.delete(name)
+            document = StoredDocument.objects.get(sha256=sha256)
+    if owner is not None:
+        DocumentOwner.objects.update_or_create(
+            document=document, owner=owner, defaults={"filename": filename}
+        )
+    document.filename = filename
+    return document
+
+
+def store_stream(read, filename, owner, length=None):
+    """Store a raw request body read through ``read(n)``."""
+    check_type(filename)
+    if length is not None and length > max_size():
+        raise UploadError(f"The file is larger than {max_size()} bytes.")
+    limit = max_size() if length is None else length
+    digest = hashlib.sha256()
+    with tempfile.TemporaryFile(dir=settings.FILE_UPLOAD_TEMP_DIR) as spool:
+        size = copy(read, spool, limit, digest)
+        if not size:
+            raise UploadError("The file is empty.")
+        return store(spool, digest.hexdigest(), size, filename, owner)
+
+
+def store_uploaded_file(uploaded, owner):
+    """Store a Django ``UploadedFile`` (multipart), deduplicated."""
+    if uploaded.size > max_size():
+        raise UploadError(f"The file is larger than {max_size()} bytes.")
+    return store(uploaded, file_digest(uploaded), uploaded.size, uploaded.name, owner)
+
+
+# Resumable uploads
+
+
+def session_dir():
+    path = Path(
+        getattr(settings, "JOBS_UPLOAD_SESSION_DIR", None)
+        or Path(settings.BASE_DIR) / "upload-sessions"
+    )
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def partial_path(session):
+    return session_dir() / f"{session.pk}.part"
+
+
+def open_session(owner, filename, size):
+    content_type = check_type(filename)
+    if size <= 0:
+        raise UploadError("The file is empty.")
+    if size > max_size():
+        raise UploadError(f"The file is larger than {max_size()} bytes.")
+    ttl = getattr(settings, "JOBS_UPLOAD_SESSION_TTL", 24 * 60 * 60)
+    return UploadSession.objects.create(
+        owner=owner,
+        filename=os.path.basename(filename)[:255],
+        content_type=content_type,
+        size=size,
+        expires_at=timezone.now() + datetime.timedelta(seconds=ttl),
+    )
+
+
+def write_chunk(session, start, length, read):
+    """Write ``length`` bytes at ``start``; returns the new ``received``.
+
+    ``start`` must equal ``session.received``: chunks arrive in order, and a
+    client that lost track asks the session how much was received.
+    """
+    if session.document_id is not None:
+        raise UploadError("This upload is already complete.")
+    if start != session.received:
+        raise UploadError(f"Expected a chunk starting at byte {session.received}.")
+    if start + length > session.size:
+        raise UploadError("The chunk runs past the declared file size.")
+
+    path = partial_path(session)
+    with open(path, "r+b" if path.exists() else "w+b") as part:
+        # Drop whatever an interrupted earlier attempt left past ``received``.
+        part.truncate(start)
+        part.seek(start)
+        written = copy(read, part, length)
+    if written != length:
+        raise UploadError(f"Expected {length} bytes, received {written}.")
+    received = start + written
+    updated = UploadSession.objects.filter(pk=session.pk, received=start).update(
+        received=received
+    )
+    if not updated:
+        raise UploadError("Another chunk was written concurrently; retry.")
+    session.received = received
+    return received
+
+
+def complete_session(session, sha256=None):
+    """Store the finished upload; ``sha256``, if given, must match."""
+    if session.document_id is not None:
+        return session.document
+    if session.received != session.size:
+        raise UploadError(
+            f"Only {session.received} of {session.size} bytes have been received."
+        )
+    path = partial_path(session)
+    with open(path, "rb") as part:
+        digest = file_digest(part)
+        if sha256 and sha256.lower() != digest:
+            raise UploadError("The checksum does not match the uploaded content.")
+        document = store(part, digest, session.size, session.filename, session.owner)
+    session.document = document
+    session.save(update_fields=["document"])
+    path.unlink(missing_ok=True)
+    return document
+
+
+def purge_sessions(now=None):
+    """Delete expired upload sessions and their partial files."""
+    expired = UploadSession.objects.filter(expires_at__lte=now or timezone.now())
+    ids = list(expired.values_list("pk", flat=True))
+    for pk in ids:
+        (session_dir() / f"{pk}.part").unlink(missing_ok=True)
+    UploadSession.objects.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+# Text extraction
+
+
+def text_limit():
+    return getattr(settings, "JOBS_DOCUMENT_TEXT_LIMIT", 200_000)
+
+
+def xml_limit():
+    return getattr(settings, "JOBS_DOCUMENT_XML_LIMIT", 20 * 1024 * 1024)
+
+
+def read_member(archive, name):
+    """``name`` from a zip ``archive``, refusing to inflate it past
+    ``xml_limit()`` bytes: a small upload can declare a huge member."""
+    limit = xml_limit()
+    if archive.getinfo(name).file_size > limit:
+        raise UploadError(f"{name} is larger than {limit} bytes.")
+    out = io.BytesIO()
+    with archive.open(name) as member:
+        copy(member.read, out, limit)
+    return out.getvalue()
+
+
+def extract_text(document):
+    """Plain text of ``document``, or None if its format is not supported."""
+    kind = extension(document.file.name)
+    with document.file.open("rb") as source:
+        if kind == ".txt":
+            return source.read(text_limit() * 4).decode("utf-8", errors="replace")
+        if kind in (".docx", ".odt"):
+            member = "word/document.xml" if kind == ".docx" else "content.xml"
+            with zipfile.ZipFile(source) as archive:
+                xml = read_member(archive, member)
+            # Paragraph ends become line breaks, every other tag is dropped.
+            xml = re.sub(rb"</(w:p|text:p|text:h)>", b"\n", xml)
+            return html.unescape(
+                XML_TAG_RE.sub(b"", xml).decode("utf-8", errors="replace")
+            )
+        if kind == ".pdf":
+            from pypdf import PdfReader
+
+            reader = PdfReader(io.BytesIO(source.read()))
+            pages = []
+            for page in reader.pages:
+                pages.append(page.extract_text() or "")
+                if sum(len(text) for text in pages) > text_limit():
+                    break
+            return "\n".join(pages)
+    return None
+
+
+def claim_pending(batch_size=20):
+    """Mark a batch of documents awaiting extraction as claimed; returns them."""
+    now = timezone.now()
+    with transaction.atomic():
+        documents = list(
+            StoredDocument.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(text_status="pending")
+                | Q(text_status="processing", text_claimed_at__lt=now - CLAIM_TIMEOUT)
+            )
+            .order_by("created_at")[:batch_size]
+        )
+        StoredDocument.objects.filter(
+            pk__in=[document.pk for document in documents]
+        ).update(text_status="processing", text_claimed_at=now)
+    for document in documents:
+        document.text_claimed_at = now
+    return documents
+
+
+def process_pending(batch_size=20):
+    """Extract text for a batch of pending documents; returns how many."""
+    documents = claim_pending(batch_size)
+    for document in documents:
+        text = ""
+        try:
+            extracted = extract_text(document)
+        except Exception:
+            status = "failed"
+        else:
+            if extracted is None:
+                status = "unsupported"
+            else:
+                text = extracted[: text_limit()].replace("\x00", "")
+                status = "done"
+        # Unless the claim expired and another worker took the row over.
+        StoredDocument.objects.filter(
+            pk=document.pk,
+            text_status="processing",
+            text_claimed_at=document.text_claimed_at,
+        ).update(text=text, text_status=status)
+    return len(documents)
@@ -0,0 +1,61 @@
+"""
+Closing job postings once they expire.
+
+``close_expired`` moves active postings whose ``expires_at`` or
+``application_deadline`` has passed to ``closed``, a bounded batch per
+``UPDATE`` so that no statement holds many row locks. The batches are found
+through the ``(status, expires_at)`` and ``(status, application_deadline)``
+indexes, one column at a time. It runs from the ``close_expired_jobs``
+management command, from cron or as a long-running process with ``--loop``.
+"""
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.jobs import matching
+from apps.jobs.models import JobPosting
+from config.cache import invalidate_tags
+
+BATCH_SIZE = 500
+# Columns that end a posting, each with a (status, column) index.
+DEADLINES = ("expires_at", "application_deadline")
+
+
+def expired_postings(now=None):
+    now = now or timezone.now()
+    return JobPosting.objects.filter(
+        Q(expires_at__lte=now) | Q(application_deadline__lte=now), status="active"
+    )
+
+
+def close_expired(now=None, batch_size=BATCH_SIZE):
+    """Close expired active postings; returns how many were closed."""
+    now = now or timezone.now()
+    return sum(close_past(deadline, now, batch_size) for deadline in DEADLINES)
+
+
+def close_past(deadline, now, batch_size):
+    """Close active postings whose ``deadline`` column has passed."""
+    closed = 0
+    while True:
+        ids = list(
+            JobPosting.objects.filter(status="active", **{f"{deadline}__lte": now})
+            .order_by(deadline)
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            # Re-check the status so postings changed since the SELECT are
+            # left alone.
+            count = JobPosting.objects.filter(pk__in=ids, status="active").update(
+                status="closed", updated_at=now
+            )
+            transaction.on_commit(lambda: invalidate_tags("jobs"))
+        for posting_id in ids:
+            matching.remove_posting(posting_id)
+        closed += count
+        if len(ids) < batch_size:
+            break
+    return closed
@@ -0,0 +1,155 @@
+"""
+Faceted search over active job postings.
+
+Facet counts come from a single ``GROUP BY`` over every facet column at
+once. It yields one row per distinct combination of facet values, with the
+number of postings sharing it. That table is much smaller than the postings
+themselves, so each facet's counts are summed from it in Python. Counts are
+disjunctive: a facet's own selection is ignored when counting that facet,
+so the other values of a selected facet still show what picking them would
+return.
+
+Only the range filters (``salary_min``/``salary_max``) apply inside the
+query. The combination table is therefore cached per range and reused by
+every facet selection and page. Its key embeds the ``jobs`` tag version, so
+saving a posting invalidates it.
+"""
+
+import hashlib
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+from django.db.models.functions import Coalesce
+
+from apps.jobs.models import JobPosting
+from config.cache import default_timeout, tag_versions
+
+FACETS = (
+    "job_type",
+    "experience_level",
+    "is_remote",
+    "industry",
+    "location",
+    "salary_band",
+)
+# (label, lower bound inclusive, upper bound exclusive) on a posting's top
+# salary, or its minimum when no maximum is given.
+SALARY_BANDS = (
+    ("0-30000", 0, 30_000),
+    ("30000-60000", 30_000, 60_000),
+    ("60000-100000", 60_000, 100_000),
+    ("100000-150000", 100_000, 150_000),
+    ("150000+", 150_000, None),
+)
+# Open-ended facets only report their most common values.
+MAX_FACET_VALUES = 20
+
+
+def postings(salary_min=None, salary_max=None):
+    """Active postings annotated with their facet columns, within the range.
+
+    ``salary_min`` keeps postings whose pay can reach it, ``salary_max``
+    those whose pay starts at or below it.
+    """
+    queryset = (
+        JobPosting.objects.filter(status="active")
+        .alias(top_salary=Coalesce("salary_max", "salary_min"))
+        .annotate(
+            industry=F("company__industry"),
+            salary_band=Case(
+                *(
+                    When(
+                        Q(top_salary__gte=low)
+                        & (Q() if high is None else Q(top_salary__lt=high)),
+                        then=Value(label),
+                    )
+                    for label, low, high in SALARY_BANDS
+                ),
+                default=Value(""),
+                output_field=CharField(),
+            ),
+        )
+    )
+    if salary_min is not None:
+        queryset = queryset.filter(top_salary__gte=salary_min)
+    if salary_max is not None:
+        queryset = queryset.alias(
+            bottom_salary=Coalesce("salary_min", "salary_max")
+        ).filter(bottom_salary__lte=salary_max)
+    return queryset
+
+
+def select(queryset, selected):
+    """Apply facet selections, ``{facet: [values]}``, to ``postings()``."""
+    for facet, values in selected.items():
+        if values:
+            queryset = queryset.filter(**{f"{facet}__in": values})
+    return queryset
+
+
+def combinations(salary_min=None, salary_max=None):
+    """``[(facet values..., total), ...]`` for the range, cached."""
+    key = "jobs:facets:{}:{}".format(
+        ".".join(tag_versions(("jobs",))),
+        hashlib.md5(
+            f"{salary_min}:{salary_max}".encode(), usedforsecurity=False
+        ).hexdigest(),
+    )
+    rows = cache.get(key)
+    if rows is None:
+        rows = list(
+            postings(salary_min, salary_max)
+            .values_list(*FACETS)
+            .annotate(total=Count("pk"))
+            .order_by()
+        )
+        cache.set(key, rows, default_timeout())
+    return rows
+
+
+def facet_counts(selected, salary_min=None, salary_max=None):
+    """Return ``(total, {facet: [{"value", "count"}, ...]})``.
+
+    ``total`` counts postings matching every selection.
+    """
+    wanted = [
+        (position, {str(value) for value in selected.get(facet) or ()})
+        for position, facet in enumerate(FACETS)
+    ]
+    counts = {facet: Counter() for facet in FACETS}
+    total = 0
+    for row in combinations(salary_min, salary_max):
+        misses = [
+            position
+            for position, values in wanted
+            if values and str(row[position]) not in values
+        ]
+        if len(misses) > 1:
+            continue
+        size = row[-1]
+        if not misses:
+            total += size
+            for position, facet in enumerate(FACETS):
+                counts[facet][row[position]] += size
+        else:
+            # Matches everything but one facet: counts towards that facet only.
+            facet = FACETS[misses[0]]
+            counts[facet][row[misses[0]]] += size
+
+    facets = {}
+    for facet, counter in counts.items():
+        counter.pop("", None)
+        counter.pop(None, None)
+        if facet == "salary_band":
+            values = [
+                (label, counter[label])
+                for label, _, _ in SALARY_BANDS
+                if counter[label]
+            ]
+        else:
+            values = counter.most_common(
+                MAX_FACET_VALUES if facet in ("industry", "location") else None
+            )
+        facets[facet] = [{"value": value, "count": count} for value, count in values]
+    return total, facets
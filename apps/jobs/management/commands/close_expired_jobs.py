@@ -0,0 +1,49 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.jobs import expiry
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Close active job postings whose expires_at or application_deadline "
+        "has passed. Runs once (for cron) unless --loop is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=expiry.BATCH_SIZE)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Count expired postings only."
+        )
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep running until stopped."
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=300.0, help="Seconds between --loop runs."
+        )
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            count = expiry.expired_postings().count()
+            self.stdout.write(f"{count} active postings have expired.")
+            return
+        if not options["loop"]:
+            self.close(options)
+            return
+        while True:
+            try:
+                self.close(options)
+            except Exception:
+                # Try again next run.
+                logger.exception("Closing expired job postings failed")
+            connection.close()
+            time.sleep(options["sleep"])
+
+    def close(self, options):
+        closed = expiry.close_expired(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Closed {closed} expired postings."))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.jobs import documents
+
+
+class Command(BaseCommand):
+    help = (
+        "Extract text from uploaded documents and delete expired upload "
+        "sessions. Runs until stopped unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument(
+            "--sleep", type=float, default=5.0, help="Seconds to wait when idle."
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Drain the queue once and exit."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            purged = documents.purge_sessions()
+            processed = 0
+            while True:
+                batch = documents.process_pending(batch_size=options["batch_size"])
+                processed += batch
+                if batch < options["batch_size"]:
+                    break
+            if processed or purged:
+                self.stdout.write(
+                    f"Processed {processed} documents, "
+                    f"purged {purged} upload sessions."
+                )
+            if options["once"]:
+                return
+            connection.close()
+            time.sleep(options["sleep"])
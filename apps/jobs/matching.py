@@ -0,0 +1,505 @@
+"""
+Skill matching between job postings and alumni.
+
+Skills are free-form strings on ``JobPosting.skills_required``,
+``AlumniProfile.skills`` and ``UserProfile.mentor_skills``. They are
+normalised and interned into one process-wide vocabulary of dense integer
+ids, so each posting and each user becomes a sparse set of term ids.
+
+Postings and users each live in a ``SkillIndex``: the term ids of every row
+in CSR form, an inverted list of rows per term, and one NumPy column per
+filter. Queries are ranked by TF-IDF cosine similarity with binary term
+frequencies. Each query skill adds ``idf ** 2`` to every row on its inverted
+list, in one vectorised step per skill. The sums are then divided by both
+vector norms. Only rows sharing at least one skill with the query are
+filtered and ranked.
+
+Saves reach the indexes after commit. A changed row is tombstoned and
+appended again, and the arrays are rebuilt once tombstones make up
+``compact_ratio`` of the rows. Each worker process keeps its own copy, like
+the connection graph in ``apps.directory.graph``. Once a copy is older than
+``JOBS_MATCHING_MAX_AGE`` seconds it is rebuilt in a background thread, so
+writes from other processes eventually show up.
+"""
+
+import math
+import re
+import threading
+import time
+from array import array
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+from apps.jobs.models import EXPERIENCE_LEVEL_CHOICES, JOB_TYPE_CHOICES, JobPosting
+
+EXPERIENCE_LEVELS = tuple(value for value, _ in EXPERIENCE_LEVEL_CHOICES)
+JOB_TYPES = tuple(value for value, _ in JOB_TYPE_CHOICES)
+# Years since graduation below which a user counts as each experience level;
+# anyone beyond the last bound is "executive".
+EXPERIENCE_YEARS = (2, 6, 12)
+
+SEPARATOR_RE = re.compile(r"[^\w+#.]+", re.UNICODE)
+
+
+def normalise_skill(skill):
+    """``" Machine-Learning "`` -> ``"machine learning"``; keeps ``c++``, ``c#``."""
+    return " ".join(SEPARATOR_RE.sub(" ", str(skill).lower()).split()).strip(".")
+
+
+def code(choices, value):
+    """Position of ``value`` in ``choices``, or -1."""
+    try:
+        return choices.index(value)
+    except ValueError:
+        return -1
+
+
+class Vocabulary:
+    def __init__(self):
+        self.index = {}
+        self.terms = []
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.terms)
+
+    def intern(self, skills):
+        """Sorted unique term ids for ``skills``, adding unseen ones."""
+        ids = set()
+        for skill in skills:
+            term = normalise_skill(skill)
+            if not term:
+                continue
+            term_id = self.index.get(term)
+            if term_id is None:
+                with self.lock:
+                    term_id = self.index.get(term)
+                    if term_id is None:
+                        term_id = self.index[term] = len(self.terms)
+                        self.terms.append(term)
+            ids.add(term_id)
+        return sorted(ids)
+
+    def lookup(self, skills):
+        """Term ids of the known ``skills``; unknown skills cannot match."""
+        ids = {self.index.get(normalise_skill(skill)) for skill in skills}
+        ids.discard(None)
+        return sorted(ids)
+
+
+vocabulary = Vocabulary()
+
+
+class SkillIndex:
+    """Rows of ``(key, skills, column values)`` searchable by skill overlap.
+
+    ``columns`` maps filter column names to NumPy dtypes.
+    """
+
+    compact_ratio = 0.25
+    initial_capacity = 1024
+
+    def __init__(self, columns):
+        self.dtypes = dict(columns)
+        self.lock = threading.RLock()
+        self.built_at = time.monotonic()
+        self._clear()
+
+    def _clear(self):
+        self.keys = []
+        self.index = {}
+        self.offsets = array("q", [0])
+        self.terms = array("q")
+        self.postings = {}
+        self.df = np.zeros(len(vocabulary), dtype=np.int64)
+        self.alive = np.zeros(self.initial_capacity, dtype=bool)
+        self.columns = {
+            name: np.zeros(self.initial_capacity, dtype=dtype)
+            for name, dtype in self.dtypes.items()
+        }
+        self.live = 0
+        self.norms = None
+
+    def __len__(self):
+        return self.live
+
+    def add(self, key, skills, **values):
+        """Insert or replace the row for ``key``; rows without skills are dropped."""
+        terms = vocabulary.intern(skills)
+        with self.lock:
+            self._remove(key)
+            if terms:
+                self._append(key, terms, values)
+            self._maybe_compact()
+
+    def remove(self, key):
+        with self.lock:
+            self._remove(key)
+            self._maybe_compact()
+
+    def _append(self, key, terms, values):
+        row = len(self.keys)
+        if row == len(self.alive):
+            self._grow(2 * row)
+        if terms[-1] >= len(self.df):
+            df = np.zeros(max(len(vocabulary), terms[-1] + 1), dtype=np.int64)
+            df[: len(self.df)] = self.df
+            self.df = df
+        self.keys.append(key)
+        self.index[key] = row
+        self.terms.extend(terms)
+        self.offsets.append(len(self.terms))
+        for term in terms:
+            self.postings.setdefault(term, array("q")).append(row)
+        self.df[terms] += 1
+        self.alive[row] = True
+        for name, value in values.items():
+            self.columns[name][row] = value
+        self.live += 1
+        self.norms = None
+
+    def _remove(self, key):
+        row = self.index.pop(key, None)
+        if row is None:
+            return
+        self.alive[row] = False
+        self.df[self._row_terms(row)] -= 1
+        self.live -= 1
+        self.norms = None
+
+    def _row_terms(self, row):
+        return np.asarray(self.terms[self.offsets[row] : self.offsets[row + 1]])
+
+    def _grow(self, capacity):
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: len(self.alive)] = self.alive
+        self.alive = alive
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[: len(column)] = column
+            self.columns[name] = grown
+
+    def _maybe_compact(self):
+        dead = len(self.keys) - self.live
+        if dead > self.initial_capacity and dead > self.compact_ratio * len(self.keys):
+            self.compact()
+
+    def compact(self):
+        """Rebuild the arrays from the live rows only."""
+        with self.lock:
+            rows = sorted(self.index.values())
+            live = [
+                (
+                    self.keys[row],
+                    self._row_terms(row).tolist(),
+                    {name: column[row] for name, column in self.columns.items()},
+                )
+                for row in rows
+            ]
+            self._clear()
+            for key, terms, values in live:
+                self._append(key, terms, values)
+
+    def _idf(self):
+        return np.log((1.0 + self.live) / (1.0 + self.df)) + 1.0
+
+    def _norms(self, idf):
+        # Every row has at least one term, so reduceat never sees an empty
+        # slice. Norms of tombstoned rows are computed but never read.
+        if self.norms is None:
+            offsets = np.frombuffer(self.offsets, dtype=np.int64)
+            weights = idf[np.frombuffer(self.terms, dtype=np.int64)] ** 2
+            self.norms = np.sqrt(np.add.reduceat(weights, offsets[:-1]))
+        return self.norms
+
+    def search(self, skills, limit=20, exclude=(), where=None, after=None):
+        """Return ``[(key, score), ...]`` best match first.
+
+        ``where`` maps columns to the values a row may hold, ``after`` maps
+        columns to an exclusive lower bound.
+        """
+        terms = vocabulary.lookup(skills)
+        with self.lock:
+            terms = [term for term in terms if term < len(self.df) and self.df[term]]
+            if not terms or not self.live:
+                return []
+            idf = self._idf()
+            norms = self._norms(idf)
+            scores = np.zeros(len(self.keys))
+            for term in terms:
+                rows = np.frombuffer(self.postings[term], dtype=np.int64)
+                scores[rows] += idf[term] ** 2
+
+            rows = np.flatnonzero(scores)
+            rows = rows[self.alive[rows]]
+            for name, allowed in (where or {}).items():
+                rows = rows[np.isin(self.columns[name][rows], list(allowed))]
+            for name, bound in (after or {}).items():
+                rows = rows[self.columns[name][rows] > bound]
+            skip = [self.index[key] for key in exclude if key in self.index]
+            if skip:
+                rows = rows[~np.isin(rows, skip)]
+            if not len(rows):
+                return []
+
+            query_norm = math.sqrt(float(np.sum(idf[terms] ** 2)))
+            values = scores[rows] / (norms[rows] * query_norm)
+            if len(rows) > limit:
+                top = np.argpartition(-values, limit - 1)[:limit]
+                rows, values = rows[top], values[top]
+            order = np.argsort(-values, kind="stable")
+            return [(self.keys[rows[i]], float(values[i])) for i in order]
+
+
+# Postings
+
+
+def posting_columns():
+    return {
+        "experience_level": np.int8,
+        "job_type": np.int8,
+        "is_remote": bool,
+        "expires_at": np.float64,
+    }
+
+
+def posting_values(experience_level, job_type, is_remote, expires_at):
+    return {
+        "experience_level": code(EXPERIENCE_LEVELS, experience_level),
+        "job_type": code(JOB_TYPES, job_type),
+        "is_remote": bool(is_remote),
+        "expires_at": expires_at.timestamp() if expires_at else math.inf,
+    }
+
+
+def build_posting_index():
+    index = SkillIndex(posting_columns())
+    rows = (
+        JobPosting.objects.filter(status="active", expires_at__gt=timezone.now())
+        .values_list(
+            "pk",
+            "skills_required",
+            "experience_level",
+            "job_type",
+            "is_remote",
+            "expires_at",
+        )
+        .iterator(chunk_size=5000)
+    )
+    for pk, skills, *values in rows:
+        if isinstance(skills, list):
+            index.add(pk, skills, **posting_values(*values))
+    return index
+
+
+def update_posting(posting):
+    index = postings.loaded()
+    if index is None:
+        return
+    if posting.status == "active" and isinstance(posting.skills_required, list):
+        index.add(
+            posting.pk,
+            posting.skills_required,
+            **posting_values(
+                posting.experience_level,
+                posting.job_type,
+                posting.is_remote,
+                posting.expires_at,
+            ),
+        )
+    else:
+        index.remove(posting.pk)
+
+
+def remove_posting(posting_id):
+    index = postings.loaded()
+    if index is not None:
+        index.remove(posting_id)
+
+
+# Users
+
+PROFILE_FIELDS = (
+    "pk",
+    "alumni_profile__skills",
+    "profile__mentor_skills",
+    "alumni_profile__graduation_year",
+    "profile__graduation_year",
+    "profile__privacy_level",
+    "profile__is_job_seeking",
+)
+
+
+def profile_columns():
+    return {"experience_level": np.int8, "is_job_seeking": bool}
+
+
+def experience_level(graduation_year, today=None):
+    """Experience level guessed from years since graduation, or None."""
+    if not graduation_year:
+        return None
+    years = (today or timezone.localdate()).year - graduation_year
+    for level, bound in zip(EXPERIENCE_LEVELS, EXPERIENCE_YEARS):
+        if years < bound:
+            return level
+    return EXPERIENCE_LEVELS[-1]
+
+
+def profile_row(
+    alumni_skills,
+    mentor_skills,
+    alumni_year,
+    profile_year,
+    privacy_level,
+    is_job_seeking,
+):
+    """``(skills, column values)`` for a user, or None if they opted out."""
+    if privacy_level == "private":
+        return None
+    skills = []
+    for value in (alumni_skills, mentor_skills):
+        if isinstance(value, list):
+            skills.extend(value)
+    level = experience_level(alumni_year or profile_year)
+    return skills, {
+        "experience_level": code(EXPERIENCE_LEVELS, level),
+        "is_job_seeking": bool(is_job_seeking),
+    }
+
+
+def profile_rows(users):
+    for pk, *values in users.values_list(*PROFILE_FIELDS).iterator(chunk_size=5000):
+        yield pk, profile_row(*values)
+
+
+def user_skills(user_id):
+    """The skills ``user_id`` is matched on, straight from the database."""
+    for _, row in profile_rows(get_user_model().objects.filter(pk=user_id)):
+        return row[0] if row else []
+    return []
+
+
+def build_profile_index():
+    index = SkillIndex(profile_columns())
+    for pk, row in profile_rows(get_user_model().objects.filter(is_active=True)):
+        if row is not None:
+            skills, values = row
+            index.add(pk, skills, **values)
+    return index
+
+
+def update_users(user_ids):
+    index = profiles.loaded()
+    if index is None:
+        return
+    users = get_user_model().objects.filter(pk__in=list(user_ids))
+    found = set()
+    for pk, row in profile_rows(users.filter(is_active=True)):
+        found.add(pk)
+        if row is None:
+            index.remove(pk)
+        else:
+            skills, values = row
+            index.add(pk, skills, **values)
+    for pk in set(user_ids) - found:
+        index.remove(pk)
+
+
+# Per-process copies
+
+
+class LoadedIndex:
+    """Builds an index on first use and rebuilds it in the background once
+    it is older than ``JOBS_MATCHING_MAX_AGE`` seconds."""
+
+    def __init__(self, build):
+        self.build = build
+        self.index = None
+        self.lock = threading.Lock()
+        self.rebuilding = threading.Event()
+
+    def get(self):
+        index = self.index
+        if index is None:
+            with self.lock:
+                if self.index is None:
+                    self.index = self.build()
+                return self.index
+
+        max_age = getattr(settings, "JOBS_MATCHING_MAX_AGE", 300)
+        if time.monotonic() - index.built_at > max_age and not self.rebuilding.is_set():
+            self.rebuilding.set()
+            threading.Thread(target=self._rebuild, daemon=True).start()
+        return index
+
+    def _rebuild(self):
+        try:
+            self.index = self.build()
+        finally:
+            connection.close()
+            self.rebuilding.clear()
+
+    def loaded(self):
+        """The index if it has been built, without building it."""
+        return self.index
+
+    def reset(self):
+        with self.lock:
+            self.index = None
+
+
+postings = LoadedIndex(build_posting_index)
+profiles = LoadedIndex(build_profile_index)
+
+
+def filters(experience_levels=None, job_types=None, is_remote=None):
+    """Choice values to the column codes ``SkillIndex.search`` filters on."""
+    where = {}
+    if experience_levels:
+        where["experience_level"] = [
+            code(EXPERIENCE_LEVELS, level) for level in experience_levels
+        ]
+    if job_types:
+        where["job_type"] = [code(JOB_TYPES, job_type) for job_type in job_types]
+    if is_remote is not None:
+        where["is_remote"] = [bool(is_remote)]
+    return where
+
+
+def recommended_jobs(
+    user_id,
+    limit=20,
+    exclude=(),
+    experience_levels=None,
+    job_types=None,
+    is_remote=None,
+):
+    """``[(posting_id, score), ...]`` of open postings matching a user's skills."""
+    skills = user_skills(user_id)
+    if not skills:
+        return []
+    return postings.get().search(
+        skills,
+        limit=limit,
+        exclude=exclude,
+        where=filters(experience_levels, job_types, is_remote),
+        after={"expires_at": timezone.now().timestamp()},
+    )
+
+
+def candidates(posting, limit=20, exclude=(), experience_levels=None, job_seeking=None):
+    """``[(user_id, score), ...]`` of users matching a posting's skills.
+
+    A user's experience level is estimated from their graduation year.
+    """
+    skills = posting.skills_required
+    if not isinstance(skills, list) or not skills:
+        return []
+    where = filters(experience_levels)
+    if job_seeking is not None:
+        where["is_job_seeking"] = [bool(job_seeking)]
+    return profiles.get().search(skills, limit=limit, exclude=exclude, where=where)
@@ -0,0 +1,206 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:23
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Company",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                (
+                    "logo",
+                    models.ImageField(blank=True, null=True, upload_to="companies/"),
+                ),
+                ("website", models.URLField(blank=True)),
+                ("description", models.TextField(blank=True)),
+                ("industry", models.CharField(blank=True, max_length=100)),
+                ("size", models.CharField(blank=True, max_length=50)),
+                ("location", models.CharField(blank=True, max_length=100)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="JobPosting",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("title", models.CharField(max_length=200)),
+                ("description", models.TextField()),
+                ("requirements", models.TextField()),
+                ("benefits", models.TextField(blank=True)),
+                ("location", models.CharField(max_length=100)),
+                ("is_remote", models.BooleanField(default=False)),
+                (
+                    "job_type",
+                    models.CharField(
+                        choices=[
+                            ("full_time", "Full Time"),
+                            ("part_time", "Part Time"),
+                            ("contract", "Contract"),
+                            ("internship", "Internship"),
+                            ("freelance", "Freelance"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "experience_level",
+                    models.CharField(
+                        choices=[
+                            ("entry", "Entry Level"),
+                            ("mid", "Mid Level"),
+                            ("senior", "Senior Level"),
+                            ("executive", "Executive"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("salary_min", models.PositiveIntegerField(blank=True, null=True)),
+                ("salary_max", models.PositiveIntegerField(blank=True, null=True)),
+                ("salary_currency", models.CharField(default="USD", max_length=3)),
+                ("application_deadline", models.DateTimeField(blank=True, null=True)),
+                ("external_url", models.URLField(blank=True)),
+                ("skills_required", models.JSONField(default=list)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("draft", "Draft"),
+                            ("pending", "Pending Review"),
+                            ("active", "Active"),
+                            ("closed", "Closed"),
+                            ("rejected", "Rejected"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("featured", models.BooleanField(default=False)),
+                ("view_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("expires_at", models.DateTimeField()),
+                (
+                    "company",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="job_postings",
+                        to="jobs.company",
+                    ),
+                ),
+                (
+                    "posted_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="posted_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="JobApplication",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("cover_letter", models.TextField()),
+                ("resume", models.FileField(upload_to="resumes/")),
+                ("additional_documents", models.JSONField(default=list)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("submitted", "Submitted"),
+                            ("under_review", "Under Review"),
+                            ("shortlisted", "Shortlisted"),
+                            ("interview", "Interview"),
+                            ("offered", "Offered"),
+                            ("hired", "Hired"),
+                            ("rejected", "Rejected"),
+                            ("withdrawn", "Withdrawn"),
+                        ],
+                        default="submitted",
+                        max_length=20,
+                    ),
+                ),
+                ("applied_at", models.DateTimeField(auto_now_add=True)),
+                ("last_updated", models.DateTimeField(auto_now=True)),
+                (
+                    "applicant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="job_applications",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="applications",
+                        to="jobs.jobposting",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="jobposting",
+            index=models.Index(fields=["title"], name="jobs_jobpos_title_afd3ed_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="jobposting",
+            index=models.Index(
+                fields=["company"], name="jobs_jobpos_company_af0424_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobposting",
+            index=models.Index(fields=["status"], name="jobs_jobpos_status_99cc43_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="jobposting",
+            index=models.Index(fields=["-created_at", "-id"], name="job_created_idx"),
+        ),
+        migrations.AlterUniqueTogether(
+            name="jobapplication",
+            unique_together={("job", "applicant")},
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobDailyViews",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("views", models.PositiveIntegerField(default=0)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_views",
+                        to="jobs.jobposting",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Job Daily Views",
+                "verbose_name_plural": "Job Daily Views",
+                "indexes": [
+                    models.Index(fields=["date", "job"], name="job_daily_views_idx")
+                ],
+                "unique_together": {("job", "date")},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0002_job_daily_views"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="jobposting",
+            index=models.Index(fields=["status", "expires_at"], name="job_expiry_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="jobposting",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["-created_at", "-id"],
+                name="job_active_created_idx",
+            ),
+        ),
+    ]
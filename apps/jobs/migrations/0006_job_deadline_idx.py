@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0005_application_pipeline"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="jobposting",
+            index=models.Index(
+                fields=["status", "application_deadline"], name="job_deadline_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def copy_owners(apps, schema_editor):
+    StoredDocument = apps.get_model("jobs", "StoredDocument")
+    DocumentOwner = apps.get_model("jobs", "DocumentOwner")
+    # Only a document with a single owner is known to carry that owner's
+    # file name; the others start with none rather than someone else's.
+    filenames = dict(
+        StoredDocument.objects.annotate(owner_count=Count("owners"))
+        .filter(owner_count=1)
+        .values_list("pk", "filename")
+    )
+    links = StoredDocument.owners.through.objects.values_list(
+        "storeddocument_id", "user_id"
+    )
+    DocumentOwner.objects.bulk_create(
+        (
+            DocumentOwner(
+                document_id=document_id,
+                owner_id=user_id,
+                filename=filenames.get(document_id, ""),
+            )
+            for document_id, user_id in links.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0006_job_deadline_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentOwner",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("filename", models.CharField(blank=True, max_length=255)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "document",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ownerships",
+                        to="jobs.storeddocument",
+                    ),
+                ),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="document_ownerships",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("document", "owner")},
+            },
+        ),
+        migrations.RunPython(copy_owners, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="storeddocument",
+            name="owners",
+        ),
+        migrations.AddField(
+            model_name="storeddocument",
+            name="owners",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="documents",
+                through="jobs.DocumentOwner",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RemoveField(
+            model_name="storeddocument",
+            name="filename",
+        ),
+    ]
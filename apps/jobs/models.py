@@ -1,5 +1,10 @@
+import uuid
+
+from django.contrib.auth import get_user_model
 from django.db import models
 
+User = get_user_model()
+
 # Create your models here.
 
 APPROVAL_STATUS_CHOICE = [
@@ -47,7 +52,7 @@ class Company(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        self.name
+        return self.name
 
 
 class JobPosting(models.Model):
@@ -89,15 +94,126 @@ class JobPosting(models.Model):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # view_count only moves through apps.jobs.tracking's in-place UPDATEs;
+        # saving a loaded posting must not write back the value it was loaded
+        # with.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = SAVED_POSTING_FIELDS
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["title"]),
             models.Index(fields=["company"]),
             models.Index(fields=["status"]),
+            models.Index(fields=["-created_at", "-id"], name="job_created_idx"),
+            models.Index(fields=["status", "expires_at"], name="job_expiry_idx"),
+            models.Index(
+                fields=["status", "application_deadline"], name="job_deadline_idx"
+            ),
+            # Public lists only show active postings.
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(status="active"),
+                name="job_active_created_idx",
+            ),
         ]
 
 
+SAVED_POSTING_FIELDS = [
+    field.name
+    for field in JobPosting._meta.concrete_fields
+    if not field.primary_key and field.name != "view_count"
+]
+
+
+DOCUMENT_TEXT_STATUS = [
+    ("pending", "Pending"),
+    ("processing", "Processing"),
+    ("done", "Done"),
+    ("unsupported", "Unsupported"),
+    ("failed", "Failed"),
+]
+
+
+class StoredDocument(models.Model):
+    """An uploaded file, stored once per distinct content (by SHA-256).
+
+    The name a file was uploaded under belongs to the uploader, so it is kept
+    per owner on ``DocumentOwner``, never on the shared row.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to="documents/")
+    size = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=100, blank=True)
+    owners = models.ManyToManyField(
+        User, through="DocumentOwner", related_name="documents", blank=True
+    )
+    text = models.TextField(blank=True)
+    text_status = models.CharField(
+        max_length=20, choices=DOCUMENT_TEXT_STATUS, default="pending"
+    )
+    # When a process_documents worker claimed the row for extraction.
+    text_claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(text_status="pending"),
+                name="document_text_pending_idx",
+            ),
+        ]
+
+
+class DocumentOwner(models.Model):
+    """A user's claim on a ``StoredDocument``, under the name they uploaded."""
+
+    document = models.ForeignKey(
+        StoredDocument, on_delete=models.CASCADE, related_name="ownerships"
+    )
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="document_ownerships"
+    )
+    filename = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.filename or str(self.document_id)
+
+    class Meta:
+        unique_together = (("document", "owner"),)
+
+
+class UploadSession(models.Model):
+    """A resumable upload, written chunk by chunk to a local partial file."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="upload_sessions"
+    )
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    document = models.ForeignKey(
+        StoredDocument, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.filename
+
+
 class JobApplication(models.Model):
     job = models.ForeignKey(
         JobPosting, on_delete=models.CASCADE, related_name="applications"
@@ -107,6 +223,13 @@ class JobApplication(models.Model):
     )
     cover_letter = models.TextField()
     resume = models.FileField(upload_to="resumes/")
+    resume_document = models.ForeignKey(
+        StoredDocument,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="applications",
+    )
     additional_documents = models.JSONField(default=list)
     status = models.CharField(
         max_length=20,
@@ -118,3 +241,47 @@ class JobApplication(models.Model):
 
     class Meta:
         unique_together = ["job", "applicant"]
+        indexes = [
+            models.Index(
+                fields=["job", "status", "applied_at"], name="application_pipeline_idx"
+            ),
+        ]
+
+
+class JobApplicationStatusChange(models.Model):
+    """Audit trail of status changes, written by ``apps.jobs.pipeline``."""
+
+    application = models.ForeignKey(
+        JobApplication, on_delete=models.CASCADE, related_name="status_changes"
+    )
+    from_status = models.CharField(max_length=20, choices=JOB_APPLICATION_STATUS)
+    to_status = models.CharField(max_length=20, choices=JOB_APPLICATION_STATUS)
+    changed_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    note = models.TextField(blank=True)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["changed_at", "pk"]
+        indexes = [
+            models.Index(
+                fields=["application", "changed_at"], name="application_history_idx"
+            ),
+        ]
+
+
+class JobDailyViews(models.Model):
+    """Views of a posting per day, written in batches by ``apps.jobs.tracking``."""
+
+    job = models.ForeignKey(
+        JobPosting, on_delete=models.CASCADE, related_name="daily_views"
+    )
+    date = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ["job", "date"]
+        indexes = [models.Index(fields=["date", "job"], name="job_daily_views_idx")]
+        verbose_name = "Job Daily Views"
+        verbose_name_plural = "Job Daily Views"
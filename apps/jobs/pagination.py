@@ -0,0 +1,8 @@
+from config.pagination import KeysetPagination
+
+
+class ApplicantPagination(KeysetPagination):
+    """A posting's applications, oldest first."""
+
+    ordering = ("applied_at", "pk")
+    page_size = 50
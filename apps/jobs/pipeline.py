@@ -0,0 +1,148 @@
+"""
+Moving job applications through ``JOB_APPLICATION_STATUS``.
+
+``TRANSITIONS`` is the status matrix: the statuses each status may move to.
+The posting's recruiter makes every move except ``withdrawn``, which only
+the applicant can choose. ``hired`` and ``withdrawn`` are final.
+
+``transition`` moves many applications of one posting at once. The status
+is set with a single ``UPDATE`` over every application allowed to make the
+move, and each change is recorded in ``JobApplicationStatusChange``.
+Applications that cannot make the move are reported back, untouched.
+A bulk ``UPDATE`` sends no signals, so the notifications for the moved
+applications are queued here, in the same transaction.
+"""
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.jobs.models import (
+    JOB_APPLICATION_STATUS,
+    JobApplication,
+    JobApplicationStatusChange,
+)
+from apps.notifications import notify
+
+STATUSES = [status for status, _ in JOB_APPLICATION_STATUS]
+TRANSITIONS = {
+    "submitted": ("under_review", "shortlisted", "rejected", "withdrawn"),
+    "under_review": ("shortlisted", "interview", "rejected", "withdrawn"),
+    "shortlisted": ("under_review", "interview", "rejected", "withdrawn"),
+    "interview": ("shortlisted", "offered", "rejected", "withdrawn"),
+    "offered": ("hired", "rejected", "withdrawn"),
+    "rejected": ("under_review",),
+    "hired": (),
+    "withdrawn": (),
+}
+APPLICANT_STATUSES = ("withdrawn",)
+# Applications per bulk request.
+MAX_BATCH = 1000
+
+
+class TransitionError(Exception):
+    pass
+
+
+def sources(status):
+    """The statuses that may move to ``status``."""
+    return [source for source, targets in TRANSITIONS.items() if status in targets]
+
+
+def allowed(status, by_applicant):
+    """The statuses ``status`` may move to, for the applicant or the recruiter."""
+    return [
+        target
+        for target in TRANSITIONS[status]
+        if (target in APPLICANT_STATUSES) == by_applicant
+    ]
+
+
+def status_counts(job):
+    """``{status: applications}`` for ``job``, every status included."""
+    counts = dict.fromkeys(STATUSES, 0)
+    counts.update(
+        JobApplication.objects.filter(job=job)
+        .values_list("status")
+        .annotate(total=Count("pk"))
+        .order_by()
+    )
+    return counts
+
+
+def transition(applications, status, user, note="", by_applicant=False):
+    """Move ``applications`` to ``status``.
+
+    Returns ``(moved, skipped)``: the ids that moved, and ``{id: status}``
+    for those whose current status does not allow the move.
+    """
+    if status not in TRANSITIONS:
+        raise TransitionError(f"Unknown status: {status}.")
+    if (status in APPLICANT_STATUSES) != by_applicant:
+        raise TransitionError(
+            "Applicants can only withdraw their applications."
+            if by_applicant
+            else "Only the applicant can withdraw an application."
+        )
+    ids = list(applications.values_list("pk", flat=True)[: MAX_BATCH + 1])
+    if len(ids) > MAX_BATCH:
+        raise TransitionError(f"At most {MAX_BATCH} applications per request.")
+
+    now = timezone.now()
+    eligible = JobApplication.objects.filter(pk__in=ids, status__in=sources(status))
+    with transaction.atomic():
+        # Write before reading so the row locks (on SQLite, the database write
+        # lock) are held from the start and the statuses read below are the
+        # ones being changed.
+        if eligible.update(last_updated=now):
+            previous = dict(eligible.values_list("pk", "status"))
+            JobApplication.objects.filter(pk__in=previous).update(
+                status=status, last_updated=now
+            )
+            JobApplicationStatusChange.objects.bulk_create(
+                JobApplicationStatusChange(
+                    application_id=pk,
+                    from_status=from_status,
+                    to_status=status,
+                    changed_by=user,
+                    note=note,
+                )
+                for pk, from_status in previous.items()
+            )
+            notify.enqueue_many(status_events(previous, status, user))
+        else:
+            previous = {}
+    skipped = dict(
+        JobApplication.objects.filter(pk__in=set(ids) - set(previous)).values_list(
+            "pk", "status"
+        )
+    )
+    return list(previous), skipped
+
+
+def status_events(ids, status, user):
+    """Notifications for applications moved to ``status`` by ``user``."""
+    events = []
+    for pk, applicant_id, job_id, title, poster_id in JobApplication.objects.filter(
+        pk__in=ids
+    ).values_list("pk", "applicant_id", "job_id", "job__title", "job__posted_by_id"):
+        data = {
+            "job_id": str(job_id),
+            "job_title": title,
+            "application_id": pk,
+            "status": status,
+            "status_label": dict(JOB_APPLICATION_STATUS)[status],
+        }
+        if status == "withdrawn":
+            events.append(
+                notify.new_event(
+                    "job.application_withdrawn", [poster_id], user.pk, data
+                )
+            )
+        else:
+            events.append(
+                notify.new_event(
+                    "job.application_status", [applicant_id], user.pk, data
+                )
+            )
+    return events
@@ -1,6 +1,20 @@
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from jobs.models import Company, JobPosting, JobApplication
-from apps.users.models import User
+
+from apps.jobs.models import (
+    JOB_APPLICATION_STATUS,
+    Company,
+    DocumentOwner,
+    JobApplication,
+    JobApplicationStatusChange,
+    JobPosting,
+    StoredDocument,
+    UploadSession,
+)
+from apps.jobs.pipeline import MAX_BATCH
+from config.serializers import FieldsProjectionMixin, RowSerializer, file_url
+
+User = get_user_model()
 
 
 class CompanySerializer(serializers.ModelSerializer):
@@ -23,7 +37,7 @@ class CompanySerializer(serializers.ModelSerializer):
 class PosterSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ["id", "username", "email"]
+        fields = ["id", "first_name", "last_name", "email"]
 
 
 class JobPostingSerializer(serializers.ModelSerializer):
@@ -85,13 +99,91 @@ class JobPostingListSerializer(serializers.ModelSerializer):
         ]
 
 
+class MatchedJobSerializer(JobPostingListSerializer):
+    score = serializers.FloatField(read_only=True)
+
+    class Meta(JobPostingListSerializer.Meta):
+        fields = [*JobPostingListSerializer.Meta.fields, "score"]
+
+
+class TrendingJobSerializer(JobPostingListSerializer):
+    recent_views = serializers.IntegerField(read_only=True)
+
+    class Meta(JobPostingListSerializer.Meta):
+        fields = [*JobPostingListSerializer.Meta.fields, "recent_views"]
+
+
+class CandidateSerializer(serializers.ModelSerializer):
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = User
+        fields = ["id", "first_name", "last_name", "score"]
+
+
 class ApplicantSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ["id", "username", "email"]
+        fields = ["id", "first_name", "last_name", "email"]
+
 
+class StoredDocumentSerializer(serializers.ModelSerializer):
+    # The name the requesting user uploaded it under, never another owner's.
+    filename = serializers.SerializerMethodField()
 
-class JobApplicationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StoredDocument
+        fields = [
+            "id",
+            "filename",
+            "content_type",
+            "size",
+            "sha256",
+            "file",
+            "text_status",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+    def get_filename(self, document):
+        filename = getattr(document, "filename", None)
+        if filename is None:
+            filename = (
+                DocumentOwner.objects.filter(
+                    document=document, owner=self.context["request"].user
+                )
+                .values_list("filename", flat=True)
+                .first()
+            )
+        return filename or ""
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    document = StoredDocumentSerializer(read_only=True)
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            "id",
+            "filename",
+            "content_type",
+            "size",
+            "received",
+            "document",
+            "created_at",
+            "expires_at",
+        ]
+        read_only_fields = [
+            "id",
+            "content_type",
+            "received",
+            "document",
+            "created_at",
+            "expires_at",
+        ]
+
+
+class JobApplicationSerializer(FieldsProjectionMixin, serializers.ModelSerializer):
     applicant = ApplicantSerializer(read_only=True)
     applicant_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), source="applicant", write_only=True, required=False
@@ -100,6 +192,20 @@ class JobApplicationSerializer(serializers.ModelSerializer):
     job_id = serializers.PrimaryKeyRelatedField(
         queryset=JobPosting.objects.all(), source="job", write_only=True
     )
+    resume = serializers.FileField(required=False)
+    # Documents uploaded through /api/documents/ or an upload session.
+    resume_document_id = serializers.PrimaryKeyRelatedField(
+        queryset=StoredDocument.objects.all(),
+        source="resume_document",
+        write_only=True,
+        required=False,
+    )
+    additional_document_ids = serializers.PrimaryKeyRelatedField(
+        queryset=StoredDocument.objects.all(),
+        many=True,
+        write_only=True,
+        required=False,
+    )
 
     class Meta:
         model = JobApplication
@@ -111,9 +217,109 @@ class JobApplicationSerializer(serializers.ModelSerializer):
             "applicant_id",
             "cover_letter",
             "resume",
+            "resume_document_id",
             "additional_documents",
+            "additional_document_ids",
             "status",
             "applied_at",
             "last_updated",
         ]
         read_only_fields = ["id", "applied_at", "last_updated", "status"]
+
+    def validate(self, attrs):
+        user = self.context["request"].user
+        documents = list(attrs.get("additional_document_ids", []))
+        if attrs.get("resume_document"):
+            documents.append(attrs["resume_document"])
+        owned = set(
+            user.documents.filter(
+                pk__in=[document.pk for document in documents]
+            ).values_list("pk", flat=True)
+        )
+        if any(document.pk not in owned for document in documents):
+            raise serializers.ValidationError("You can only attach your own uploads.")
+        if self.instance is None and not (
+            attrs.get("resume") or attrs.get("resume_document")
+        ):
+            raise serializers.ValidationError(
+                {"resume": "Upload a resume or pass resume_document_id."}
+            )
+        return attrs
+
+
+class JobApplicationRowSerializer(RowSerializer):
+    fields = {
+        "id": "id",
+        "status": "status",
+        "applied_at": "applied_at",
+        "last_updated": "last_updated",
+        "cover_letter": "cover_letter",
+        "applicant": {
+            "id": "applicant__id",
+            "first_name": "applicant__first_name",
+            "last_name": "applicant__last_name",
+            "email": "applicant__email",
+        },
+        "job": {
+            "id": "job__id",
+            "title": "job__title",
+            "status": "job__status",
+            "company": {
+                "id": "job__company__id",
+                "name": "job__company__name",
+            },
+        },
+    }
+    default_fields = ("id", "status", "applied_at", "last_updated", "applicant", "job")
+
+
+class PipelineApplicantRowSerializer(RowSerializer):
+    """One row of a posting's pipeline: the application, not the posting."""
+
+    fields = {
+        "id": "id",
+        "status": "status",
+        "applied_at": "applied_at",
+        "last_updated": "last_updated",
+        "cover_letter": "cover_letter",
+        "resume": "resume",
+        "applicant": {
+            "id": "applicant__id",
+            "first_name": "applicant__first_name",
+            "last_name": "applicant__last_name",
+            "email": "applicant__email",
+        },
+    }
+    default_fields = (
+        "id",
+        "status",
+        "applied_at",
+        "last_updated",
+        "resume",
+        "applicant",
+    )
+
+    def to_representation(self, row):
+        data = super().to_representation(row)
+        if "resume" in data:
+            data["resume"] = file_url(
+                JobApplication._meta.get_field("resume"),
+                data["resume"],
+                self.context.get("request"),
+            )
+        return data
+
+
+class StatusChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobApplicationStatusChange
+        fields = ["id", "from_status", "to_status", "changed_by", "note", "changed_at"]
+        read_only_fields = fields
+
+
+class TransitionSerializer(serializers.Serializer):
+    applications = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=MAX_BATCH
+    )
+    status = serializers.ChoiceField(choices=JOB_APPLICATION_STATUS)
+    note = serializers.CharField(required=False, allow_blank=True, default="")
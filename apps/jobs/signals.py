@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.accounts.models import UserProfile
+from apps.directory.models import AlumniProfile
+from apps.jobs import matching
+from apps.jobs.models import Company, JobPosting
+from config.cache import USER_DISPLAY_FIELDS, invalidate_on_change
+
+invalidate_on_change(JobPosting, "jobs")
+invalidate_on_change(Company, "jobs", "jobs.companies")
+invalidate_on_change(get_user_model(), "jobs", fields=USER_DISPLAY_FIELDS)
+
+
+@receiver(post_save, sender=JobPosting)
+def index_posting(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: matching.update_posting(instance))
+
+
+@receiver(post_delete, sender=JobPosting)
+def unindex_posting(sender, instance, **kwargs):
+    posting_id = instance.pk
+    transaction.on_commit(lambda: matching.remove_posting(posting_id))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def index_user(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Only activation changes matter here; skip e.g. last_login updates.
+    if raw or (update_fields is not None and "is_active" not in update_fields):
+        return
+    user_id = instance.pk
+    transaction.on_commit(lambda: matching.update_users([user_id]))
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_save, sender=AlumniProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_delete, sender=AlumniProfile)
+def index_profile_owner(sender, instance, raw=False, **kwargs):
+    if not raw:
+        user_id = instance.user_id
+        transaction.on_commit(lambda: matching.update_users([user_id]))
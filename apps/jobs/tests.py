@@ -1,3 +1,368 @@
-from django.test import TestCase
+import datetime
+import io
+import tempfile
+import zipfile
+from collections import Counter
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.jobs import documents, expiry, pipeline, tracking
+from apps.jobs.models import (
+    Company,
+    JobApplication,
+    JobApplicationStatusChange,
+    JobPosting,
+    StoredDocument,
+)
+from apps.notifications.models import NotificationEvent
+
+User = get_user_model()
+
+
+def make_user(email):
+    return User.objects.create_user(email=email, password="x", is_active=True)
+
+
+def make_job(poster, **fields):
+    return JobPosting.objects.create(
+        title=fields.pop("title", "Backend engineer"),
+        company=Company.objects.create(name="Acme"),
+        posted_by=poster,
+        description="d",
+        requirements="r",
+        location="Remote",
+        job_type="full_time",
+        experience_level="entry",
+        expires_at=fields.pop(
+            "expires_at", timezone.now() + datetime.timedelta(days=30)
+        ),
+        **fields,
+    )
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class JobApplicationDeleteTests(TestCase):
+    def setUp(self):
+        self.poster = make_user("poster@example.com")
+        self.applicant = make_user("applicant@example.com")
+        self.application = JobApplication.objects.create(
+            job=make_job(self.poster),
+            applicant=self.applicant,
+            cover_letter="c",
+            resume="resumes/r.pdf",
+        )
+        self.url = f"/api/applications/{self.application.pk}/"
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_other_user_cannot_delete(self):
+        response = self.client_for(make_user("other@example.com")).delete(self.url)
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(JobApplication.objects.filter(pk=self.application.pk).exists())
+
+    def test_poster_cannot_delete(self):
+        response = self.client_for(self.poster).delete(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_applicant_can_delete(self):
+        response = self.client_for(self.applicant).delete(self.url)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(JobApplication.objects.filter(pk=self.application.pk).exists())
+
+
+class ExpiryTests(TestCase):
+    def setUp(self):
+        self.poster = make_user("poster@example.com")
+        self.past = timezone.now() - datetime.timedelta(minutes=1)
+
+    def make_job(self, **fields):
+        return make_job(self.poster, status=fields.pop("status", "active"), **fields)
+
+    def status(self, job):
+        job.refresh_from_db()
+        return job.status
+
+    def test_closes_postings_past_either_deadline(self):
+        expired = self.make_job(expires_at=self.past)
+        deadline_passed = self.make_job(application_deadline=self.past)
+        open_job = self.make_job(
+            application_deadline=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.assertEqual(expiry.expired_postings().count(), 2)
+        self.assertEqual(expiry.close_expired(batch_size=1), 2)
+        self.assertEqual(self.status(expired), "closed")
+        self.assertEqual(self.status(deadline_passed), "closed")
+        self.assertEqual(self.status(open_job), "active")
+
+    def test_leaves_other_statuses_alone(self):
+        draft = self.make_job(expires_at=self.past, status="draft")
+        self.assertEqual(expiry.close_expired(), 0)
+        self.assertEqual(self.status(draft), "draft")
+
+    def test_command(self):
+        self.make_job(application_deadline=self.past)
+        call_command("close_expired_jobs", stdout=io.StringIO())
+        self.assertFalse(expiry.expired_postings().exists())
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ViewFlushTests(TestCase):
+    def setUp(self):
+        self.poster = make_user("poster@example.com")
+        self.job = make_job(self.poster)
+        self.day = timezone.localdate()
+        self.addCleanup(tracking.buffer.drain)
+
+    def test_failed_flush_is_logged_and_kept(self):
+        other = make_job(self.poster)
+        tracking.buffer.counts = Counter({(self.job.pk, self.day): 3})
+
+        def write(counts):
+            # A view of another posting arrives while the write fails.
+            tracking.buffer.add(other.pk, self.day)
+            raise RuntimeError("down")
+
+        with mock.patch.object(tracking, "write", write):
+            with mock.patch.object(tracking, "connection"):
+                with self.assertLogs("apps.jobs.tracking", "ERROR") as logs:
+                    tracking.buffer._flush()
+        self.assertIn("1 deltas kept", logs.output[0])
+        self.assertEqual(
+            tracking.buffer.counts,
+            {(self.job.pk, self.day): 3, (other.pk, self.day): 1},
+        )
+
+        self.assertEqual(tracking.flush(), 4)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.view_count, 3)
+
+    def test_editing_a_posting_keeps_flushed_views(self):
+        loaded = JobPosting.objects.get(pk=self.job.pk)
+        tracking.buffer.add(self.job.pk, self.day, views=5)
+        tracking.flush()
+
+        loaded.title = "Staff engineer"
+        loaded.save()
+        client = APIClient()
+        client.force_authenticate(self.poster)
+        response = client.patch(
+            f"/api/jobs/{self.job.pk}/",
+            {"description": "Updated", "view_count": 0},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.job.refresh_from_db()
+        self.assertEqual(
+            (self.job.title, self.job.description, self.job.view_count),
+            ("Staff engineer", "Updated", 5),
+        )
+
+
+class DocumentTextTests(TestCase):
+    def docx(self, body):
+        content = io.BytesIO()
+        with zipfile.ZipFile(content, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("word/document.xml", body)
+        document = mock.Mock()
+        document.file = File(io.BytesIO(content.getvalue()), name="resume.docx")
+        return document
+
+    def test_docx_text(self):
+        document = self.docx("<w:p>Hello &amp; welcome</w:p><w:p>Bye</w:p>")
+        self.assertEqual(documents.extract_text(document), "Hello & welcome\nBye\n")
+
+    @override_settings(JOBS_DOCUMENT_XML_LIMIT=1000)
+    def test_oversized_member_is_refused(self):
+        document = self.docx("<w:p>" + "a" * 5000 + "</w:p>")
+        with self.assertRaises(documents.UploadError):
+            documents.extract_text(document)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class StoredDocumentTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+    def upload(self, user, filename, content=b"Curriculum vitae"):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(
+            f"/api/documents/?filename={filename}",
+            content,
+            content_type="application/octet-stream",
+        )
+        self.assertEqual(response.status_code, 201)
+        return client, response.json()
+
+    def test_each_owner_sees_their_own_filename(self):
+        first, uploaded = self.upload(make_user("first@example.com"), "ada-cv.txt")
+        second, again = self.upload(make_user("second@example.com"), "mine.txt")
+        self.assertEqual(uploaded["id"], again["id"])
+        self.assertEqual(
+            (uploaded["filename"], again["filename"]), ("ada-cv.txt", "mine.txt")
+        )
+        self.assertEqual(StoredDocument.objects.count(), 1)
+
+        url = f"/api/documents/{again['id']}/"
+        self.assertEqual(first.get(url).json()["filename"], "ada-cv.txt")
+        self.assertEqual(second.get(url).json()["filename"], "mine.txt")
+
+    def test_text_is_extracted_outside_the_claiming_transaction(self):
+        _, uploaded = self.upload(make_user("first@example.com"), "cv.txt")
+        depth = len(connection.savepoint_ids)
+        depths = []
+        extract_text = documents.extract_text
+
+        def extract(document):
+            depths.append(len(connection.savepoint_ids))
+            return extract_text(document)
+
+        with mock.patch.object(documents, "extract_text", extract):
+            self.assertEqual(documents.process_pending(), 1)
+        self.assertEqual(depths, [depth])
+        document = StoredDocument.objects.get(pk=uploaded["id"])
+        self.assertEqual(
+            (document.text_status, document.text), ("done", "Curriculum vitae")
+        )
+
+    def test_stale_claims_are_taken_over(self):
+        self.upload(make_user("first@example.com"), "stale.txt", b"stale")
+        self.upload(make_user("second@example.com"), "fresh.txt", b"fresh")
+        StoredDocument.objects.update(
+            text_status="processing", text_claimed_at=timezone.now()
+        )
+        stale = StoredDocument.objects.order_by("created_at").first()
+        StoredDocument.objects.filter(pk=stale.pk).update(
+            text_claimed_at=timezone.now() - documents.CLAIM_TIMEOUT * 2
+        )
+        self.assertEqual(documents.process_pending(), 1)
+        self.assertEqual(
+            sorted(StoredDocument.objects.values_list("text_status", flat=True)),
+            ["done", "processing"],
+        )
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class PipelineTests(TestCase):
+    def setUp(self):
+        self.poster = make_user("poster@example.com")
+        self.job = make_job(self.poster)
+        self.applications = [
+            JobApplication.objects.create(
+                job=self.job,
+                applicant=make_user(f"applicant{n}@example.com"),
+                cover_letter="c",
+                resume="resumes/r.pdf",
+                status=status,
+            )
+            for n, status in enumerate(["submitted", "submitted", "hired"])
+        ]
+        NotificationEvent.objects.all().delete()
+
+    def ids(self, *indexes):
+        return [self.applications[index].pk for index in indexes]
+
+    def test_bulk_move_writes_audit_rows_and_notifications(self):
+        moved, skipped = pipeline.transition(
+            JobApplication.objects.filter(pk__in=self.ids(0, 1, 2)),
+            "under_review",
+            self.poster,
+            note="First pass",
+        )
+        self.assertEqual(sorted(moved), sorted(self.ids(0, 1)))
+        self.assertEqual(skipped, {self.applications[2].pk: "hired"})
+        self.assertEqual(
+            sorted(
+                JobApplicationStatusChange.objects.values_list(
+                    "application_id", "from_status", "to_status", "changed_by", "note"
+                )
+            ),
+            sorted(
+                (pk, "submitted", "under_review", self.poster.pk, "First pass")
+                for pk in self.ids(0, 1)
+            ),
+        )
+        events = NotificationEvent.objects.filter(kind="job.application_status")
+        self.assertEqual(
+            sorted(event.recipients[0] for event in events),
+            sorted(str(self.applications[n].applicant_id) for n in (0, 1)),
+        )
+        self.assertEqual(pipeline.status_counts(self.job)["under_review"], 2)
+
+    def test_moves_outside_the_matrix_are_skipped(self):
+        moved, skipped = pipeline.transition(
+            JobApplication.objects.filter(pk__in=self.ids(0)), "hired", self.poster
+        )
+        self.assertEqual((moved, skipped), ([], {self.applications[0].pk: "submitted"}))
+        self.assertFalse(JobApplicationStatusChange.objects.exists())
+
+    def test_only_the_applicant_withdraws(self):
+        application = self.applications[0]
+        with self.assertRaises(pipeline.TransitionError):
+            pipeline.transition(
+                JobApplication.objects.filter(pk=application.pk),
+                "withdrawn",
+                self.poster,
+            )
+        with self.assertRaises(pipeline.TransitionError):
+            pipeline.transition(
+                JobApplication.objects.filter(pk=application.pk),
+                "under_review",
+                application.applicant,
+                by_applicant=True,
+            )
+        moved, _ = pipeline.transition(
+            JobApplication.objects.filter(pk=application.pk),
+            "withdrawn",
+            application.applicant,
+            by_applicant=True,
+        )
+        self.assertEqual(moved, [application.pk])
+        event = NotificationEvent.objects.get(kind="job.application_withdrawn")
+        self.assertEqual(event.recipients, [str(self.poster.pk)])
+
+    def test_applicant_rows_link_the_resume_like_the_detail(self):
+        client = APIClient()
+        client.force_authenticate(self.poster)
+        rows = client.get(f"/api/jobs/{self.job.pk}/applicants/").json()["results"]
+        detail = client.get(f"/api/applications/{self.applications[0].pk}/").json()
+        self.assertEqual(rows[0]["id"], self.applications[0].pk)
+        self.assertEqual(rows[0]["resume"], detail["resume"])
+        self.assertEqual(detail["resume"], "http://testserver/media/resumes/r.pdf")
+
+    def test_transition_endpoint(self):
+        url = f"/api/jobs/{self.job.pk}/transition/"
+        payload = {"applications": self.ids(0, 2) + [999_999], "status": "shortlisted"}
+        client = APIClient()
+        client.force_authenticate(self.applications[0].applicant)
+        self.assertEqual(client.post(url, payload, format="json").status_code, 403)
+
+        client.force_authenticate(self.poster)
+        response = client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["moved"], self.ids(0))
+        self.assertEqual(
+            body["skipped"], [{"id": self.applications[2].pk, "status": "hired"}]
+        )
+        self.assertEqual(body["not_found"], [999_999])
+
+        history = client.get(
+            f"/api/applications/{self.applications[0].pk}/history/"
+        ).json()
+        self.assertEqual(
+            [(row["from_status"], row["to_status"]) for row in history],
+            [("submitted", "shortlisted")],
+        )
@@ -0,0 +1,209 @@
+"""
+Job posting view counts.
+
+Counting a view does not write to the database. Each worker process adds it
+to an in-memory buffer keyed by ``(posting, day)``, and a background thread
+flushes the buffer every ``JOBS_VIEW_FLUSH_INTERVAL`` seconds. A flush adds
+the summed deltas to ``JobPosting.view_count`` and to the ``JobDailyViews``
+row of each day, with a few ``UPDATE ... CASE`` statements per batch of
+postings. A popular posting therefore costs one write per flush, not one
+per view.
+
+Repeat views of a posting by the same viewer are counted once per
+``JOBS_VIEW_DEDUPE_WINDOW`` seconds. The window is kept in the shared cache,
+so it spans processes wherever the cache does. A failed flush is logged and
+its deltas go back into the buffer for the next one. Views still buffered
+when a process is killed without running ``atexit`` handlers are lost.
+"""
+
+import atexit
+import datetime
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.utils import timezone
+
+from apps.jobs.models import JobDailyViews, JobPosting
+
+logger = logging.getLogger(__name__)
+
+DEDUPE_PREFIX = "jobs:viewed:"
+# Postings per UPDATE, keeping the CASE expression and parameter count bounded.
+FLUSH_CHUNK = 500
+
+
+def flush_interval():
+    return getattr(settings, "JOBS_VIEW_FLUSH_INTERVAL", 30)
+
+
+def viewer_key(request):
+    """Who is viewing: the user, the session, or a hash of address and agent."""
+    user = request.user
+    if user.is_authenticated:
+        return f"u:{user.pk}"
+    session = getattr(request, "session", None)
+    if session is not None and session.session_key:
+        return f"s:{session.session_key}"
+    client = (
+        f"{request.META.get('REMOTE_ADDR', '')}|"
+        f"{request.META.get('HTTP_USER_AGENT', '')}"
+    )
+    return f"a:{hashlib.md5(client.encode(), usedforsecurity=False).hexdigest()}"
+
+
+class ViewBuffer:
+    def __init__(self):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.flusher = None
+
+    def add(self, job_id, day, views=1):
+        with self.lock:
+            self.counts[(job_id, day)] += views
+            if self.flusher is None:
+                self.flusher = threading.Thread(target=self._run, daemon=True)
+                self.flusher.start()
+
+    def drain(self):
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+        return counts
+
+    def restore(self, counts):
+        with self.lock:
+            self.counts.update(counts)
+
+    def _run(self):
+        while True:
+            time.sleep(flush_interval())
+            self._flush()
+
+    def _flush(self):
+        try:
+            flush()
+        except Exception:
+            # Logged by flush(), which put the counts back; retry next time.
+            pass
+        finally:
+            connection.close()
+
+
+buffer = ViewBuffer()
+
+
+def record_view(request, job_id):
+    """Count a view of ``job_id`` unless this viewer was counted recently."""
+    try:
+        job_id = uuid.UUID(str(job_id))
+    except ValueError:
+        return False
+    window = getattr(settings, "JOBS_VIEW_DEDUPE_WINDOW", 30 * 60)
+    if window and not cache.add(
+        f"{DEDUPE_PREFIX}{job_id}:{viewer_key(request)}", 1, window
+    ):
+        return False
+    buffer.add(job_id, timezone.localdate())
+    return True
+
+
+def flush():
+    """Write buffered views to the database; returns how many were written."""
+    counts = buffer.drain()
+    if not counts:
+        return 0
+    try:
+        write(counts)
+    except BaseException as e:
+        # Including interrupts: drained counts must not be lost in between.
+        buffer.restore(counts)
+        if isinstance(e, Exception):
+            logger.exception(
+                "Flushing job views failed; %d deltas kept for the next flush",
+                len(counts),
+            )
+        raise
+    return sum(counts.values())
+
+
+def write(counts):
+    """Apply ``{(job_id, day): views}`` deltas in bulk."""
+    existing = set(
+        JobPosting.objects.filter(pk__in={job_id for job_id, _ in counts}).values_list(
+            "pk", flat=True
+        )
+    )
+    totals = Counter()
+    days = {}
+    for (job_id, day), views in counts.items():
+        if job_id in existing:
+            totals[job_id] += views
+            days.setdefault(day, {})[job_id] = views
+
+    with transaction.atomic():
+        for chunk in _chunks(list(totals.items())):
+            JobPosting.objects.filter(pk__in=[job_id for job_id, _ in chunk]).update(
+                view_count=F("view_count") + _delta("pk", chunk)
+            )
+        for day, views in days.items():
+            for chunk in _chunks(list(views.items())):
+                # Create missing rows first, then increment all of them, so a
+                # concurrent flush from another process cannot lose counts.
+                JobDailyViews.objects.bulk_create(
+                    [JobDailyViews(job_id=job_id, date=day) for job_id, _ in chunk],
+                    ignore_conflicts=True,
+                )
+                JobDailyViews.objects.filter(
+                    date=day, job_id__in=[job_id for job_id, _ in chunk]
+                ).update(views=F("views") + _delta("job_id", chunk))
+
+
+def _delta(field, pairs):
+    return Case(
+        *(When(**{field: key}, then=Value(value)) for key, value in pairs),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _chunks(items):
+    for start in range(0, len(items), FLUSH_CHUNK):
+        yield items[start : start + FLUSH_CHUNK]
+
+
+def trending(days=7, limit=20):
+    """``[(posting_id, views), ...]`` of active postings most viewed lately."""
+    since = timezone.localdate() - datetime.timedelta(days=days - 1)
+    return list(
+        JobDailyViews.objects.filter(date__gte=since, job__status="active")
+        .values("job_id")
+        .annotate(total=Sum("views"))
+        .order_by("-total", "job_id")
+        .values_list("job_id", "total")[:limit]
+    )
+
+
+def daily_views(job_id, days=30):
+    """``[(date, views), ...]`` for the last ``days`` days, oldest first,
+    with days without views filled in as zero."""
+    today = timezone.localdate()
+    since = today - datetime.timedelta(days=days - 1)
+    views = dict(
+        JobDailyViews.objects.filter(job_id=job_id, date__gte=since).values_list(
+            "date", "views"
+        )
+    )
+    return [
+        (day, views.get(day, 0))
+        for day in (since + datetime.timedelta(days=n) for n in range(days))
+    ]
+
+
+atexit.register(flush)
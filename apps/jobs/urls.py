@@ -1,9 +1,17 @@
 from rest_framework.routers import DefaultRouter
-from jobs.views import CompanyViewSet, JobPostingViewSet, JobApplicationViewSet
+from apps.jobs.views import (
+    CompanyViewSet,
+    DocumentViewSet,
+    JobApplicationViewSet,
+    JobPostingViewSet,
+    UploadSessionViewSet,
+)
 
 router = DefaultRouter()
 router.register(r"companies", CompanyViewSet)
 router.register(r"jobs", JobPostingViewSet)
 router.register(r"applications", JobApplicationViewSet)
+router.register(r"documents", DocumentViewSet, basename="document")
+router.register(r"uploads", UploadSessionViewSet, basename="upload")
 
 urlpatterns = router.urls
@@ -1,32 +1,83 @@
-from jobs.models import Company, JobApplication, JobPosting
-from jobs.serializers import (
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F
+from django.utils.http import parse_header_parameters
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+
+from apps.jobs import documents, facets, matching, pipeline, tracking
+from apps.jobs.models import (
+    Company,
+    DocumentOwner,
+    JobApplication,
+    JobPosting,
+    StoredDocument,
+    UploadSession,
+)
+from apps.jobs.serializers import (
+    CandidateSerializer,
     CompanySerializer,
+    JobApplicationRowSerializer,
     JobApplicationSerializer,
     JobPostingListSerializer,
     JobPostingSerializer,
+    MatchedJobSerializer,
+    PipelineApplicantRowSerializer,
+    StatusChangeSerializer,
+    StoredDocumentSerializer,
+    TransitionSerializer,
+    TrendingJobSerializer,
+    UploadSessionSerializer,
 )
-from rest_framework import permissions, viewsets
-from rest_framework.exceptions import PermissionDenied
+from apps.jobs.pagination import ApplicantPagination
+from config.cache import CacheResponseMixin
+from config.pagination import TRUTHY, CreatedAtKeysetPagination
+from config.serializers import ProjectedListMixin
+
+User = get_user_model()
 
 
-class CompanyViewSet(viewsets.ModelViewSet):
+class CompanyViewSet(CacheResponseMixin, viewsets.ModelViewSet):
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_tags = ("jobs.companies",)
+    cache_scope = "public"
 
     def perform_create(self, serializer):
         serializer.save()
 
 
-class JobPostingViewSet(viewsets.ModelViewSet):
+class JobPostingViewSet(CacheResponseMixin, viewsets.ModelViewSet):
     queryset = JobPosting.objects.all().select_related("company", "posted_by")
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = CreatedAtKeysetPagination
+    cache_tags = ("jobs",)
+    cache_scope = "public"
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            # Expired postings are closed by apps.jobs.expiry, so this needs no
+            # expires_at check and can use the partial job_active_created_idx.
+            queryset = queryset.filter(status="active")
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
             return JobPostingListSerializer
         return JobPostingSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            tracking.record_view(request, kwargs["pk"])
+        return response
+
     def perform_create(self, serializer):
         serializer.save(posted_by=self.request.user)
 
@@ -40,10 +91,290 @@ class JobPostingViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("You can only delete jobs you've posted.")
         instance.delete()
 
+    @action(
+        detail=False, methods=["get"], permission_classes=[permissions.IsAuthenticated]
+    )
+    def recommended(self, request):
+        """Open postings ranked by how well they match the user's skills.
+
+        Filters: ``?experience_level=``, ``?job_type=`` (comma-separated) and
+        ``?is_remote=``. Postings the user applied to or posted are left out.
+        """
+        me = request.user.pk
+        exclude = {
+            *JobApplication.objects.filter(applicant=me).values_list(
+                "job_id", flat=True
+            ),
+            *JobPosting.objects.filter(posted_by=me).values_list("pk", flat=True),
+        }
+        matches = matching.recommended_jobs(
+            me,
+            limit=self._limit(),
+            exclude=exclude,
+            experience_levels=self._choices(
+                "experience_level", matching.EXPERIENCE_LEVELS
+            ),
+            job_types=self._choices("job_type", matching.JOB_TYPES),
+            is_remote=self._bool("is_remote"),
+        )
+        postings = JobPosting.objects.select_related("company").in_bulk(
+            [pk for pk, _ in matches]
+        )
+        results = []
+        for pk, score in matches:
+            if pk in postings:
+                postings[pk].score = score
+                results.append(postings[pk])
+        return Response(MatchedJobSerializer(results, many=True).data)
+
+    @action(
+        detail=True, methods=["get"], permission_classes=[permissions.IsAuthenticated]
+    )
+    def candidates(self, request, pk=None):
+        """Users whose skills best match this posting, for its poster only.
+
+        Filters: ``?experience_level=`` (estimated from graduation year) and
+        ``?job_seeking=``.
+        """
+        posting = self.get_object()
+        if posting.posted_by_id != request.user.pk:
+            raise PermissionDenied("Only the poster can view candidates for a job.")
+        matches = matching.candidates(
+            posting,
+            limit=self._limit(),
+            exclude=[posting.posted_by_id],
+            experience_levels=self._choices(
+                "experience_level", matching.EXPERIENCE_LEVELS
+            ),
+            job_seeking=self._bool("job_seeking"),
+        )
+        users = User.objects.only("id", "first_name", "last_name").in_bulk(
+            [pk for pk, _ in matches]
+        )
+        results = []
+        for pk, score in matches:
+            if pk in users:
+                users[pk].score = score
+                results.append(users[pk])
+        return Response(CandidateSerializer(results, many=True).data)
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """Active postings with live facet counts.
+
+        Facets: ``job_type``, ``experience_level`` and ``salary_band``
+        (repeatable or comma-separated), ``industry`` and ``location``
+        (repeatable), and ``is_remote``. Ranges: ``salary_min`` and
+        ``salary_max``.
+        """
+        return self.cached_response(self.search_results, request)
+
+    def search_results(self, request):
+        salary_min = self._salary("salary_min")
+        salary_max = self._salary("salary_max")
+        is_remote = self._bool("is_remote")
+        selected = {
+            "job_type": self._choices("job_type", matching.JOB_TYPES),
+            "experience_level": self._choices(
+                "experience_level", matching.EXPERIENCE_LEVELS
+            ),
+            "is_remote": None if is_remote is None else [is_remote],
+            "industry": self._values("industry"),
+            "location": self._values("location"),
+            "salary_band": self._choices(
+                "salary_band", [label for label, _, _ in facets.SALARY_BANDS]
+            ),
+        }
+        total, counts = facets.facet_counts(selected, salary_min, salary_max)
+        queryset = facets.select(
+            facets.postings(salary_min, salary_max), selected
+        ).select_related("company")
+        page = self.paginate_queryset(queryset)
+        serializer = JobPostingListSerializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        response.data["total"] = total
+        response.data["facets"] = counts
+        return response
+
+    @action(detail=False, methods=["get"])
+    def trending(self, request):
+        """Active postings with the most views over the last ``?days=`` (1-30)."""
+        days = self._int("days", 7, upper=30)
+        limit = self._limit()
+        key = f"jobs:trending:{days}:{limit}"
+        ranked = cache.get(key)
+        if ranked is None:
+            ranked = tracking.trending(days=days, limit=limit)
+            cache.set(key, ranked, tracking.flush_interval())
+        postings = JobPosting.objects.select_related("company").in_bulk(
+            [pk for pk, _ in ranked]
+        )
+        results = []
+        for pk, views in ranked:
+            if pk in postings:
+                postings[pk].recent_views = views
+                results.append(postings[pk])
+        return Response(TrendingJobSerializer(results, many=True).data)
+
+    @action(
+        detail=True, methods=["get"], permission_classes=[permissions.IsAuthenticated]
+    )
+    def views(self, request, pk=None):
+        """Daily views of this posting over the last ``?days=`` (1-366)."""
+        posting = self.get_object()
+        if posting.posted_by_id != request.user.pk:
+            raise PermissionDenied("Only the poster can view a job's statistics.")
+        series = tracking.daily_views(posting.pk, days=self._int("days", 30, upper=366))
+        return Response(
+            {
+                "view_count": posting.view_count,
+                "daily": [{"date": day, "views": views} for day, views in series],
+            }
+        )
+
+    @action(
+        detail=True, methods=["get"], permission_classes=[permissions.IsAuthenticated]
+    )
+    def pipeline(self, request, pk=None):
+        """Applications per status, and the status transition matrix."""
+        posting = self.get_object()
+        if posting.posted_by_id != request.user.pk:
+            raise PermissionDenied("Only the poster can view a job's applicants.")
+        return Response(
+            {
+                "counts": pipeline.status_counts(posting),
+                "transitions": {
+                    current: pipeline.allowed(current, by_applicant=False)
+                    for current in pipeline.STATUSES
+                },
+            }
+        )
+
+    @action(
+        detail=True, methods=["get"], permission_classes=[permissions.IsAuthenticated]
+    )
+    def applicants(self, request, pk=None):
+        """This posting's applications, oldest first, filtered by ``?status=``."""
+        posting = self.get_object()
+        if posting.posted_by_id != request.user.pk:
+            raise PermissionDenied("Only the poster can view a job's applicants.")
+        queryset = JobApplication.objects.filter(job=posting)
+        statuses = self._choices("status", pipeline.STATUSES)
+        if statuses:
+            queryset = queryset.filter(status__in=statuses)
+
+        names = PipelineApplicantRowSerializer.projection(request)
+        paginator = ApplicantPagination()
+        columns = PipelineApplicantRowSerializer.lookups(names) + list(
+            paginator.ordering
+        )
+        rows = queryset.order_by(*paginator.ordering).values(*dict.fromkeys(columns))
+        page = paginator.paginate_queryset(rows, request, view=self)
+        serializer = PipelineApplicantRowSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        detail=True,
+        methods=["post"],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def transition(self, request, pk=None):
+        """Move ``applications`` (ids) of this posting to ``status`` at once.
+
+        Applications whose status does not allow the move are returned under
+        ``skipped`` with their current status.
+        """
+        posting = self.get_object()
+        if posting.posted_by_id != request.user.pk:
+            raise PermissionDenied("Only the poster can move a job's applicants.")
+        serializer = TransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            moved, skipped = pipeline.transition(
+                JobApplication.objects.filter(job=posting, pk__in=data["applications"]),
+                data["status"],
+                request.user,
+                note=data["note"],
+            )
+        except pipeline.TransitionError as e:
+            raise ValidationError({"status": str(e)})
+        missing = set(data["applications"]) - set(moved) - set(skipped)
+        return Response(
+            {
+                "status": data["status"],
+                "moved": moved,
+                "skipped": [
+                    {"id": pk, "status": current} for pk, current in skipped.items()
+                ],
+                "not_found": sorted(missing),
+            }
+        )
+
+    def _int(self, name, default, upper):
+        try:
+            return min(max(int(self.request.query_params.get(name, default)), 1), upper)
+        except ValueError:
+            return default
+
+    def _limit(self, default=20, upper=100):
+        try:
+            return min(
+                max(int(self.request.query_params.get("limit", default)), 1), upper
+            )
+        except ValueError:
+            return default
+
+    def _choices(self, name, allowed):
+        values = [
+            value.strip()
+            for raw in self.request.query_params.getlist(name)
+            for value in raw.split(",")
+            if value.strip()
+        ]
+        if not values:
+            return None
+        unknown = sorted(set(values) - set(allowed))
+        if unknown:
+            raise ValidationError(
+                {
+                    name: f"Unknown values: {', '.join(unknown)}. "
+                    f"Expected {', '.join(allowed)}."
+                }
+            )
+        return values
+
+    def _values(self, name):
+        """Free-text values; repeat the parameter to pass several."""
+        return [value for value in self.request.query_params.getlist(name) if value]
+
+    def _salary(self, name):
+        raw = self.request.query_params.get(name)
+        if not raw:
+            return None
+        try:
+            value = int(raw)
+        except ValueError:
+            value = -1
+        if value < 0:
+            raise ValidationError({name: "Expected a non-negative whole number."})
+        return value
+
+    def _bool(self, name):
+        raw = self.request.query_params.get(name)
+        if raw is None or raw == "":
+            return None
+        return raw.lower() in TRUTHY
 
-class JobApplicationViewSet(viewsets.ModelViewSet):
-    queryset = JobApplication.objects.select_related("job", "applicant").all()
+
+class JobApplicationViewSet(ProjectedListMixin, viewsets.ModelViewSet):
+    queryset = JobApplication.objects.select_related(
+        "job__company", "job__posted_by", "applicant"
+    ).order_by("-applied_at", "-pk")
     serializer_class = JobApplicationSerializer
+    row_serializer_class = JobApplicationRowSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def perform_create(self, serializer):
@@ -53,14 +384,225 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
         if JobApplication.objects.filter(job=job, applicant=applicant).exists():
             raise PermissionDenied("You have already applied for this job.")
 
-        serializer.save(applicant=applicant)
+        serializer.save(applicant=applicant, **self._document_fields(serializer))
 
     def perform_update(self, serializer):
         if serializer.instance.applicant != self.request.user:
             raise PermissionDenied("You can only modify your own applications.")
-        serializer.save()
+        serializer.save(**self._document_fields(serializer))
 
     def perform_destroy(self, instance):
         if instance.applicant != self.request.user:
             raise PermissionDenied("You can only delete your own applications.")
         instance.delete()
+
+    @action(detail=True, methods=["post"], url_path="status")
+    def set_status(self, request, pk=None):
+        """Move one application along the pipeline.
+
+        The posting's recruiter may make any move the matrix allows except
+        withdrawing, which is left to the applicant.
+        """
+        application = self.get_object()
+        by_applicant = application.applicant_id == request.user.pk
+        if not by_applicant and application.job.posted_by_id != request.user.pk:
+            raise PermissionDenied(
+                "Only the applicant or the job's poster can change its status."
+            )
+        target = request.data.get("status")
+        if target not in pipeline.STATUSES:
+            raise ValidationError({"status": "Unknown status."})
+        try:
+            moved, skipped = pipeline.transition(
+                JobApplication.objects.filter(pk=application.pk),
+                target,
+                request.user,
+                note=request.data.get("note") or "",
+                by_applicant=by_applicant,
+            )
+        except pipeline.TransitionError as e:
+            raise ValidationError({"status": str(e)})
+        if not moved:
+            raise ValidationError(
+                {
+                    "status": f"An application that is {skipped[application.pk]} "
+                    f"cannot move to {target}."
+                }
+            )
+        application.refresh_from_db()
+        return Response(self.get_serializer(application).data)
+
+    @action(detail=True, methods=["get"])
+    def history(self, request, pk=None):
+        """Status changes of this application, oldest first."""
+        application = self.get_object()
+        if request.user.pk not in (
+            application.applicant_id,
+            application.job.posted_by_id,
+        ):
+            raise PermissionDenied(
+                "Only the applicant or the job's poster can view its history."
+            )
+        return Response(
+            StatusChangeSerializer(application.status_changes.all(), many=True).data
+        )
+
+    def _document_fields(self, serializer):
+        """Store a multipart resume deduplicated, and describe attached uploads."""
+        data = serializer.validated_data
+        fields = {}
+        upload = data.get("resume")
+        if upload is not None:
+            try:
+                fields["resume_document"] = documents.store_uploaded_file(
+                    upload, self.request.user
+                )
+            except documents.UploadError as e:
+                raise ValidationError({"resume": str(e)})
+        resume = fields.get("resume_document") or data.get("resume_document")
+        if resume is not None:
+            fields["resume"] = resume.file.name
+
+        attached = data.pop("additional_document_ids", None)
+        if attached:
+            filenames = dict(
+                DocumentOwner.objects.filter(
+                    owner=self.request.user, document__in=attached
+                ).values_list("document_id", "filename")
+            )
+            existing = data.get("additional_documents")
+            if existing is None and serializer.instance is not None:
+                existing = serializer.instance.additional_documents
+            fields["additional_documents"] = [
+                *(existing or []),
+                *(
+                    {
+                        "id": str(document.pk),
+                        "filename": filenames.get(document.pk, ""),
+                        "size": document.size,
+                        "file": document.file.name,
+                    }
+                    for document in attached
+                ),
+            ]
+        return fields
+
+
+class DocumentViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """Upload documents in one request, streamed from the raw body.
+
+    ``POST /api/documents/?filename=cv.pdf`` with the file as the body, or a
+    multipart ``file`` field. Identical content is stored once.
+    """
+
+    serializer_class = StoredDocumentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        # Each owner sees the name they uploaded the file under.
+        return StoredDocument.objects.filter(
+            ownerships__owner=self.request.user
+        ).annotate(filename=F("ownerships__filename"))
+
+    def create(self, request):
+        try:
+            if request.content_type.startswith("multipart/form-data"):
+                upload = request.data.get("file")
+                if upload is None:
+                    raise ValidationError({"file": "No file was uploaded."})
+                document = documents.store_uploaded_file(upload, request.user)
+            else:
+                document = documents.store_stream(
+                    request.stream.read if request.stream else lambda size: b"",
+                    self._filename(request),
+                    request.user,
+                    length=self._content_length(request),
+                )
+        except documents.UploadError as e:
+            raise ValidationError({"file": str(e)})
+        return Response(
+            self.get_serializer(document).data, status=status.HTTP_201_CREATED
+        )
+
+    @staticmethod
+    def _filename(request):
+        filename = request.query_params.get("filename")
+        if not filename:
+            _, params = parse_header_parameters(
+                request.headers.get("Content-Disposition", "")
+            )
+            filename = params.get("filename")
+        if not filename:
+            raise ValidationError(
+                {"filename": "Pass ?filename= or a Content-Disposition header."}
+            )
+        return filename
+
+    @staticmethod
+    def _content_length(request):
+        try:
+            return int(request.headers.get("Content-Length", ""))
+        except ValueError:
+            return None
+
+
+class UploadSessionViewSet(
+    mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
+):
+    """Resumable uploads.
+
+    1. ``POST`` ``{"filename", "size"}`` opens a session.
+    2. ``PUT`` each chunk as the raw body with ``Content-Range: bytes
+       start-end/size``, in order. After an interruption, ``GET`` the session
+       and continue from ``received``.
+    3. ``POST .../complete/``, optionally with ``{"sha256"}``, stores the file.
+    """
+
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    content_range_re = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(owner=self.request.user).select_related(
+            "document"
+        )
+
+    def perform_create(self, serializer):
+        try:
+            serializer.instance = documents.open_session(
+                self.request.user,
+                serializer.validated_data["filename"],
+                serializer.validated_data["size"],
+            )
+        except documents.UploadError as e:
+            raise ValidationError({"file": str(e)})
+
+    def update(self, request, pk=None):
+        session = self.get_object()
+        match = self.content_range_re.match(request.headers.get("Content-Range", ""))
+        if match is None:
+            raise ValidationError(
+                {"Content-Range": "Expected 'bytes start-end/size' for the chunk."}
+            )
+        start, end = int(match[1]), int(match[2])
+        if end < start:
+            raise ValidationError({"Content-Range": "The range is empty."})
+        try:
+            documents.write_chunk(
+                session,
+                start,
+                end - start + 1,
+                request.stream.read if request.stream else lambda size: b"",
+            )
+        except documents.UploadError as e:
+            raise ValidationError({"file": str(e)})
+        return Response(self.get_serializer(session).data)
+
+    @action(detail=True, methods=["post"])
+    def complete(self, request, pk=None):
+        session = self.get_object()
+        try:
+            documents.complete_session(session, request.data.get("sha256"))
+        except documents.UploadError as e:
+            raise ValidationError({"file": str(e)})
+        return Response(self.get_serializer(session).data)
@@ -0,0 +1,87 @@
+"""
+Fan-out of chat events to connected sockets.
+
+Events are published to channels, one per user (``user:<id>``). A socket
+subscribes to its user's channel, so it hears about every conversation the
+user is in, including ones created after it connected. Payloads are encoded
+once by the publisher and handed to every subscriber as the same string.
+
+``MESSAGING_BUS`` names the ``Bus`` class to use. ``InProcessBus`` delivers
+within the current process only, which serves tests and single-process
+deployments. A multi-process deployment plugs in a subclass whose
+``publish`` goes through a broker and which feeds what it receives to
+``deliver``.
+"""
+
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+class Bus:
+    """Subscribers are objects with a non-blocking ``deliver(payload)``."""
+
+    def subscribe(self, channel, subscriber):
+        raise NotImplementedError
+
+    def unsubscribe(self, channel, subscriber):
+        raise NotImplementedError
+
+    def publish(self, channels, payload):
+        raise NotImplementedError
+
+
+class InProcessBus(Bus):
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def subscribe(self, channel, subscriber):
+        with self.lock:
+            self.subscribers[channel].add(subscriber)
+
+    def unsubscribe(self, channel, subscriber):
+        with self.lock:
+            subscribers = self.subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.subscribers[channel]
+
+    def publish(self, channels, payload):
+        self.deliver(channels, payload)
+
+    def deliver(self, channels, payload):
+        """Hand ``payload`` to this process's subscribers of ``channels``."""
+        with self.lock:
+            targets = [
+                subscriber
+                for channel in channels
+                for subscriber in self.subscribers.get(channel, ())
+            ]
+        for subscriber in targets:
+            subscriber.deliver(payload)
+        return len(targets)
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_bus():
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = import_string(
+                    getattr(
+                        settings, "MESSAGING_BUS", "apps.messaging.bus.InProcessBus"
+                    )
+                )()
+    return _bus
@@ -0,0 +1,168 @@
+"""
+Conversations and messages: creating them and publishing chat events.
+
+Both the REST API and the WebSocket endpoint go through here, so a message
+posted either way is stored once and published once, after its transaction
+commits, to every member's channel on the bus. Posting and reading also
+keep the members' unread-message badges in step.
+
+The member list of a conversation is read on every message, so it is kept
+in the cache and dropped whenever a membership changes.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from apps.messaging import storage
+from apps.messaging.bus import get_bus, user_channel
+from apps.messaging.models import Conversation, ConversationMember
+from apps.notifications import badges
+from config.cache import default_timeout
+from config.renderers import dumps
+
+MEMBERS_PREFIX = "messaging:members:"
+
+
+class ChatError(Exception):
+    pass
+
+
+def max_length():
+    return getattr(settings, "MESSAGING_MAX_MESSAGE_LENGTH", 4000)
+
+
+def members(conversation_id):
+    """Ids (as strings) of the users in a conversation, cached."""
+    key = f"{MEMBERS_PREFIX}{conversation_id}"
+    user_ids = cache.get(key)
+    if user_ids is None:
+        user_ids = [
+            str(user_id)
+            for user_id in ConversationMember.objects.filter(
+                conversation_id=conversation_id
+            ).values_list("user_id", flat=True)
+        ]
+        cache.set(key, user_ids, default_timeout())
+    return user_ids
+
+
+def forget_members(conversation_id):
+    cache.delete(f"{MEMBERS_PREFIX}{conversation_id}")
+
+
+def is_member(conversation_id, user_id):
+    return str(user_id) in members(conversation_id)
+
+
+def encode(event):
+    return dumps(event).decode()
+
+
+def publish(conversation_id, event, exclude=None):
+    """Send ``event`` to the members of a conversation, bar ``exclude``."""
+    channels = [
+        user_channel(user_id)
+        for user_id in members(conversation_id)
+        if user_id != exclude
+    ]
+    if channels:
+        get_bus().publish(channels, encode(event))
+
+
+def message_event(message):
+    return {
+        "type": "message",
+        "message": {
+            "id": message.pk,
+            "conversation": message.conversation_id,
+            "sender": message.sender_id,
+            "body": message.body,
+            "created_at": message.created_at,
+        },
+    }
+
+
+def post_message(conversation_id, sender_id, body):
+    """Store a message from ``sender_id`` and publish it once committed."""
+    if not isinstance(body, str) or not body.strip():
+        raise ChatError("A message needs a body.")
+    if len(body) > max_length():
+        raise ChatError(f"Messages are limited to {max_length()} characters.")
+    if not is_member(conversation_id, sender_id):
+        raise ChatError("You are not a member of this conversation.")
+    with transaction.atomic():
+        message = storage.create(conversation_id, sender_id, body)
+        Conversation.objects.filter(pk=conversation_id).update(
+            updated_at=message.created_at
+        )
+        badges.adjust(
+            [
+                user_id
+                for user_id in members(conversation_id)
+                if user_id != str(sender_id)
+            ],
+            messages=1,
+        )
+        transaction.on_commit(lambda: publish(conversation_id, message_event(message)))
+    return message
+
+
+def mark_read(user_id, conversation_id, message_id):
+    """Mark the conversation read up to ``message_id`` for ``user_id``."""
+    with transaction.atomic():
+        marked = storage.mark_read(user_id, conversation_id, message_id)
+        badges.adjust([user_id], messages=-marked)
+    return marked
+
+
+def typing(conversation_id, user_id):
+    """Tell the other members that ``user_id`` is typing; nothing is stored."""
+    if not is_member(conversation_id, user_id):
+        raise ChatError("You are not a member of this conversation.")
+    publish(
+        conversation_id,
+        {"type": "typing", "conversation": conversation_id, "user": str(user_id)},
+        exclude=str(user_id),
+    )
+
+
+def direct_conversation(user, other):
+    """The 1:1 conversation between two users, created on first use."""
+    if user.pk == other.pk:
+        raise ChatError("You cannot start a conversation with yourself.")
+    key = ":".join(sorted((str(user.pk), str(other.pk))))
+    conversation = Conversation.objects.filter(direct_key=key).first()
+    if conversation is not None:
+        return conversation
+    try:
+        with transaction.atomic():
+            conversation = Conversation.objects.create(
+                kind="direct", created_by=user, direct_key=key
+            )
+            ConversationMember.objects.bulk_create(
+                [
+                    ConversationMember(conversation=conversation, user=user),
+                    ConversationMember(conversation=conversation, user=other),
+                ]
+            )
+    except IntegrityError:
+        # Both users started it at the same time; use the one that won.
+        conversation = Conversation.objects.get(direct_key=key)
+    return conversation
+
+
+def group_conversation(owner, title, users):
+    with transaction.atomic():
+        conversation = Conversation.objects.create(
+            kind="group", title=title, created_by=owner
+        )
+        ConversationMember.objects.bulk_create(
+            [ConversationMember(conversation=conversation, user=owner, role="owner")]
+            + [
+                ConversationMember(conversation=conversation, user=user)
+                for user in users
+                if user.pk != owner.pk
+            ]
+        )
+    return conversation
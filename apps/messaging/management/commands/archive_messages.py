@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.messaging import storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Compress month tables of messages older than --keep-months into "
+        "archives, and create the tables for this month and next."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-months",
+            type=int,
+            default=6,
+            help="Months kept as tables, the current one included.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="List the months to archive only."
+        )
+
+    def handle(self, *args, **options):
+        current = storage.month_of(timezone.now())
+        kept = [current]
+        for _ in range(max(options["keep_months"], 1) - 1):
+            year, month = divmod(kept[-1], 100)
+            kept.append((year - 1) * 100 + 12 if month == 1 else kept[-1] - 1)
+        cold = [month for month in storage.partitions(refresh=True) if month < kept[-1]]
+        if options["dry_run"]:
+            self.stdout.write(f"Months to archive: {cold or 'none'}.")
+            return
+
+        for month in (current, storage.next_month(current)):
+            storage.ensure_partition(month)
+        for month in cold:
+            count = storage.archive_month(month)
+            self.stdout.write(
+                self.style.SUCCESS(f"Archived {count} messages from {month}.")
+            )
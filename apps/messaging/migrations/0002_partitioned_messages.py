@@ -0,0 +1,122 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:07
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.messaging import storage
+
+# Old messages per bulk_create into a month table.
+MOVE_BATCH = 1000
+
+
+def move_messages(apps, schema_editor):
+    """Copy the single ``Message`` table into the month tables.
+
+    Each message gets a time-ordered id from its ``created_at`` (node 0),
+    in ``(created_at, id)`` order; messages from before ``storage.EPOCH``
+    get ids just after the epoch, so they land in its month. The old table
+    kept no read state, so every member's read marker is moved past the
+    copied messages rather than reporting the whole history as unread.
+    """
+    Message = apps.get_model("messaging", "Message")
+    ConversationMember = apps.get_model("messaging", "ConversationMember")
+    last = -1
+    sequence = 0
+    newest = {}
+    batch = []
+    batch_month = None
+
+    def flush():
+        if batch:
+            storage.ensure_partition(batch_month).objects.bulk_create(batch)
+            batch.clear()
+
+    messages = Message.objects.order_by("created_at", "id").values_list(
+        "conversation_id", "sender_id", "body", "created_at"
+    )
+    for conversation_id, sender_id, body, created_at in messages.iterator(
+        chunk_size=2000
+    ):
+        ms = (created_at - storage.EPOCH) // datetime.timedelta(milliseconds=1)
+        ms = max(ms, 1)
+        if ms <= last:
+            ms = last
+            sequence = (sequence + 1) & ((1 << storage.SEQUENCE_BITS) - 1)
+            if sequence == 0:
+                ms += 1
+        else:
+            sequence = 0
+        last = ms
+        message_id = ms << (storage.NODE_BITS + storage.SEQUENCE_BITS) | sequence
+        month = storage.month_of_id(message_id)
+        if month != batch_month or len(batch) >= MOVE_BATCH:
+            flush()
+            batch_month = month
+        batch.append(
+            storage.partition(month)(
+                id=message_id,
+                conversation_id=conversation_id,
+                sender_id=sender_id,
+                body=body,
+                created_at=created_at,
+            )
+        )
+        newest[conversation_id] = message_id
+    flush()
+    for conversation_id, message_id in newest.items():
+        ConversationMember.objects.filter(conversation_id=conversation_id).update(
+            last_read_id=message_id
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messaging", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversationmember",
+            name="last_read_id",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="MessageArchive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.PositiveIntegerField()),
+                ("first_id", models.BigIntegerField()),
+                ("last_id", models.BigIntegerField()),
+                ("count", models.PositiveIntegerField()),
+                ("data", models.BinaryField()),
+                (
+                    "conversation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archives",
+                        to="messaging.conversation",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("conversation", "month")},
+            },
+        ),
+        # Reversing leaves the month tables in place; the restored Message
+        # table starts empty.
+        migrations.RunPython(move_messages, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name="Message",
+        ),
+    ]
@@ -1,3 +1,98 @@
+from django.contrib.auth import get_user_model
 from django.db import models
 
-# Create your models here.
+User = get_user_model()
+
+CONVERSATION_KIND_CHOICES = [
+    ("direct", "Direct"),
+    ("group", "Group"),
+]
+MEMBER_ROLE_CHOICES = [
+    ("owner", "Owner"),
+    ("member", "Member"),
+]
+
+
+class Conversation(models.Model):
+    kind = models.CharField(max_length=10, choices=CONVERSATION_KIND_CHOICES)
+    title = models.CharField(max_length=200, blank=True)
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    # "<user id>:<user id>", sorted, so there is one direct conversation per pair.
+    direct_key = models.CharField(max_length=80, unique=True, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Time of the latest message, for listing conversations by activity.
+    updated_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.title or f"{self.kind} conversation {self.pk}"
+
+
+class ConversationMember(models.Model):
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, related_name="members"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="conversation_memberships"
+    )
+    role = models.CharField(
+        max_length=10, choices=MEMBER_ROLE_CHOICES, default="member"
+    )
+    joined_at = models.DateTimeField(auto_now_add=True)
+    # Newest message the user has read; later ones count as unread.
+    last_read_id = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ["conversation", "user"]
+        indexes = [
+            models.Index(
+                fields=["user", "conversation"], name="conversation_member_idx"
+            ),
+        ]
+
+
+class PartitionedMessage(models.Model):
+    """Columns of a message. Messages live in one table per month, created
+    at runtime by ``apps.messaging.storage``; ``id`` encodes when the message
+    was written, and so which table holds it.
+
+    The relations are unconstrained, since month tables come and go outside
+    migrations.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    conversation = models.ForeignKey(
+        Conversation,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    sender = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name="+",
+    )
+    body = models.TextField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+
+
+class MessageArchive(models.Model):
+    """One conversation's messages from one archived month, compressed."""
+
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, related_name="archives"
+    )
+    month = models.PositiveIntegerField()  # YYYYMM
+    first_id = models.BigIntegerField()
+    last_id = models.BigIntegerField()
+    count = models.PositiveIntegerField()
+    data = models.BinaryField()
+
+    class Meta:
+        unique_together = ["conversation", "month"]
@@ -0,0 +1,49 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from apps.messaging import storage
+from config.pagination import KeysetPagination
+
+
+class ConversationPagination(KeysetPagination):
+    """Conversations with the most recent activity first."""
+
+    ordering = ("-updated_at", "-pk")
+    page_size = 30
+
+
+class MessageHistoryPagination:
+    """A conversation's messages, newest first, older than ``?before=<id>``.
+
+    History spans the month tables and the archive, so it is paged by
+    message id rather than through a single queryset.
+    """
+
+    before_query_param = "before"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 100
+
+    def paginate(self, conversation, request):
+        self.request = request
+        try:
+            before = int(request.query_params.get(self.before_query_param) or 0)
+            size = int(request.query_params.get(self.page_size_query_param) or 0)
+        except ValueError:
+            raise ValidationError("before and page_size must be integers.")
+        size = min(size or self.page_size, self.max_page_size)
+        messages = storage.history(conversation, before=before or None, limit=size + 1)
+        self.has_next = len(messages) > size
+        self.messages = messages[:size]
+        return self.messages
+
+    def get_paginated_response(self, data):
+        next_link = None
+        if self.has_next:
+            next_link = replace_query_param(
+                self.request.build_absolute_uri(),
+                self.before_query_param,
+                self.messages[-1]["id"],
+            )
+        return Response({"next": next_link, "results": data})
@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from rest_framework import serializers
+
+from apps.messaging.models import Conversation, ConversationMember
+
+User = get_user_model()
+
+
+class MemberSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(source="user.id", read_only=True)
+    first_name = serializers.CharField(source="user.first_name", read_only=True)
+    last_name = serializers.CharField(source="user.last_name", read_only=True)
+
+    class Meta:
+        model = ConversationMember
+        fields = ("id", "first_name", "last_name", "role", "joined_at")
+
+
+class ConversationSerializer(serializers.ModelSerializer):
+    members = MemberSerializer(many=True, read_only=True)
+    user_ids = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.filter(is_active=True), many=True, write_only=True
+    )
+
+    class Meta:
+        model = Conversation
+        fields = [
+            "id",
+            "kind",
+            "title",
+            "members",
+            "user_ids",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["id", "created_at", "updated_at"]
+
+    def validate(self, attrs):
+        if attrs["kind"] == "direct" and len(attrs["user_ids"]) != 1:
+            raise serializers.ValidationError(
+                {"user_ids": "A direct conversation has exactly one other member."}
+            )
+        if attrs["kind"] == "group" and not attrs["user_ids"]:
+            raise serializers.ValidationError(
+                {"user_ids": "Add at least one member to a group."}
+            )
+        return attrs
+
+
+class MessageSerializer(serializers.Serializer):
+    """A message from ``apps.messaging.storage``: a month-table row or an
+    archived one."""
+
+    id = serializers.IntegerField(read_only=True)
+    conversation = serializers.IntegerField(source="conversation_id", read_only=True)
+    sender = serializers.UUIDField(source="sender_id", read_only=True)
+    body = serializers.CharField()
+    created_at = serializers.DateTimeField(read_only=True)
@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.messaging import chat
+from apps.messaging.models import ConversationMember
+
+
+@receiver(post_save, sender=ConversationMember)
+@receiver(post_delete, sender=ConversationMember)
+def forget_members(sender, instance, raw=False, **kwargs):
+    if not raw:
+        conversation_id = instance.conversation_id
+        transaction.on_commit(lambda: chat.forget_members(conversation_id))
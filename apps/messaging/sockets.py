@@ -0,0 +1,209 @@
+"""
+The ``/ws/chat/`` WebSocket endpoint, as a plain ASGI application.
+
+Clients authenticate with an access token in the query string
+(``/ws/chat/?token=<jwt>``), since browsers cannot set headers on a
+WebSocket. Frames are JSON text in both directions:
+
+* ``{"type": "send", "conversation": id, "body": "...", "client_id": "..."}``
+  posts a message, acknowledged with ``{"type": "ack", "client_id", "id"}``;
+* ``{"type": "typing", "conversation": id}`` tells the other members;
+* ``{"type": "read", "conversation": id, "message": id}`` marks messages
+  up to ``message`` as read;
+* ``{"type": "ping"}`` is answered with ``{"type": "pong"}``.
+
+The server sends ``message`` and ``typing`` events from the bus, and
+``error`` events for rejected frames. A frame that fails on the server is
+logged and answered with an ``error`` event too; the connection stays open
+and the client may retry.
+
+A connection costs one subscription and one small writer task, and holds no
+database connection while idle. Backpressure is per connection. Incoming
+frames are handled one at a time, so a fast sender waits on its own
+messages being stored. Database work runs on the default thread pool
+(``thread_sensitive=False``), so connections do not queue behind each
+other on one shared thread. Outgoing events wait in a queue of
+``MESSAGING_SEND_QUEUE_SIZE``. A client that falls that far behind is
+disconnected (code 1013) rather than buffered without limit; it reconnects
+and catches up from the message history API.
+"""
+
+import asyncio
+import logging
+import threading
+from urllib.parse import parse_qs
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.exceptions import AuthenticationFailed
+
+from apps.accounts.authentication import CachedJWTAuthentication
+from apps.messaging import chat
+from apps.messaging.bus import get_bus, user_channel
+
+logger = logging.getLogger(__name__)
+
+# Close codes; the 4xxx range is free for applications.
+UNAUTHORIZED = 4401
+NOT_FOUND = 4404
+TRY_AGAIN_LATER = 1013
+# Seconds to wait for a stalled client to take the close frame.
+CLOSE_TIMEOUT = 5
+
+
+def queue_size():
+    return getattr(settings, "MESSAGING_SEND_QUEUE_SIZE", 256)
+
+
+def authenticate(scope):
+    """The user named by ``?token=``, or None."""
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    token = (query.get("token") or [""])[0]
+    if not token:
+        return None
+    close_old_connections()
+    authentication = CachedJWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(token))
+    except AuthenticationFailed:
+        return None
+
+
+def handle(user_id, frame):
+    """Act on one client frame; returns the reply, if any."""
+    close_old_connections()
+    kind = frame.get("type")
+    if kind == "ping":
+        return {"type": "pong"}
+    conversation_id = frame.get("conversation")
+    if not isinstance(conversation_id, int):
+        raise chat.ChatError("Name a conversation by id.")
+    if kind == "send":
+        message = chat.post_message(conversation_id, user_id, frame.get("body"))
+        return {"type": "ack", "client_id": frame.get("client_id"), "id": message.pk}
+    if kind == "typing":
+        chat.typing(conversation_id, user_id)
+        return None
+    if kind == "read":
+        message_id = frame.get("message")
+        if not isinstance(message_id, int):
+            raise chat.ChatError("Name the last message read by id.")
+        chat.mark_read(user_id, conversation_id, message_id)
+        return None
+    raise chat.ChatError(f"Unknown frame type: {kind}.")
+
+
+class Connection:
+    """One socket's outgoing queue; the bus subscriber for its user."""
+
+    def __init__(self, send):
+        self.send = send
+        self.loop = asyncio.get_running_loop()
+        self.thread = threading.get_ident()
+        self.queue = asyncio.Queue(maxsize=queue_size())
+        # Resolved once the queue overflows; the socket is then closed.
+        self.overflowed = self.loop.create_future()
+
+    def deliver(self, payload):
+        # The bus may publish from a worker thread (e.g. a REST request).
+        if threading.get_ident() == self.thread:
+            self._put(payload)
+        else:
+            self.loop.call_soon_threadsafe(self._put, payload)
+
+    def _put(self, payload):
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            if not self.overflowed.done():
+                self.overflowed.set_result(None)
+
+    async def write(self):
+        while True:
+            payload = await self.queue.get()
+            await self.send({"type": "websocket.send", "text": payload})
+
+    def reply(self, event):
+        self._put(chat.encode(event))
+
+
+async def websocket_application(scope, receive, send):
+    """Route WebSocket connections by path."""
+    handler = ROUTES.get(scope["path"])
+    if handler is None:
+        await receive()
+        await send({"type": "websocket.close", "code": NOT_FOUND})
+        return
+    await handler(scope, receive, send)
+
+
+async def chat_application(scope, receive, send):
+    event = await receive()
+    if event["type"] != "websocket.connect":
+        return
+    user = await sync_to_async(authenticate, thread_sensitive=False)(scope)
+    if user is None:
+        await send({"type": "websocket.close", "code": UNAUTHORIZED})
+        return
+    await send({"type": "websocket.accept"})
+
+    user_id = str(user.pk)
+    connection = Connection(send)
+    bus = get_bus()
+    bus.subscribe(user_channel(user_id), connection)
+    writer = asyncio.create_task(connection.write())
+    overflow = connection.overflowed
+    try:
+        while True:
+            receiving = asyncio.create_task(receive())
+            done, _ = await asyncio.wait(
+                {receiving, overflow, writer}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if receiving not in done:
+                receiving.cancel()
+                if overflow in done:
+                    writer.cancel()
+                    try:
+                        await asyncio.wait_for(
+                            send({"type": "websocket.close", "code": TRY_AGAIN_LATER}),
+                            CLOSE_TIMEOUT,
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                break
+            event = receiving.result()
+            if event["type"] == "websocket.disconnect":
+                break
+            if event["type"] != "websocket.receive":
+                continue
+            await receive_frame(connection, user_id, event)
+    finally:
+        bus.unsubscribe(user_channel(user_id), connection)
+        writer.cancel()
+        overflow.cancel()
+
+
+async def receive_frame(connection, user_id, event):
+    frame = None
+    try:
+        frame = orjson.loads(event.get("text") or event.get("bytes") or b"")
+        if not isinstance(frame, dict):
+            raise chat.ChatError("Frames are JSON objects.")
+        reply = await sync_to_async(handle, thread_sensitive=False)(user_id, frame)
+    except orjson.JSONDecodeError:
+        reply = {"type": "error", "detail": "Frames are JSON objects."}
+    except chat.ChatError as e:
+        reply = {"type": "error", "detail": str(e)}
+    except Exception:
+        logger.exception("Chat frame from user %s failed", user_id)
+        reply = {"type": "error", "detail": "Server error; try again."}
+    if reply is not None and reply["type"] == "error":
+        if isinstance(frame, dict) and frame.get("client_id") is not None:
+            reply["client_id"] = frame["client_id"]
+    if reply is not None:
+        connection.reply(reply)
+
+
+ROUTES = {"/ws/chat/": chat_application}
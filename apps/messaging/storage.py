@@ -0,0 +1,482 @@
+"""
+Message storage, split into one table per month.
+
+Every message is written to ``messaging_message_<YYYYMM>`` for the (UTC)
+month it was sent in. Tables are created on first use, and ahead of time by
+the ``archive_messages`` command. Each is indexed on
+``(conversation, id)``. Message ids are 64-bit and time-ordered: the
+milliseconds since ``EPOCH``, a per-process node number and a sequence. An
+id therefore says which table holds its message. It also orders messages
+across tables, which the "older than" cursor of ``history`` relies on.
+
+Old months are compacted by ``archive_month``. For each conversation, that
+month's messages become one zlib-compressed ``MessageArchive`` row, and the
+month's table is dropped whole, with no row-by-row ``DELETE``. ``history``
+reads archived months transparently.
+
+Unread counts come from ``ConversationMember.last_read_id``. They are the
+messages from others with a larger id, counted over the month tables only.
+Archived months count as read, so archiving forgets the unread badges
+(``apps.notifications.badges``) of members who had not read them.
+``mark_read`` reports how many messages it marked, so the badge can be kept
+up to date without recounting.
+"""
+
+import datetime
+import itertools
+import random
+import threading
+import time
+import zlib
+
+import orjson
+from django.db import DatabaseError, IntegrityError, connection, models, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from apps.messaging.models import (
+    ConversationMember,
+    MessageArchive,
+    PartitionedMessage,
+)
+
+EPOCH = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+TABLE_PREFIX = "messaging_message_"
+SEQUENCE_BITS = 12
+NODE_BITS = 10
+# Conversations per bulk_create while archiving; each row is a whole month.
+ARCHIVE_BATCH = 100
+
+
+# Ids
+
+
+class IdGenerator:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.node = random.getrandbits(NODE_BITS)
+        self.last = 0
+        self.sequence = 0
+
+    def next(self):
+        """A new id, and the time it encodes."""
+        with self.lock:
+            now = max(int(time.time() * 1000) - epoch_ms(), self.last)
+            if now == self.last:
+                self.sequence = (self.sequence + 1) & ((1 << SEQUENCE_BITS) - 1)
+                if self.sequence == 0:
+                    now += 1  # Sequence exhausted; borrow the next millisecond.
+            else:
+                self.sequence = 0
+            self.last = now
+            message_id = (
+                now << (NODE_BITS + SEQUENCE_BITS)
+                | self.node << SEQUENCE_BITS
+                | self.sequence
+            )
+        return message_id, id_time(message_id)
+
+    def reseed(self):
+        with self.lock:
+            self.node = random.getrandbits(NODE_BITS)
+
+
+ids = IdGenerator()
+
+
+def epoch_ms():
+    return int(EPOCH.timestamp() * 1000)
+
+
+def id_time(message_id):
+    ms = message_id >> (NODE_BITS + SEQUENCE_BITS)
+    return EPOCH + datetime.timedelta(milliseconds=ms)
+
+
+def month_of(moment):
+    moment = moment.astimezone(datetime.timezone.utc)
+    return moment.year * 100 + moment.month
+
+
+def month_of_id(message_id):
+    return month_of(id_time(message_id))
+
+
+def next_month(month):
+    year, month = divmod(month, 100)
+    return (year + 1) * 100 + 1 if month == 12 else year * 100 + month + 1
+
+
+def previous_month(month):
+    year, month = divmod(month, 100)
+    return (year - 1) * 100 + 12 if month == 1 else year * 100 + month - 1
+
+
+# Month tables
+
+# Seconds before the list of month tables is read again, picking up tables
+# created or dropped by other processes.
+TABLES_MAX_AGE = 60
+
+_models = {}
+_tables = set()
+_tables_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def partition(month):
+    """The model of ``month``'s table (which may not exist yet)."""
+    with _lock:
+        model = _models.get(month)
+        if model is None:
+            meta = type(
+                "Meta",
+                (),
+                {
+                    "app_label": "messaging",
+                    "db_table": f"{TABLE_PREFIX}{month}",
+                    "managed": False,
+                    "indexes": [
+                        models.Index(
+                            fields=["conversation", "id"],
+                            name=f"msg_{month}_history_idx",
+                        )
+                    ],
+                },
+            )
+            model = type(
+                f"Message{month}",
+                (PartitionedMessage,),
+                {"__module__": __name__, "Meta": meta},
+            )
+            _models[month] = model
+        return model
+
+
+def partitions(refresh=False):
+    """Months that have a table, oldest first."""
+    global _tables_loaded_at
+    if refresh or time.monotonic() - _tables_loaded_at > TABLES_MAX_AGE:
+        names = connection.introspection.table_names()
+        found = {
+            int(name[len(TABLE_PREFIX) :])
+            for name in names
+            if name.startswith(TABLE_PREFIX) and name[len(TABLE_PREFIX) :].isdigit()
+        }
+        with _lock:
+            _tables.clear()
+            _tables.update(found)
+            _tables_loaded_at = time.monotonic()
+    return sorted(_tables)
+
+
+def ensure_partition(month):
+    """Create ``month``'s table unless it exists. Works inside transactions."""
+    if month in _tables or month in partitions(refresh=True):
+        return partition(month)
+    model = partition(month)
+    # Only collect the DDL: a schema editor refuses to run inside a
+    # transaction on SQLite, but these statements are fine there.
+    editor = connection.SchemaEditorClass(connection, collect_sql=True)
+    editor.deferred_sql = []
+    editor.create_model(model)
+    # Indexes of unmanaged models are left out by create_model.
+    for index in model._meta.indexes:
+        editor.add_index(model, index)
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            for statement in editor.collected_sql + editor.deferred_sql:
+                cursor.execute(str(statement).rstrip(";"))
+    except DatabaseError:
+        # Another process created it first.
+        if month not in partitions(refresh=True):
+            raise
+        return model
+    transaction.on_commit(lambda: _tables.add(month))
+    return model
+
+
+def refreshing(query):
+    """``query()``, run again over a fresh list of month tables if one of them
+    was dropped (archived by another process) since we last looked.
+
+    Each attempt runs in its own savepoint, so a failed one does not spoil
+    an enclosing transaction.
+    """
+    try:
+        with transaction.atomic():
+            return query()
+    except DatabaseError:
+        partitions(refresh=True)
+        with transaction.atomic():
+            return query()
+
+
+def drop_partition(month):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DROP TABLE {connection.ops.quote_name(TABLE_PREFIX + str(month))}"
+        )
+    transaction.on_commit(lambda: _tables.discard(month))
+
+
+# Messages
+
+
+def row(message):
+    return {
+        "id": message.id,
+        "conversation_id": message.conversation_id,
+        "sender_id": message.sender_id,
+        "body": message.body,
+        "created_at": message.created_at,
+    }
+
+
+def create(conversation_id, sender_id, body):
+    """Store a message in the current month's table."""
+    for _ in range(3):
+        message_id, created_at = ids.next()
+        model = ensure_partition(month_of(created_at))
+        try:
+            with transaction.atomic():
+                return model.objects.create(
+                    id=message_id,
+                    conversation_id=conversation_id,
+                    sender_id=sender_id,
+                    body=body,
+                    created_at=created_at,
+                )
+        except IntegrityError:
+            # Another process drew the same node number; pick a new one.
+            ids.reseed()
+    raise IntegrityError("Could not allocate a message id.")
+
+
+def history(conversation, before=None, limit=50):
+    """Up to ``limit`` messages older than id ``before``, newest first."""
+    end = month_of_id(before) if before else month_of(timezone.now())
+    results = refreshing(lambda: recent(conversation, before, limit, end))
+    if len(results) < limit:
+        archives = MessageArchive.objects.filter(
+            conversation=conversation, month__lte=end
+        )
+        if before:
+            archives = archives.filter(first_id__lt=before)
+        for archive in archives.order_by("-month").iterator():
+            for message in reversed(unpack(archive)):
+                if not before or message["id"] < before:
+                    results.append(message)
+                    if len(results) >= limit:
+                        return results
+    return results
+
+
+def recent(conversation, before, limit, end):
+    """``history`` over the month tables, from ``end`` back."""
+    start = month_of(conversation.created_at)
+    results = []
+    for month in reversed(partitions()):
+        if month > end:
+            continue
+        if month < start or len(results) >= limit:
+            break
+        queryset = partition(month).objects.filter(conversation=conversation)
+        if before:
+            queryset = queryset.filter(id__lt=before)
+        results += [
+            row(message) for message in queryset.order_by("-id")[: limit - len(results)]
+        ]
+    return results
+
+
+def mark_read(user_id, conversation_id, message_id):
+    """Move the user's read marker forward to ``message_id``.
+
+    Returns the number of messages from others that became read.
+    """
+    newest, _ = ids.next()
+    message_id = min(message_id, newest)
+    member = ConversationMember.objects.filter(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        last_read_id__lt=message_id,
+    )
+    with transaction.atomic():
+        # Write before reading, as the previous marker is needed.
+        if not member.update(last_read_id=F("last_read_id")):
+            return 0
+        previous = member.values_list("last_read_id", flat=True).first()
+        member.update(last_read_id=message_id)
+        return count_between(conversation_id, previous, message_id, user_id)
+
+
+def count_between(conversation_id, after, up_to, reader_id):
+    """Messages not from ``reader_id`` with ``after < id <= up_to``."""
+    first, last = month_of_id(after), month_of_id(up_to)
+    return refreshing(
+        lambda: sum(
+            partition(month)
+            .objects.filter(
+                conversation_id=conversation_id, id__gt=after, id__lte=up_to
+            )
+            .exclude(sender_id=reader_id)
+            .count()
+            for month in partitions()
+            if first <= month <= last
+        )
+    )
+
+
+def unread_counts(user_id):
+    """``{conversation_id: unread messages}`` for conversations with any."""
+    oldest = ConversationMember.objects.filter(user_id=user_id).aggregate(
+        oldest=models.Min("last_read_id")
+    )["oldest"]
+    if oldest is None:
+        return {}
+    start = month_of_id(oldest) if oldest else 0
+
+    def count():
+        counts = {}
+        for month in partitions():
+            if month < start:
+                continue
+            for conversation_id, unread in (
+                partition(month)
+                .objects.filter(
+                    conversation__members__user_id=user_id,
+                    id__gt=F("conversation__members__last_read_id"),
+                )
+                .exclude(sender_id=user_id)
+                .values_list("conversation_id")
+                .annotate(unread=Count("id"))
+                .order_by()
+            ):
+                counts[conversation_id] = counts.get(conversation_id, 0) + unread
+        return counts
+
+    return refreshing(count)
+
+
+def unread_totals(user_ids):
+    """``{user_id: unread messages}`` over all of each user's conversations."""
+    oldest = ConversationMember.objects.filter(user_id__in=user_ids).aggregate(
+        oldest=models.Min("last_read_id")
+    )["oldest"]
+    if oldest is None:
+        return {}
+    start = month_of_id(oldest) if oldest else 0
+
+    def count():
+        totals = {}
+        for month in partitions():
+            if month < start:
+                continue
+            for user_id, unread in (
+                partition(month)
+                .objects.filter(
+                    ~Q(sender_id=F("conversation__members__user_id")),
+                    conversation__members__user_id__in=user_ids,
+                    id__gt=F("conversation__members__last_read_id"),
+                )
+                .values_list("conversation__members__user_id")
+                .annotate(unread=Count("id"))
+                .order_by()
+            ):
+                totals[user_id] = totals.get(user_id, 0) + unread
+        return totals
+
+    return refreshing(count)
+
+
+# Archive
+
+
+def pack(messages):
+    return zlib.compress(
+        orjson.dumps(
+            [
+                [m["id"], m["sender_id"], m["body"], m["created_at"].isoformat()]
+                for m in messages
+            ]
+        )
+    )
+
+
+def unpack(archive):
+    return [
+        {
+            "id": message_id,
+            "conversation_id": archive.conversation_id,
+            "sender_id": sender_id,
+            "body": body,
+            "created_at": datetime.datetime.fromisoformat(created_at),
+        }
+        for message_id, sender_id, body, created_at in orjson.loads(
+            zlib.decompress(bytes(archive.data))
+        )
+    ]
+
+
+def archive_month(month):
+    """Compress ``month``'s messages into archives and drop its table.
+
+    Returns the number of messages archived.
+    """
+    if month >= month_of(timezone.now()):
+        raise ValueError("Only past months can be archived.")
+    model = partition(month)
+    archived = 0
+    with transaction.atomic():
+        rows = (
+            row(message)
+            for message in model.objects.order_by("conversation_id", "id").iterator(
+                chunk_size=2000
+            )
+        )
+        batch = []
+        for conversation_id, messages in itertools.groupby(
+            rows, key=lambda message: message["conversation_id"]
+        ):
+            messages = list(messages)
+            batch.append(
+                MessageArchive(
+                    conversation_id=conversation_id,
+                    month=month,
+                    first_id=messages[0]["id"],
+                    last_id=messages[-1]["id"],
+                    count=len(messages),
+                    data=pack(messages),
+                )
+            )
+            archived += len(messages)
+            if len(batch) >= ARCHIVE_BATCH:
+                store_archives(batch)
+                batch = []
+        store_archives(batch)
+        drop_partition(month)
+    return archived
+
+
+def store_archives(archives):
+    """Save ``archives`` and forget the badges that counted their messages.
+
+    Archived messages count as read, so members who had not read up to the
+    end of an archive have an unread badge that is now too high.
+    """
+    # Imported here: the badges module reads unread totals from this one.
+    from apps.notifications import badges
+
+    MessageArchive.objects.bulk_create(archives)
+    last_ids = {archive.conversation_id: archive.last_id for archive in archives}
+    members = ConversationMember.objects.filter(
+        conversation_id__in=last_ids
+    ).values_list("user_id", "conversation_id", "last_read_id")
+    badges.forget(
+        {
+            user_id
+            for user_id, conversation_id, last_read_id in members
+            if last_read_id < last_ids[conversation_id]
+        }
+    )
@@ -1,3 +1,105 @@
+import asyncio
+import threading
+from unittest import mock
+
+import orjson
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from apps.messaging import chat, sockets, storage
+
+User = get_user_model()
+
+
+class DroppedMonthTests(TestCase):
+    """Counting survives a month table dropped by another process."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(
+            email="alice@example.com", password="x", is_active=True
+        )
+        cls.bob = User.objects.create_user(
+            email="bob@example.com", password="x", is_active=True, phone="2"
+        )
+
+    def setUp(self):
+        # Month tables created by earlier tests were rolled back with them.
+        storage.partitions(refresh=True)
+        self.conversation = chat.direct_conversation(self.alice, self.bob)
+        self.message = storage.create(self.conversation.pk, self.alice.pk, "hi")
+        self.month = storage.month_of_id(self.message.id)
+        # A stale list of tables naming a month that no longer exists.
+        storage.partitions(refresh=True)
+        storage._tables.add(storage.previous_month(self.month))
+        self.addCleanup(setattr, storage, "_tables_loaded_at", 0.0)
+
+    def test_unread_counts(self):
+        self.assertEqual(storage.unread_counts(self.bob.pk), {self.conversation.pk: 1})
+        self.assertNotIn(storage.previous_month(self.month), storage.partitions())
+
+    def test_unread_totals(self):
+        self.assertEqual(storage.unread_totals([self.bob.pk]), {self.bob.pk: 1})
+
+    def test_mark_read(self):
+        self.assertEqual(
+            storage.mark_read(self.bob.pk, self.conversation.pk, self.message.id), 1
+        )
+
+
+class ReceiveFrameTests(TestCase):
+    class Connection:
+        def __init__(self):
+            self.replies = []
+
+        def reply(self, event):
+            self.replies.append(event)
+
+    def receive(self, frame):
+        connection = self.Connection()
+        event = {"type": "websocket.receive", "text": orjson.dumps(frame).decode()}
+        asyncio.run(sockets.receive_frame(connection, "user", event))
+        return connection.replies
+
+    def test_server_error_is_logged_and_answered(self):
+        frame = {"type": "send", "conversation": 1, "body": "hi", "client_id": "c1"}
+        with mock.patch.object(sockets, "handle", side_effect=RuntimeError("boom")):
+            with self.assertLogs("apps.messaging.sockets", "ERROR"):
+                replies = self.receive(frame)
+        self.assertEqual(
+            replies,
+            [
+                {
+                    "type": "error",
+                    "detail": "Server error; try again.",
+                    "client_id": "c1",
+                }
+            ],
+        )
+
+    def test_rejected_frame_keeps_client_id(self):
+        replies = self.receive({"type": "send", "client_id": "c2"})
+        self.assertEqual(replies[0]["client_id"], "c2")
+
+    def test_connections_are_handled_in_parallel(self):
+        # Both frames must be in ``handle`` at once to pass the barrier.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def handle(user_id, frame):
+            barrier.wait()
+            return {"type": "pong"}
+
+        async def run():
+            connections = [self.Connection(), self.Connection()]
+            event = {"type": "websocket.receive", "text": '{"type": "ping"}'}
+            await asyncio.gather(
+                *(
+                    sockets.receive_frame(connection, "user", event)
+                    for connection in connections
+                )
+            )
+            return [connection.replies for connection in connections]
+
+        with mock.patch.object(sockets, "handle", handle):
+            replies = asyncio.run(run())
+        self.assertEqual(replies, [[{"type": "pong"}]] * 2)
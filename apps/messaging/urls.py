@@ -0,0 +1,8 @@
+from rest_framework.routers import DefaultRouter
+
+from apps.messaging.views import ConversationViewSet
+
+router = DefaultRouter()
+router.register(r"conversations", ConversationViewSet, basename="conversation")
+
+urlpatterns = router.urls
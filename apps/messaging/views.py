@@ -1,3 +1,97 @@
-from django.shortcuts import render
+from django.db.models import Prefetch
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
 
-# Create your views here.
+from apps.messaging import chat, storage
+from apps.messaging.models import Conversation, ConversationMember
+from apps.messaging.pagination import (
+    ConversationPagination,
+    MessageHistoryPagination,
+)
+from apps.messaging.serializers import ConversationSerializer, MessageSerializer
+
+
+class ConversationViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """The user's conversations. Live updates come over ``/ws/chat/``."""
+
+    serializer_class = ConversationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ConversationPagination
+
+    def get_queryset(self):
+        return (
+            Conversation.objects.filter(members__user=self.request.user)
+            .prefetch_related(
+                Prefetch(
+                    "members",
+                    queryset=ConversationMember.objects.select_related("user"),
+                )
+            )
+            .order_by(*ConversationPagination.ordering)
+        )
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        try:
+            if data["kind"] == "direct":
+                serializer.instance = chat.direct_conversation(
+                    self.request.user, data["user_ids"][0]
+                )
+            else:
+                serializer.instance = chat.group_conversation(
+                    self.request.user, data.get("title", ""), data["user_ids"]
+                )
+        except chat.ChatError as e:
+            raise ValidationError({"user_ids": str(e)})
+
+    @action(detail=True, methods=["get", "post"])
+    def messages(self, request, pk=None):
+        """The history, newest first and paged with ``?before=<message id>``,
+        or post a message with ``{"body"}``."""
+        conversation = self.get_object()
+        if request.method == "POST":
+            try:
+                message = chat.post_message(
+                    conversation.pk, request.user.pk, request.data.get("body")
+                )
+            except chat.ChatError as e:
+                raise ValidationError({"body": str(e)})
+            return Response(
+                MessageSerializer(message).data, status=status.HTTP_201_CREATED
+            )
+
+        paginator = MessageHistoryPagination()
+        page = paginator.paginate(conversation, request)
+        return paginator.get_paginated_response(MessageSerializer(page, many=True).data)
+
+    @action(detail=True, methods=["post"])
+    def read(self, request, pk=None):
+        """Mark messages up to ``{"message_id"}`` as read."""
+        conversation = self.get_object()
+        message_id = request.data.get("message_id")
+        if not isinstance(message_id, int) or message_id <= 0:
+            raise ValidationError({"message_id": "A message id is required."})
+        chat.mark_read(request.user.pk, conversation.pk, message_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=["get"])
+    def unread(self, request):
+        """Unread messages per conversation, for conversations with any."""
+        return Response(storage.unread_counts(request.user.pk))
+
+    @action(detail=True, methods=["post"])
+    def leave(self, request, pk=None):
+        conversation = self.get_object()
+        if conversation.kind == "direct":
+            raise PermissionDenied("You cannot leave a direct conversation.")
+        ConversationMember.objects.filter(
+            conversation=conversation, user=request.user
+        ).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
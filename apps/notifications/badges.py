@@ -0,0 +1,123 @@
+"""
+Badge counts: unread notifications, unread messages and pending connection
+requests, per user.
+
+Each user has one ``BadgeCounter`` row. The code that changes what a badge
+counts adjusts the row in the same transaction, with an ``UPDATE ... SET
+n = n + delta``, so reading the badges never counts anything. Reads go
+through the cache, which is dropped once an adjustment commits.
+
+A missing row is computed from the source tables on first read. Dropping
+a user's row (``forget``) is therefore always safe, and is how changes that
+are awkward to express as a delta (joining or leaving a conversation) are
+handled. ``reconcile_badges`` repairs counts that drifted, for example
+through the admin or raw SQL.
+"""
+
+import itertools
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from apps.directory.models import AlumniConnection
+from apps.messaging import storage
+from apps.notifications.models import BadgeCounter, Notification
+from config.cache import default_timeout
+
+FIELDS = ("notifications", "messages", "connections")
+CACHE_PREFIX = "badges:"
+
+
+def cache_key(user_id):
+    return f"{CACHE_PREFIX}{user_id}"
+
+
+def forget_cached(user_ids):
+    keys = [cache_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def adjust(user_ids, **deltas):
+    """Add ``deltas`` (``messages=1``, ``connections=-1``) for each user."""
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    user_ids = list(user_ids)
+    if changes and user_ids:
+        BadgeCounter.objects.filter(user_id__in=user_ids).update(
+            updated_at=timezone.now(), **changes
+        )
+        forget_cached(user_ids)
+
+
+def adjust_counts(field, counts):
+    """Add ``{user_id: delta}`` to ``field``, one ``UPDATE`` per distinct delta."""
+    by_delta = sorted(counts.items(), key=lambda item: item[1])
+    for delta, items in itertools.groupby(by_delta, key=lambda item: item[1]):
+        adjust([user_id for user_id, _ in items], **{field: delta})
+
+
+def forget(user_ids):
+    """Drop the users' counters; they are computed again on the next read."""
+    user_ids = list(user_ids)
+    BadgeCounter.objects.filter(user_id__in=user_ids).delete()
+    forget_cached(user_ids)
+
+
+def recount(user_ids):
+    """``{user_id: {field: count}}`` from the source tables."""
+    counts = {user_id: dict.fromkeys(FIELDS, 0) for user_id in user_ids}
+    for user_id, total in (
+        Notification.objects.filter(recipient_id__in=user_ids, read_at__isnull=True)
+        .values_list("recipient_id")
+        .annotate(total=Count("pk"))
+        .order_by()
+    ):
+        counts[user_id]["notifications"] = total
+    for user_id, total in storage.unread_totals(user_ids).items():
+        counts[user_id]["messages"] = total
+    for user_id, total in (
+        AlumniConnection.objects.filter(receiver_id__in=user_ids, status="pending")
+        .values_list("receiver_id")
+        .annotate(total=Count("pk"))
+        .order_by()
+    ):
+        counts[user_id]["connections"] = total
+    return counts
+
+
+def create(user_id):
+    """Insert the user's counter, then fill it from a recount.
+
+    The row exists before anything is counted, so an ``adjust`` committed
+    meanwhile is part of the count, and one still running waits for the
+    row lock and is applied on top of it.
+    """
+    try:
+        with transaction.atomic():
+            BadgeCounter.objects.create(user_id=user_id)
+    except IntegrityError:
+        # Created by a concurrent request; count again all the same.
+        pass
+    with transaction.atomic():
+        # Lock the row before counting, as ``reconcile_badges`` does.
+        BadgeCounter.objects.filter(user_id=user_id).update(notifications=0)
+        counts = recount([user_id])[user_id]
+        BadgeCounter.objects.filter(user_id=user_id).update(
+            updated_at=timezone.now(), **counts
+        )
+    return counts
+
+
+def get(user_id):
+    """The user's badge counts, from the cache when possible."""
+    key = cache_key(user_id)
+    counts = cache.get(key)
+    if counts is not None:
+        return counts
+    counts = BadgeCounter.objects.filter(user_id=user_id).values(*FIELDS).first()
+    if counts is None:
+        counts = create(user_id)
+    counts = {field: max(counts[field], 0) for field in FIELDS}
+    cache.set(key, counts, default_timeout())
+    return counts
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.notifications import notify
+from apps.notifications.models import EMAIL_FREQUENCIES
+
+
+class Command(BaseCommand):
+    help = (
+        "Expand queued notification events into inbox rows and send due "
+        "notification emails and digests. Runs until stopped unless --once "
+        "is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument(
+            "--sleep", type=float, default=5.0, help="Seconds to wait when idle."
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Drain the queue once and exit."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            events = notifications = 0
+            while True:
+                batch, created = notify.process_events(
+                    batch_size=options["batch_size"]
+                )
+                events += len(batch)
+                notifications += len(created)
+                if len(batch) < options["batch_size"]:
+                    break
+            emails = 0
+            if notify.email_enabled():
+                for frequency in EMAIL_FREQUENCIES:
+                    emails += notify.send_emails(frequency)
+            purged = notify.purge_processed()
+            if events or emails or purged:
+                self.stdout.write(
+                    f"Processed {events} events into {notifications} "
+                    f"notifications, sent {emails} emails, purged {purged} "
+                    "events."
+                )
+            if options["once"]:
+                return
+            connection.close()
+            time.sleep(options["sleep"])
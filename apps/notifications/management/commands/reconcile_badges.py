@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.notifications import badges
+from apps.notifications.models import BadgeCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute users' badge counts (unread notifications and messages, "
+        "pending connection requests), fixing any that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Report drift without fixing it."
+        )
+
+    def handle(self, *args, **options):
+        drifted = []
+        counters = BadgeCounter.objects.order_by("pk").values("user_id", *badges.FIELDS)
+        last = None
+        while True:
+            batch = counters.filter(pk__gt=last) if last else counters
+            batch = list(batch[: options["batch_size"]])
+            if not batch:
+                break
+            last = batch[-1]["user_id"]
+            counts = badges.recount([row["user_id"] for row in batch])
+            for row in batch:
+                expected = counts[row["user_id"]]
+                if any(row[field] != expected[field] for field in badges.FIELDS):
+                    drifted.append(row["user_id"])
+
+        if options["dry_run"]:
+            self.stdout.write(f"{len(drifted)} users have drifted badge counts.")
+            return
+
+        for user_id in drifted:
+            # Lock the counter row and count again, so changes made since the
+            # first pass are not overwritten.
+            with transaction.atomic():
+                if BadgeCounter.objects.filter(user_id=user_id).update(notifications=0):
+                    BadgeCounter.objects.filter(user_id=user_id).update(
+                        updated_at=timezone.now(), **badges.recount([user_id])[user_id]
+                    )
+                    badges.forget_cached([user_id])
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled {len(drifted)} users' badges.")
+        )
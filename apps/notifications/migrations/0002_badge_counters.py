@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_lazy_user_profile"),
+        ("notifications", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BadgeCounter",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="badges",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("notifications", models.IntegerField(default=0)),
+                ("messages", models.IntegerField(default=0)),
+                ("connections", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
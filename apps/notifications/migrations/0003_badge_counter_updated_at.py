@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0002_badge_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="badgecounter",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="badgecounter",
+            index=models.Index(fields=["updated_at"], name="badge_counter_changed_idx"),
+        ),
+    ]
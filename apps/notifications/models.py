@@ -1,3 +1,106 @@
+from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Q
 
-# Create your models here.
+User = get_user_model()
+
+# How a user hears about a kind of notification, set per kind in
+# UserProfile.notification_preferences. Every choice but "off" puts it in the
+# in-app inbox; the rest also send it by email, now or in a digest.
+FREQUENCY_CHOICES = [
+    ("off", "Off"),
+    ("inbox", "In-app only"),
+    ("instant", "Email immediately"),
+    ("hourly", "Hourly email digest"),
+    ("daily", "Daily email digest"),
+]
+EMAIL_FREQUENCIES = ("instant", "hourly", "daily")
+
+
+class NotificationEvent(models.Model):
+    """Something happened that users should hear about.
+
+    Written in the same transaction as the change it describes, one row per
+    event whatever the number of recipients. The ``process_notifications``
+    worker expands it into inbox rows.
+    """
+
+    kind = models.CharField(max_length=50)
+    actor = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    recipients = models.JSONField(default=list)  # user ids
+    data = models.JSONField(default=dict, blank=True)
+    # Events sharing a key are only recorded once.
+    key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                name="notification_event_queue_idx",
+                condition=Q(processed_at__isnull=True),
+            ),
+        ]
+
+
+class Notification(models.Model):
+    """A user's inbox entry."""
+
+    recipient = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="notifications"
+    )
+    kind = models.CharField(max_length=50)
+    actor = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    data = models.JSONField(default=dict, blank=True)
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+    emailed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                name="notification_inbox_idx",
+            ),
+            models.Index(
+                fields=["recipient"],
+                name="notification_unread_idx",
+                condition=Q(read_at__isnull=True),
+            ),
+            # The live stream's poll window.
+            models.Index(fields=["created_at"], name="notification_created_idx"),
+            # Email still owed, found by frequency and age.
+            models.Index(
+                fields=["frequency", "created_at"],
+                name="notification_email_idx",
+                condition=Q(emailed_at__isnull=True)
+                & Q(frequency__in=EMAIL_FREQUENCIES),
+            ),
+        ]
+
+
+class BadgeCounter(models.Model):
+    """The counts on a user's badges, maintained by ``badges.adjust``.
+
+    A user without a row has their counts computed on the next read.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="badges"
+    )
+    notifications = models.IntegerField(default=0)  # unread
+    messages = models.IntegerField(default=0)  # unread, from others
+    connections = models.IntegerField(default=0)  # pending requests received
+    # Set on every change, for the live stream to find changed badges.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["updated_at"], name="badge_counter_changed_idx"),
+        ]
@@ -0,0 +1,233 @@
+"""
+Notifications: queueing, fan-out and email delivery.
+
+Request handlers only queue events. ``enqueue`` adds one
+``NotificationEvent`` row to the caller's transaction, so the event commits
+or rolls back with the change that caused it. Everything else runs in the
+``process_notifications`` worker:
+
+* ``process_events`` takes a batch of queued events and loads every
+  recipient's ``notification_preferences`` in one query. It writes the
+  inbox rows with ``bulk_create``.
+* ``send_emails("instant")`` emails notifications that asked for it.
+* ``send_emails("hourly")`` and ``send_emails("daily")`` coalesce the rest
+  into one digest per recipient, once the hour or day they fall in is over.
+
+Which kinds exist, and how users hear about them unless they chose
+otherwise, is set in ``KINDS``.
+"""
+
+import collections
+import datetime
+import itertools
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from apps.notifications import badges
+from apps.notifications.models import (
+    EMAIL_FREQUENCIES,
+    FREQUENCY_CHOICES,
+    Notification,
+    NotificationEvent,
+)
+
+User = get_user_model()
+
+FREQUENCIES = [frequency for frequency, _ in FREQUENCY_CHOICES]
+# kind: (default frequency, text). High-priority kinds are emailed as they
+# happen; the rest wait for the daily digest.
+KINDS = {
+    "connection.requested": ("instant", "{actor} sent you a connection request."),
+    "connection.accepted": ("instant", "{actor} accepted your connection request."),
+    "event.registered": ("daily", "{actor} registered for {event_title}."),
+    "event.promoted": (
+        "instant",
+        "A seat opened up: you are now registered for {event_title}.",
+    ),
+    "job.application_received": ("daily", "{actor} applied for {job_title}."),
+    "job.application_status": (
+        "instant",
+        "Your application for {job_title} is now {status_label}.",
+    ),
+    "job.application_withdrawn": (
+        "daily",
+        "{actor} withdrew their application for {job_title}.",
+    ),
+}
+# Recipients per digest batch.
+DIGEST_BATCH = 500
+
+
+def email_enabled():
+    return getattr(settings, "NOTIFICATIONS_EMAIL_ENABLED", False)
+
+
+def new_event(kind, recipients, actor_id=None, data=None, key=None):
+    """An unsaved ``NotificationEvent``; the actor is never a recipient."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown notification kind: {kind}")
+    recipients = {str(user_id) for user_id in recipients if user_id is not None}
+    recipients.discard(str(actor_id))
+    return NotificationEvent(
+        kind=kind,
+        actor_id=actor_id,
+        recipients=sorted(recipients),
+        data=data or {},
+        key=key,
+    )
+
+
+def enqueue(kind, recipients, actor_id=None, data=None, key=None):
+    enqueue_many([new_event(kind, recipients, actor_id, data, key)])
+
+
+def enqueue_many(events):
+    """Queue unsaved events in bulk, skipping duplicate keys."""
+    events = [event for event in events if event.recipients]
+    if events:
+        NotificationEvent.objects.bulk_create(events, ignore_conflicts=True)
+
+
+def frequency(preferences, kind):
+    chosen = (preferences or {}).get(kind)
+    return chosen if chosen in FREQUENCIES else KINDS[kind][0]
+
+
+def render(kind, data):
+    _, text = KINDS.get(kind, (None, kind))
+    try:
+        return text.format(**{"actor": "Someone", **data})
+    except (KeyError, IndexError):
+        return text
+
+
+def process_events(batch_size=200):
+    """Expand a batch of queued events into inbox rows.
+
+    Returns ``(events, notifications)``, the notifications as created.
+    """
+    with transaction.atomic():
+        events = list(
+            NotificationEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True)
+            .order_by("created_at")[:batch_size]
+        )
+        if not events:
+            return [], []
+        user_ids = {user_id for event in events for user_id in event.recipients}
+        user_ids.update(event.actor_id for event in events if event.actor_id)
+        users = {
+            str(pk): (is_active, preferences, name)
+            for pk, is_active, preferences, name in User.objects.filter(
+                pk__in=user_ids
+            ).values_list(
+                "pk",
+                "is_active",
+                "profile__notification_preferences",
+                "first_name",
+            )
+        }
+
+        notifications = []
+        for event in events:
+            data = dict(event.data)
+            if event.actor_id and str(event.actor_id) in users:
+                data.setdefault("actor", users[str(event.actor_id)][2])
+            for user_id in event.recipients:
+                is_active, preferences, _ = users.get(user_id, (False, None, None))
+                chosen = frequency(preferences, event.kind)
+                if not is_active or chosen == "off":
+                    continue
+                notifications.append(
+                    Notification(
+                        recipient_id=user_id,
+                        kind=event.kind,
+                        actor_id=event.actor_id,
+                        data=data,
+                        frequency=chosen,
+                    )
+                )
+        Notification.objects.bulk_create(notifications, batch_size=1000)
+        badges.adjust_counts(
+            "notifications",
+            collections.Counter(n.recipient_id for n in notifications),
+        )
+        NotificationEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+            processed_at=timezone.now()
+        )
+    return events, notifications
+
+
+def due_before(frequency, now=None):
+    """Notifications created before this are due for ``frequency`` email."""
+    now = timezone.localtime(now or timezone.now())
+    if frequency == "hourly":
+        return now.replace(minute=0, second=0, microsecond=0)
+    if frequency == "daily":
+        return now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return now
+
+
+def send_emails(frequency, now=None):
+    """Email due ``frequency`` notifications, one message per recipient.
+
+    Returns the number of emails sent.
+    """
+    if frequency not in EMAIL_FREQUENCIES:
+        raise ValueError(f"Not an email frequency: {frequency}")
+    due = Notification.objects.filter(
+        frequency=frequency,
+        emailed_at__isnull=True,
+        created_at__lt=due_before(frequency, now),
+    )
+    sent = 0
+    while True:
+        recipients = list(
+            due.order_by("recipient_id")
+            .values_list("recipient_id", flat=True)
+            .distinct()[:DIGEST_BATCH]
+        )
+        if not recipients:
+            return sent
+        rows = list(
+            due.filter(recipient_id__in=recipients)
+            .order_by("recipient_id", "created_at")
+            .values_list("pk", "recipient_id", "recipient__email", "kind", "data")
+        )
+        messages = []
+        for (_, email), items in itertools.groupby(
+            rows, key=lambda row: (row[1], row[2])
+        ):
+            lines = [render(kind, data) for _, _, _, kind, data in items]
+            if email:
+                messages.append(email_message(frequency, email, lines))
+        get_connection().send_messages(messages)
+        sent += len(messages)
+        Notification.objects.filter(pk__in=[row[0] for row in rows]).update(
+            emailed_at=timezone.now()
+        )
+
+
+def email_message(frequency, email, lines):
+    if frequency == "instant" and len(lines) == 1:
+        subject = lines[0]
+    else:
+        period = {"instant": "", "hourly": "hourly ", "daily": "daily "}[frequency]
+        subject = f"Your {period}notification digest ({len(lines)} new)"
+    return EmailMessage(
+        subject=subject,
+        body="\n".join(f"- {line}" for line in lines),
+        to=[email],
+    )
+
+
+def purge_processed(older_than=datetime.timedelta(days=7)):
+    """Delete processed events; the inbox rows they produced stay."""
+    deleted, _ = NotificationEvent.objects.filter(
+        processed_at__lt=timezone.now() - older_than
+    ).delete()
+    return deleted
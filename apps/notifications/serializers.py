@@ -0,0 +1,39 @@
+from rest_framework import serializers
+
+from apps.notifications import notify
+from apps.notifications.models import Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    text = serializers.SerializerMethodField()
+    read = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Notification
+        fields = ["id", "kind", "actor", "data", "text", "read", "created_at"]
+
+    def get_text(self, obj):
+        return notify.render(obj.kind, obj.data)
+
+    def get_read(self, obj):
+        return obj.read_at is not None
+
+
+class PreferencesSerializer(serializers.Serializer):
+    """``{kind: frequency}``; kinds left out keep their current setting."""
+
+    def to_internal_value(self, data):
+        if not isinstance(data, dict):
+            raise serializers.ValidationError("Expected {kind: frequency}.")
+        errors = {}
+        for kind, chosen in data.items():
+            if kind not in notify.KINDS:
+                errors[kind] = "Unknown notification kind."
+            elif chosen not in notify.FREQUENCIES:
+                errors[kind] = f"Choose one of: {', '.join(notify.FREQUENCIES)}."
+        if errors:
+            raise serializers.ValidationError(errors)
+        return dict(data)
+
+    def to_representation(self, preferences):
+        return {kind: notify.frequency(preferences, kind) for kind in notify.KINDS}
@@ -0,0 +1,117 @@
+"""
+Queue notifications, and adjust badge counts, for changes saved through the
+ORM.
+
+Changes made with ``QuerySet.update()`` send no signals; the code making
+them queues its own events (see ``apps.jobs.pipeline.transition``).
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.directory.models import AlumniConnection
+from apps.events.models import EventRegistration
+from apps.jobs.models import JobApplication
+from apps.messaging.models import ConversationMember
+from apps.notifications import badges, notify
+
+
+@receiver(pre_save, sender=AlumniConnection)
+def remember_connection_status(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        instance._saved_status = None
+    else:
+        instance._saved_status = (
+            AlumniConnection.objects.filter(pk=instance.pk)
+            .values_list("status", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=AlumniConnection)
+@receiver(post_delete, sender=AlumniConnection)
+def count_pending_connections(sender, instance, signal, raw=False, **kwargs):
+    if raw:
+        return
+    was_pending = getattr(instance, "_saved_status", None) == "pending"
+    if signal is post_delete:
+        was_pending, is_pending = instance.status == "pending", False
+    else:
+        is_pending = instance.status == "pending"
+    if was_pending != is_pending:
+        badges.adjust([instance.receiver_id], connections=1 if is_pending else -1)
+
+
+@receiver(post_save, sender=ConversationMember)
+@receiver(post_delete, sender=ConversationMember)
+def recount_unread_messages(
+    sender, instance, signal, raw=False, created=False, **kwargs
+):
+    # Joining or leaving changes which messages count; recount on next read.
+    if not raw and (created or signal is post_delete):
+        badges.forget([instance.user_id])
+
+
+@receiver(post_save, sender=AlumniConnection)
+def connection_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created and instance.status == "pending":
+        notify.enqueue(
+            "connection.requested",
+            [instance.receiver_id],
+            actor_id=instance.requester_id,
+            data={"connection_id": instance.pk},
+            key=f"connection.requested:{instance.pk}",
+        )
+    elif instance.status == "accepted":
+        notify.enqueue(
+            "connection.accepted",
+            [instance.requester_id],
+            actor_id=instance.receiver_id,
+            data={"connection_id": instance.pk},
+            key=f"connection.accepted:{instance.pk}",
+        )
+
+
+@receiver(post_save, sender=EventRegistration)
+def registration_saved(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    if raw:
+        return
+    event = instance.event
+    data = {
+        "event_id": str(event.pk),
+        "event_title": event.title,
+        "registration_id": str(instance.pk),
+        "status": instance.status,
+    }
+    if created:
+        notify.enqueue(
+            "event.registered",
+            [event.organizer_id],
+            actor_id=instance.user_id,
+            data=data,
+        )
+    elif update_fields and set(update_fields) == {"status"}:
+        if instance.status == "registered":
+            # Seated from the waitlist (apps.events.registration).
+            notify.enqueue("event.promoted", [instance.user_id], data=data)
+
+
+@receiver(post_save, sender=JobApplication)
+def application_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    job = instance.job
+    notify.enqueue(
+        "job.application_received",
+        [job.posted_by_id],
+        actor_id=instance.applicant_id,
+        data={
+            "job_id": str(job.pk),
+            "job_title": job.title,
+            "application_id": instance.pk,
+        },
+    )
@@ -0,0 +1,359 @@
+"""
+The ``/api/notifications/stream/`` Server-Sent Events endpoint, as a plain
+ASGI application.
+
+For clients that cannot hold a WebSocket. A stream carries, for the
+authenticated user:
+
+* ``notification`` events, one per new inbox row, with the row's id as
+  the event id;
+* ``badges`` events with the badge counts, sent on connect and whenever
+  they change;
+* a comment line every ``NOTIFICATIONS_STREAM_HEARTBEAT`` seconds, so
+  proxies keep idle streams open.
+
+Clients authenticate with a bearer token, or ``?token=<jwt>`` since
+``EventSource`` cannot set headers. A reconnecting ``EventSource`` sends
+``Last-Event-ID``; the notifications the client missed are replayed first,
+up to ``NOTIFICATIONS_STREAM_REPLAY`` of them.
+
+Inbox rows are written by the ``process_notifications`` worker, in another
+process, so streams are fed by polling. One ``Feed`` per process polls
+every ``NOTIFICATIONS_STREAM_POLL_INTERVAL`` seconds for every stream it
+serves, whatever the number of clients: one query for notifications and
+one for badge counters. It also sends the heartbeat. It stops polling
+while no stream is open. Like ``/ws/chat/``, database work runs on the
+default thread pool rather than the one thread shared with sync code.
+
+Ids are allocated when a row is inserted, not when its transaction commits,
+so a row can become visible after rows with higher ids. Each poll therefore
+looks ``POLL_LAG`` back from the previous one rather than past the highest
+id seen, and each stream remembers which of the rows in that window it has
+already sent. As a result, a stream may also receive notifications created
+up to ``POLL_LAG`` before it connected.
+
+As with ``/ws/chat/``, each stream has a queue of
+``NOTIFICATIONS_STREAM_QUEUE_SIZE`` events. A client that falls that far
+behind is disconnected and catches up through ``Last-Event-ID``.
+"""
+
+import asyncio
+import datetime
+import logging
+import weakref
+from collections import defaultdict
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+
+from apps.accounts.authentication import CachedJWTAuthentication
+from apps.notifications import badges
+from apps.notifications.models import BadgeCounter, Notification
+from apps.notifications.serializers import NotificationSerializer
+from config.renderers import dumps
+
+logger = logging.getLogger(__name__)
+
+PATH = "/api/notifications/stream/"
+# How far before the previous poll each poll looks, so that notifications
+# and badge changes whose transaction committed after it are not missed.
+POLL_LAG = datetime.timedelta(seconds=10)
+HEARTBEAT = b": ping\n\n"
+
+
+def poll_interval():
+    return getattr(settings, "NOTIFICATIONS_STREAM_POLL_INTERVAL", 2)
+
+
+def heartbeat_interval():
+    return getattr(settings, "NOTIFICATIONS_STREAM_HEARTBEAT", 15)
+
+
+def queue_size():
+    return getattr(settings, "NOTIFICATIONS_STREAM_QUEUE_SIZE", 100)
+
+
+def replay_limit():
+    return getattr(settings, "NOTIFICATIONS_STREAM_REPLAY", 100)
+
+
+def frame(event, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {dumps(data).decode()}"]
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+def notification_frame(notification):
+    return frame(
+        "notification",
+        NotificationSerializer(notification).data,
+        event_id=notification.pk,
+    )
+
+
+def header(scope, name):
+    for key, value in scope.get("headers", ()):
+        if key.decode("latin-1").lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+def authenticate(scope):
+    """The user named by the bearer token or ``?token=``, or None."""
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    token = (query.get("token") or [""])[0]
+    authorization = (header(scope, "authorization") or "").split()
+    if len(authorization) == 2 and authorization[0] == "Bearer":
+        token = authorization[1]
+    if not token:
+        return None
+    close_old_connections()
+    authentication = CachedJWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(token))
+    except AuthenticationFailed:
+        return None
+
+
+def last_event_id(scope):
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    value = header(scope, "last-event-id") or (query.get("last_event_id") or [""])[0]
+    return int(value) if value.isdigit() else None
+
+
+def missed(user_id, after):
+    """The latest notifications for ``user_id`` newer than id ``after``,
+    oldest first."""
+    close_old_connections()
+    return list(
+        reversed(
+            Notification.objects.filter(recipient_id=user_id, pk__gt=after).order_by(
+                "-pk"
+            )[: replay_limit()]
+        )
+    )
+
+
+def current_badges(user_id):
+    close_old_connections()
+    return badges.get(user_id)
+
+
+def poll(since):
+    """Notifications created and badge counts changed since ``since``:
+    ``(notifications, {user_id: counts})``."""
+    close_old_connections()
+    notifications = list(
+        Notification.objects.filter(created_at__gte=since).order_by("pk")
+    )
+    changed = {
+        str(row.pop("user_id")): {field: max(row[field], 0) for field in badges.FIELDS}
+        for row in BadgeCounter.objects.filter(updated_at__gte=since).values(
+            "user_id", *badges.FIELDS
+        )
+    }
+    return notifications, changed
+
+
+class Stream:
+    """One client's outgoing queue."""
+
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=queue_size())
+        # Resolved once the queue overflows; the stream is then closed.
+        self.overflowed = asyncio.get_running_loop().create_future()
+        # Ids sent that a later poll may return again.
+        self.sent = set()
+        self.badges = None
+        # Notifications from the feed wait here while missed ones are replayed.
+        self.held = []
+
+    def put(self, payload):
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            if not self.overflowed.done():
+                self.overflowed.set_result(None)
+
+    def notify(self, notification):
+        if self.held is not None:
+            self.held.append(notification)
+        elif notification.pk not in self.sent:
+            self.sent.add(notification.pk)
+            self.put(notification_frame(notification))
+
+    def forget_sent(self, window):
+        """Forget sent ids outside ``window``, the ids the last poll returned;
+        older rows have left the poll window and will not come back."""
+        self.sent &= window
+
+    def replayed(self, notifications):
+        """Send the missed notifications, then those held meanwhile."""
+        held, self.held = self.held, None
+        for notification in [*notifications, *held]:
+            self.notify(notification)
+
+    def update_badges(self, counts):
+        if counts != self.badges:
+            self.badges = counts
+            self.put(frame("badges", counts))
+
+
+class Feed:
+    """Polls on behalf of every stream open in this process."""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.streams = defaultdict(set)
+        self.task = None
+        self.starting = asyncio.Lock()
+
+    async def subscribe(self, user_id, stream):
+        """Add ``stream``; once this returns, the feed will deliver every
+        notification committed after it was called."""
+        self.streams[user_id].add(stream)
+        async with self.starting:
+            if self.task is None:
+                self.task = self.loop.create_task(self.run())
+
+    def unsubscribe(self, user_id, stream):
+        streams = self.streams.get(user_id)
+        if streams is not None:
+            streams.discard(stream)
+            if not streams:
+                del self.streams[user_id]
+
+    async def run(self):
+        since = timezone.now() - POLL_LAG
+        last_heartbeat = self.loop.time()
+        try:
+            while self.streams:
+                await asyncio.sleep(poll_interval())
+                started = timezone.now()
+                try:
+                    notifications, changed = await sync_to_async(
+                        poll, thread_sensitive=False
+                    )(since)
+                except Exception:
+                    # Try again next interval, from the same point.
+                    logger.exception("Notification stream poll failed")
+                    continue
+                since = started - POLL_LAG
+                self.publish(notifications, changed)
+                if self.loop.time() - last_heartbeat >= heartbeat_interval():
+                    last_heartbeat = self.loop.time()
+                    for streams in list(self.streams.values()):
+                        for stream in list(streams):
+                            stream.put(HEARTBEAT)
+        finally:
+            self.task = None
+
+    def publish(self, notifications, changed):
+        window = defaultdict(set)
+        for notification in notifications:
+            user_id = str(notification.recipient_id)
+            window[user_id].add(notification.pk)
+            for stream in list(self.streams.get(user_id, ())):
+                stream.notify(notification)
+        for user_id, streams in list(self.streams.items()):
+            for stream in list(streams):
+                stream.forget_sent(window.get(user_id, set()))
+        for user_id, counts in changed.items():
+            for stream in list(self.streams.get(user_id, ())):
+                stream.update_badges(counts)
+
+
+_feeds = weakref.WeakKeyDictionary()
+
+
+def get_feed():
+    """This event loop's feed."""
+    loop = asyncio.get_running_loop()
+    feed = _feeds.get(loop)
+    if feed is None:
+        feed = _feeds[loop] = Feed()
+    return feed
+
+
+async def respond(send, status, body=b"", content_type=b"application/json"):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type)],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def stream_application(scope, receive, send):
+    if scope["method"] != "GET":
+        await respond(send, 405, dumps({"detail": "Method not allowed."}))
+        return
+    user = await sync_to_async(authenticate, thread_sensitive=False)(scope)
+    if user is None:
+        await respond(
+            send,
+            401,
+            dumps({"detail": "Authentication credentials were not provided."}),
+        )
+        return
+
+    user_id = str(user.pk)
+    stream = Stream()
+    feed = get_feed()
+    await feed.subscribe(user_id, stream)
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        stream.put(f"retry: {int(poll_interval() * 1000)}\n\n".encode())
+        stream.update_badges(
+            await sync_to_async(current_badges, thread_sensitive=False)(user.pk)
+        )
+        after = last_event_id(scope)
+        stream.replayed(
+            await sync_to_async(missed, thread_sensitive=False)(user.pk, after)
+            if after is not None
+            else []
+        )
+        while True:
+            getting = asyncio.ensure_future(stream.queue.get())
+            done, _ = await asyncio.wait(
+                {getting, disconnected, stream.overflowed},
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if getting not in done:
+                getting.cancel()
+                break
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": getting.result(),
+                    "more_body": True,
+                }
+            )
+        if not disconnected.done():
+            await send({"type": "http.response.body", "body": b""})
+    finally:
+        feed.unsubscribe(user_id, stream)
+        disconnected.cancel()
+        stream.overflowed.cancel()
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
@@ -1,3 +1,253 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.accounts.models import UserProfile
+from apps.directory.models import AlumniConnection
+from apps.messaging import chat, storage
+from apps.notifications import badges, notify
+from apps.notifications import stream as sse
+from apps.notifications.models import BadgeCounter, Notification, NotificationEvent
+
+User = get_user_model()
+
+
+def make_user(email, **fields):
+    return User.objects.create_user(
+        email=email, password="x", is_active=fields.pop("is_active", True), **fields
+    )
+
+
+def drain(stream):
+    frames = []
+    while not stream.queue.empty():
+        frames.append(stream.queue.get_nowait())
+    return frames
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="reader@example.com", password="x", is_active=True
+        )
+
+    def notify(self):
+        return Notification.objects.create(
+            recipient=self.user, kind="test", frequency="inbox"
+        )
+
+    def test_late_commit_with_lower_id_is_delivered_once(self):
+        early, late = self.notify(), self.notify()
+
+        async def run():
+            feed = sse.Feed()
+            stream = sse.Stream()
+            stream.replayed([])
+            feed.streams[str(self.user.pk)].add(stream)
+            # The higher id is seen first, as if the lower one had not yet
+            # committed; the next poll's window returns both.
+            feed.publish([late], {})
+            feed.publish([early, late], {})
+            feed.publish([early, late], {})
+            return drain(stream)
+
+        frames = asyncio.run(run())
+        self.assertEqual(len(frames), 2)
+        self.assertIn(f"id: {late.pk}".encode(), frames[0])
+        self.assertIn(f"id: {early.pk}".encode(), frames[1])
+
+    def test_sent_ids_are_forgotten_once_out_of_the_window(self):
+        notification = self.notify()
+
+        async def run():
+            feed = sse.Feed()
+            stream = sse.Stream()
+            stream.replayed([])
+            feed.streams[str(self.user.pk)].add(stream)
+            feed.publish([notification], {})
+            feed.publish([], {})
+            return stream.sent
+
+        self.assertEqual(asyncio.run(run()), set())
+
+    def test_streams_reach_the_database_in_parallel(self):
+        # Both streams must be in ``authenticate`` at once to pass the barrier.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def authenticate(scope):
+            barrier.wait()
+            return None
+
+        async def run():
+            sent = [[], []]
+
+            async def connect(messages):
+                async def send(message):
+                    messages.append(message)
+
+                scope = {"method": "GET", "headers": [], "query_string": b""}
+                await sse.stream_application(scope, None, send)
+
+            await asyncio.gather(*(connect(messages) for messages in sent))
+            return [messages[0]["status"] for messages in sent]
+
+        with mock.patch.object(sse, "authenticate", authenticate):
+            self.assertEqual(asyncio.run(run()), [401, 401])
+
+
+class FanOutTests(TestCase):
+    def setUp(self):
+        self.actor = make_user("actor@example.com", first_name="Ada")
+        self.reader = make_user("reader@example.com")
+        self.muted = make_user("muted@example.com")
+        self.inactive = make_user("inactive@example.com", is_active=False)
+        profile = UserProfile.objects.materialize(self.muted)
+        profile.notification_preferences = {"event.registered": "off"}
+        profile.save()
+
+    def test_one_inbox_row_per_recipient_who_wants_it(self):
+        notify.enqueue(
+            "event.registered",
+            [self.actor.pk, self.reader.pk, self.muted.pk, self.inactive.pk],
+            actor_id=self.actor.pk,
+            data={"event_title": "Reunion"},
+            key="event.registered:1",
+        )
+        events, notifications = notify.process_events()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(
+            [(n.recipient_id, n.frequency) for n in notifications],
+            [(str(self.reader.pk), "daily")],
+        )
+        notification = Notification.objects.get()
+        self.assertEqual(
+            notify.render(notification.kind, notification.data),
+            "Ada registered for Reunion.",
+        )
+        self.assertEqual(notify.process_events(), ([], []))
+
+    def test_duplicate_keys_are_queued_once(self):
+        for _ in range(2):
+            notify.enqueue(
+                "connection.requested",
+                [self.reader.pk],
+                actor_id=self.actor.pk,
+                key="connection.requested:1",
+            )
+        self.assertEqual(NotificationEvent.objects.count(), 1)
+
+    def test_unknown_kind_is_refused(self):
+        with self.assertRaises(ValueError):
+            notify.enqueue("event.unknown", [self.reader.pk])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class BadgeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Month tables created by earlier tests were rolled back with them.
+        storage.partitions(refresh=True)
+        self.addCleanup(setattr, storage, "_tables_loaded_at", 0.0)
+        self.alice = make_user("alice@example.com")
+        self.bob = make_user("bob@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.bob)
+
+    def badges(self):
+        counts = badges.get(self.bob.pk)
+        self.assertEqual(counts, badges.recount([self.bob.pk])[self.bob.pk])
+        return counts
+
+    def test_starts_from_a_recount(self):
+        self.assertEqual(
+            self.badges(), {"notifications": 0, "messages": 0, "connections": 0}
+        )
+
+    def test_counter_row_exists_before_counting(self):
+        # Otherwise an adjust() committed while counting updates no row.
+        seen = []
+        recount = badges.recount
+
+        def counting(user_ids):
+            seen.append(BadgeCounter.objects.filter(user_id__in=user_ids).exists())
+            return recount(user_ids)
+
+        with mock.patch.object(badges, "recount", counting):
+            badges.get(self.bob.pk)
+        self.assertEqual(seen, [True])
+
+    def test_notifications(self):
+        self.badges()
+        for n in range(3):
+            notify.enqueue(
+                "connection.requested",
+                [self.bob.pk],
+                actor_id=self.alice.pk,
+                key=f"connection.requested:{n}",
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            notify.process_events()
+        self.assertEqual(self.badges()["notifications"], 3)
+
+        notification = Notification.objects.filter(recipient=self.bob).first()
+        url = f"/api/notifications/{notification.pk}/read/"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url)
+        self.assertEqual(self.badges()["notifications"], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/notifications/read-all/")
+        self.assertEqual(self.client.get("/api/me/badges/").json()["notifications"], 0)
+
+    def test_messages(self):
+        conversation = chat.direct_conversation(self.alice, self.bob)
+        self.badges()
+        with self.captureOnCommitCallbacks(execute=True):
+            chat.post_message(conversation.pk, self.alice.pk, "one")
+            last = chat.post_message(conversation.pk, self.alice.pk, "two")
+            chat.post_message(conversation.pk, self.bob.pk, "reply")
+        self.assertEqual(self.badges()["messages"], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            chat.mark_read(self.bob.pk, conversation.pk, last.pk)
+        self.assertEqual(self.badges()["messages"], 0)
+
+    def test_archived_messages_leave_the_badge(self):
+        conversation = chat.direct_conversation(self.alice, self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            message = chat.post_message(conversation.pk, self.alice.pk, "old")
+        self.assertEqual(self.badges()["messages"], 1)
+
+        later = storage.id_time(message.pk) + datetime.timedelta(days=40)
+        with mock.patch("django.utils.timezone.now", return_value=later):
+            with self.captureOnCommitCallbacks(execute=True):
+                storage.archive_month(storage.month_of_id(message.pk))
+        self.assertEqual(self.badges()["messages"], 0)
+
+    def test_connections(self):
+        self.badges()
+        with self.captureOnCommitCallbacks(execute=True):
+            connection = AlumniConnection.objects.create(
+                requester=self.alice, receiver=self.bob
+            )
+        self.assertEqual(self.badges()["connections"], 1)
+
+        connection.status = "accepted"
+        with self.captureOnCommitCallbacks(execute=True):
+            connection.save()
+        self.assertEqual(self.badges()["connections"], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AlumniConnection.objects.create(
+                requester=make_user("carol@example.com"), receiver=self.bob
+            ).delete()
+        self.assertEqual(self.badges()["connections"], 0)
@@ -0,0 +1,9 @@
+from rest_framework.routers import DefaultRouter
+
+from apps.notifications.views import BadgesViewSet, NotificationViewSet
+
+router = DefaultRouter()
+router.register(r"notifications", NotificationViewSet, basename="notification")
+router.register(r"me/badges", BadgesViewSet, basename="badges")
+
+urlpatterns = router.urls
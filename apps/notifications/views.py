@@ -1,3 +1,74 @@
-from django.shortcuts import render
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import mixins, permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
-# Create your views here.
+from apps.accounts.models import UserProfile
+from apps.notifications import badges
+from apps.notifications.models import Notification
+from apps.notifications.serializers import (
+    NotificationSerializer,
+    PreferencesSerializer,
+)
+from config.pagination import TRUTHY, CreatedAtKeysetPagination
+
+
+class NotificationViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """The user's inbox, newest first. ``?unread=true`` for unread only."""
+
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
+
+    def get_queryset(self):
+        queryset = Notification.objects.filter(recipient=self.request.user)
+        unread = self.request.query_params.get("unread")
+        if unread:
+            queryset = queryset.filter(read_at__isnull=unread.lower() in TRUTHY)
+        return queryset.order_by(*CreatedAtKeysetPagination.ordering)
+
+    @action(detail=True, methods=["post"])
+    def read(self, request, pk=None):
+        notification = self.get_object()
+        if notification.read_at is None:
+            notification.read_at = timezone.now()
+            with transaction.atomic():
+                if Notification.objects.filter(
+                    pk=notification.pk, read_at__isnull=True
+                ).update(read_at=notification.read_at):
+                    badges.adjust([request.user.pk], notifications=-1)
+        return Response(self.get_serializer(notification).data)
+
+    @action(detail=False, methods=["post"], url_path="read-all")
+    def read_all(self, request):
+        with transaction.atomic():
+            marked = Notification.objects.filter(
+                recipient=request.user, read_at__isnull=True
+            ).update(read_at=timezone.now())
+            badges.adjust([request.user.pk], notifications=-marked)
+        return Response({"marked": marked})
+
+    @action(detail=False, methods=["get", "put"])
+    def preferences(self, request):
+        """How the user hears about each kind: ``{kind: frequency}``."""
+        profile = request.user.profile
+        if request.method == "PUT":
+            serializer = PreferencesSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            profile = UserProfile.objects.materialize(request.user)
+            profile.notification_preferences = {
+                **(profile.notification_preferences or {}),
+                **serializer.validated_data,
+            }
+            profile.save(update_fields=["notification_preferences"])
+        return Response(PreferencesSerializer(profile.notification_preferences).data)
+
+
+class BadgesViewSet(viewsets.ViewSet):
+    """Unread notifications, unread messages and pending connection requests."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        return Response(badges.get(request.user.pk))
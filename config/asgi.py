@@ -13,4 +13,17 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.production')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from apps.messaging.sockets import websocket_application  # noqa: E402
+from apps.notifications import stream  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """HTTP goes to Django, bar the notification stream; WebSockets
+    (``/ws/chat/``) to apps.messaging."""
+    if scope["type"] == "websocket":
+        return await websocket_application(scope, receive, send)
+    if scope["type"] == "http" and scope["path"] == stream.PATH:
+        return await stream.stream_application(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,149 @@
+"""
+Response caching for read-only viewset actions.
+
+Cached entries are keyed on the request path and query string, the API
+version, the caller's auth scope, and the current version of every *tag*
+the viewset depends on. Bumping a tag's version, which model signals do via
+``invalidate_on_change``, makes every key built from the old version
+unreachable at once.
+
+Tag versions and cached entries must be seen by every process serving the
+API, so the default cache has to be shared between them: Redis, or a
+file-based cache on a single host. With the per-process locmem backend, an
+invalidation in one process leaves the others serving stale responses and
+ETags, so production settings refuse it (see ``config.settings.production``).
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from config.renderers import dumps
+
+TAG_PREFIX = "rc:tag:"
+KEY_PREFIX = "rc:resp:"
+
+# User columns that nested serializers display.
+USER_DISPLAY_FIELDS = ("first_name", "last_name", "email")
+
+
+def default_timeout():
+    return settings.REST_FRAMEWORK.get("DEFAULT_CACHE_RESPONSE_TIMEOUT", 60 * 15)
+
+
+def tag_versions(tags):
+    keys = [f"{TAG_PREFIX}{tag}" for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # A missing version (never set, or evicted) must not resurrect old
+            # entries, so start from a fresh value.
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [str(versions[key]) for key in keys]
+
+
+def invalidate_tags(*tags):
+    cache.set_many({f"{TAG_PREFIX}{tag}": time.time_ns() for tag in tags}, None)
+
+
+def invalidate_on_change(model, *tags, fields=None):
+    """Drop cached responses tagged ``tags`` whenever ``model`` changes.
+
+    With ``fields``, saves limited by ``update_fields`` to other columns
+    (``last_login`` on every sign-in, say) leave the cache alone.
+    """
+
+    def handler(sender, raw=False, update_fields=None, **kwargs):
+        if raw:
+            return
+        if fields is not None and update_fields and not set(update_fields) & fields:
+            return
+        transaction.on_commit(lambda: invalidate_tags(*tags))
+
+    if fields is not None:
+        fields = set(fields)
+
+    uid = f"response-cache:{model._meta.label}:{','.join(tags)}"
+    post_save.connect(handler, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(handler, sender=model, weak=False, dispatch_uid=uid)
+
+
+def etag_for(data):
+    payload = dumps(data)
+    return f'W/"{hashlib.md5(payload, usedforsecurity=False).hexdigest()}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an ``If-None-Match`` header (a comma-separated list of
+    entity tags, or ``*``) matches ``etag``. ``If-None-Match`` compares
+    tags weakly: ``W/"x"`` and ``"x"`` match."""
+    tags = parse_etags(if_none_match)
+    if tags == ["*"]:
+        return True
+    return opaque_tag(etag) in {opaque_tag(tag) for tag in tags}
+
+
+def opaque_tag(etag):
+    return etag.removeprefix("W/")
+
+
+class CacheResponseMixin:
+    """Cache ``list`` and ``retrieve`` responses of a viewset.
+
+    ``cache_scope`` is ``"user"`` when responses depend on who is asking, or
+    ``"public"`` when they only differ between anonymous and signed-in
+    callers.
+    """
+
+    cache_tags = ()
+    cache_scope = "user"
+    cache_timeout = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            etag = etag_for(response.data)
+            timeout = self.cache_timeout or default_timeout()
+            cache.set(key, (response.data, etag), timeout)
+        else:
+            data, etag = entry
+            response = Response(data)
+
+        if etag_matches(request.headers.get("If-None-Match", ""), etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response["ETag"] = etag
+        response["Vary"] = "Accept, Authorization, Cookie"
+        return response
+
+    def get_response_cache_key(self, request):
+        user = request.user
+        if not user.is_authenticated:
+            scope = "anon"
+        elif self.cache_scope == "public":
+            scope = "auth"
+        else:
+            scope = str(user.pk)
+        query = sorted(request.query_params.lists())
+        request_hash = hashlib.md5(
+            f"{request.path}?{query}".encode(), usedforsecurity=False
+        ).hexdigest()
+        versions = ".".join(tag_versions(self.cache_tags))
+        return f"{KEY_PREFIX}{request.version}:{scope}:{request_hash}:{versions}"
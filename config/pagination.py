@@ -0,0 +1,222 @@
+"""
+Pagination classes shared by the API.
+
+``StandardPagination`` is the project default: classic page numbers, plus an
+opt-in ``?skip_count=true`` that drops the ``COUNT(*)`` query. Viewsets over
+large tables use a ``KeysetPagination`` subclass, which additionally serves
+``?cursor=`` requests by seeking on the model's ordering instead of using
+``OFFSET``.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+import uuid
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+TRUTHY = {"1", "true", "yes", "on"}
+
+
+class StandardPagination(pagination.PageNumberPagination):
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    skip_count_query_param = "skip_count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.countless = (
+            request.query_params.get(self.skip_count_query_param, "").lower() in TRUTHY
+        )
+        if not self.countless:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        try:
+            page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            page_number = 0
+        if page_number < 1:
+            raise NotFound(
+                self.invalid_page_message.format(page_number=page_number, message="")
+            )
+
+        self.request = request
+        self.page_number = page_number
+        offset = (page_number - 1) * page_size
+        # One extra row tells us whether a next page exists without counting.
+        rows = list(queryset[offset : offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if not self.countless:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "next": (
+                    self.get_countless_link(self.page_number + 1)
+                    if self.has_next
+                    else None
+                ),
+                "previous": (
+                    self.get_countless_link(self.page_number - 1)
+                    if self.page_number > 1
+                    else None
+                ),
+                "results": data,
+            }
+        )
+
+    def get_countless_link(self, page_number):
+        url = self.request.build_absolute_uri()
+        if page_number == 1:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, page_number)
+
+
+class KeysetPagination(StandardPagination):
+    """Seek pagination keyed on ``ordering``.
+
+    Requests carrying ``?cursor=`` (empty for the first page) walk the table
+    with ``WHERE (keys) > (last row keys) ORDER BY keys LIMIT n``, so every
+    page costs the same regardless of depth and no count is issued. Requests
+    without it fall back to page numbers. ``ordering`` must end in a unique
+    column and name non-nullable fields only.
+    """
+
+    ordering = ("-pk",)
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(
+            request.query_params[self.cursor_query_param], queryset.model
+        )
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position))
+
+        rows = list(queryset[: page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_position = (
+            [self.get_value(rows[-1], field.lstrip("-")) for field in self.ordering]
+            if self.has_next
+            else None
+        )
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({"next": self.get_next_cursor_link(), "results": data})
+
+    def get_next_cursor_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def seek_filter(self, position):
+        """Build ``(a, b, c) > (x, y, z)`` honouring per-field direction."""
+        clauses = []
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            equal = {
+                previous.lstrip("-"): value
+                for previous, value in zip(self.ordering[:index], position)
+            }
+            clauses.append(Q(**equal, **{f"{name}__{lookup}": position[index]}))
+        return reduce(or_, clauses)
+
+    @staticmethod
+    def get_value(instance, path):
+        if isinstance(instance, dict):
+            # A ``QuerySet.values()`` row, which must include the ordering.
+            return instance[path]
+        for attr in path.split("__"):
+            instance = getattr(instance, attr)
+        return instance
+
+    def encode_cursor(self, position):
+        payload = json.dumps(position, default=_json_default, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor, model):
+        """The position in ``cursor``, each value converted to the type of
+        its ordering field on ``model``. Cursors come from clients, so
+        anything malformed is a 404 rather than a database error."""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded))
+        except (binascii.Error, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                self.clean_value(ordering_field(model, field.lstrip("-")), value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (FieldDoesNotExist, ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def clean_value(field, value):
+        if isinstance(value, (list, dict)) or value is None:
+            raise ValueError("Cursor values are non-null scalars.")
+        value = field.to_python(value)
+        if isinstance(value, datetime.datetime) and timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+
+
+class CreatedAtKeysetPagination(KeysetPagination):
+    ordering = ("-created_at", "-pk")
+
+
+def ordering_field(model, path):
+    """The model field ``path`` (``pk``, ``user__first_name``...) names."""
+    field = None
+    for name in path.split("__"):
+        if field is not None:
+            model = field.related_model
+        field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+    if field.is_relation:
+        field = field.target_field
+    return field
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor.")
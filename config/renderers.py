@@ -0,0 +1,80 @@
+"""
+JSON rendering with orjson.
+
+``ORJSONRenderer`` is a drop-in for DRF's ``JSONRenderer``. Aware datetimes
+are rendered in the active time zone (``Asia/Kathmandu``), as DRF's
+``DateTimeField`` does. Decimals follow ``COERCE_DECIMAL_TO_STRING``, and
+anything orjson cannot encode natively falls back to DRF's ``JSONEncoder``.
+``StreamingORJSONRenderer`` writes a JSON array incrementally so that large
+lists never have to be held in memory as one document.
+"""
+
+import datetime
+from decimal import Decimal
+
+import orjson
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_fallback = JSONEncoder()
+
+
+def default(value):
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        representation = value.isoformat()
+        if representation.endswith("+00:00"):
+            representation = representation[:-6] + "Z"
+        return representation
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value) if api_settings.COERCE_DECIMAL_TO_STRING else float(value)
+    return _fallback.default(value)
+
+
+def dumps(data, indent=False):
+    return orjson.dumps(
+        data, default=default, option=OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+    )
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        return dumps(
+            data, indent=bool(self.get_indent(accepted_media_type, renderer_context))
+        )
+
+
+class StreamingORJSONRenderer(ORJSONRenderer):
+    """Render an iterable of items as a JSON array, ``chunk_size`` at a time."""
+
+    chunk_size = 500
+
+    def iter_render(self, items):
+        yield b"["
+        separator = b""
+        chunk = []
+        for item in items:
+            chunk.append(dumps(item))
+            if len(chunk) >= self.chunk_size:
+                yield separator + b",".join(chunk)
+                separator = b","
+                chunk = []
+        if chunk:
+            yield separator + b",".join(chunk)
+        yield b"]"
+
+    def response(self, items):
+        return StreamingHttpResponse(
+            self.iter_render(items), content_type=self.media_type
+        )
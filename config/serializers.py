@@ -0,0 +1,180 @@
+"""
+Read-path serialization helpers.
+
+``?fields=a,b`` narrows a response to the named top-level fields. Model
+serializers honour it through ``FieldsProjectionMixin``. List endpoints over
+large tables can instead use a ``RowSerializer``: it maps ``QuerySet.values()``
+rows to plain dicts through a fixed table of lookups, without building DRF
+fields per row. ``ProjectedListMixin`` wires either one into a viewset and
+narrows the query (``.values()`` for rows, ``.only()`` for instances) to the
+requested columns. ``?stream=true`` returns the rows unpaginated, as a
+streamed JSON array, to callers passing ``stream_permission_classes`` and
+up to ``stream_max_rows`` of them.
+"""
+
+from rest_framework import permissions, serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from config.pagination import TRUTHY
+from config.renderers import StreamingORJSONRenderer
+
+FIELDS_QUERY_PARAM = "fields"
+STREAM_QUERY_PARAM = "stream"
+
+
+def requested_fields(request):
+    """Names from ``?fields=`` on reads, or None when there is no projection."""
+    if request is None or request.method != "GET":
+        return None
+    if FIELDS_QUERY_PARAM not in request.query_params:
+        return None
+    value = request.query_params[FIELDS_QUERY_PARAM]
+    return [name for name in (part.strip() for part in value.split(",")) if name]
+
+
+def file_url(field, name, request):
+    """A stored file's URL, as ``serializers.FileField`` shows it."""
+    if not name:
+        return None
+    url = field.storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+class FieldsProjectionMixin:
+    """Drop serializer fields not named in ``?fields=``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        names = requested_fields(self.context.get("request"))
+        if names is None:
+            return
+        unknown = set(names) - set(self.fields)
+        if unknown:
+            raise ValidationError(
+                {FIELDS_QUERY_PARAM: f"Unknown fields: {', '.join(sorted(unknown))}."}
+            )
+        for name in set(self.fields) - set(names):
+            self.fields.pop(name)
+
+
+class RowSerializer(serializers.BaseSerializer):
+    """Read-only serializer for ``QuerySet.values()`` rows.
+
+    ``fields`` maps output names to ORM lookups, or to a nested mapping of
+    the same shape, which is emitted as a nested object. ``default_fields``
+    is the projection used when ``?fields=`` is absent. ``private_fields``
+    are only served to authenticated callers.
+    """
+
+    fields = {}
+    default_fields = None
+    private_fields = ()
+
+    @classmethod
+    def projection(cls, request):
+        names = requested_fields(request)
+        user = getattr(request, "user", None)
+        hidden = () if user and user.is_authenticated else cls.private_fields
+        if names is None:
+            return [
+                name for name in cls.default_fields or cls.fields if name not in hidden
+            ]
+        unknown = set(names) - (set(cls.fields) - set(hidden))
+        if unknown:
+            raise ValidationError(
+                {FIELDS_QUERY_PARAM: f"Unknown fields: {', '.join(sorted(unknown))}."}
+            )
+        return names
+
+    @classmethod
+    def lookups(cls, names):
+        return list(_lookups({name: cls.fields[name] for name in names}))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        names = self.projection(self.context.get("request"))
+        self.layout = {name: self.fields[name] for name in names}
+
+    def to_representation(self, row):
+        return _build(self.layout, row)
+
+
+def _lookups(layout):
+    for value in layout.values():
+        if isinstance(value, dict):
+            yield from _lookups(value)
+        else:
+            yield value
+
+
+def _build(layout, row):
+    return {
+        name: _build(value, row) if isinstance(value, dict) else row[value]
+        for name, value in layout.items()
+    }
+
+
+class ProjectedListMixin:
+    """Serve ``list`` from ``row_serializer_class`` and project ``retrieve``.
+
+    ``list`` selects only the looked-up columns, plus whatever the paginator
+    orders on. ``retrieve`` with ``?fields=`` loads just the requested
+    concrete columns with ``.only()``.
+    """
+
+    row_serializer_class = None
+    stream_chunk_size = 2000
+    stream_permission_classes = [permissions.IsAuthenticated]
+    stream_max_rows = 100_000
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.row_serializer_class
+        names = serializer_class.projection(request)
+        columns = serializer_class.lookups(names)
+        ordering = getattr(self.paginator, "ordering", ())
+        columns += [field.lstrip("-") for field in ordering]
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values(*dict.fromkeys(columns))
+        context = self.get_serializer_context()
+        if request.query_params.get(STREAM_QUERY_PARAM, "").lower() in TRUTHY:
+            for permission in self.stream_permission_classes:
+                if not permission().has_permission(request, self):
+                    self.permission_denied(
+                        request, message="You may not stream this list."
+                    )
+            serializer = serializer_class(context=context)
+            return StreamingORJSONRenderer().response(
+                serializer.to_representation(row)
+                for row in rows[: self.stream_max_rows].iterator(
+                    chunk_size=self.stream_chunk_size
+                )
+            )
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            serializer = serializer_class(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
+        serializer = serializer_class(rows, many=True, context=context)
+        return Response(serializer.data)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        names = requested_fields(self.request)
+        if self.action != "retrieve" or names is None:
+            return queryset
+        model_fields = {
+            field.name: field
+            for field in queryset.model._meta.get_fields()
+            if field.concrete
+        }
+        if not set(names) <= set(model_fields):
+            # A reverse relation or computed field was asked for; keep the full query.
+            return queryset
+        columns = [name for name in names if not model_fields[name].many_to_many]
+        queryset = queryset.select_related(None)
+        relations = [name for name in columns if model_fields[name].is_relation]
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset.only(queryset.model._meta.pk.name, *columns)
@@ -7,6 +7,7 @@ from .rest_framework import REST_FRAMEWORK, SIMPLE_JWT, SPECTACULAR_SETTINGS
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 SECRET_KEY = config("SECRET_KEY", default="unsafe-secret-key")
+SIMPLE_JWT["SIGNING_KEY"] = SIMPLE_JWT["SIGNING_KEY"] or SECRET_KEY
 
 DEBUG = config("DEBUG", cast=bool, default=False)
 
@@ -87,6 +88,28 @@ DATABASES = {
     }
 }
 
+# Cache: Redis when REDIS_URL is set, otherwise CACHE_BACKEND (per-process
+# memory by default, or e.g. django.core.cache.backends.filebased.FileBasedCache
+# with CACHE_LOCATION pointing at a directory).
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": config(
+                "CACHE_BACKEND",
+                default="django.core.cache.backends.locmem.LocMemCache",
+            ),
+            "LOCATION": config("CACHE_LOCATION", default="alumniverse"),
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -163,3 +186,63 @@ if not DEBUG:
     SECURE_HSTS_SECONDS = 31536000  # 1 year
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_PRELOAD = True
+
+# Directory search
+# The full-text backend is picked from the database vendor (FTS5 on SQLite,
+# tsvector on PostgreSQL); set a dotted path here to override it.
+DIRECTORY_SEARCH_BACKEND = config("DIRECTORY_SEARCH_BACKEND", default=None)
+
+# Seconds before a worker's in-memory connection graph is rebuilt from the
+# database to pick up edges written by other processes.
+DIRECTORY_GRAPH_MAX_AGE = config("DIRECTORY_GRAPH_MAX_AGE", cast=int, default=300)
+
+# Seconds before a worker's in-memory job matching indexes (postings and
+# users by skill) are rebuilt from the database.
+JOBS_MATCHING_MAX_AGE = config("JOBS_MATCHING_MAX_AGE", cast=int, default=300)
+
+# Job posting views are buffered per process and written every
+# JOBS_VIEW_FLUSH_INTERVAL seconds; one viewer counts once per posting per
+# JOBS_VIEW_DEDUPE_WINDOW seconds.
+JOBS_VIEW_FLUSH_INTERVAL = config("JOBS_VIEW_FLUSH_INTERVAL", cast=int, default=30)
+JOBS_VIEW_DEDUPE_WINDOW = config("JOBS_VIEW_DEDUPE_WINDOW", cast=int, default=30 * 60)
+
+# Resume and attachment uploads. Resumable upload sessions keep their partial
+# files in JOBS_UPLOAD_SESSION_DIR (which all web processes must share) and
+# expire after JOBS_UPLOAD_SESSION_TTL seconds.
+JOBS_UPLOAD_MAX_SIZE = config("JOBS_UPLOAD_MAX_SIZE", cast=int, default=10 * 1024 * 1024)
+JOBS_UPLOAD_SESSION_DIR = config(
+    "JOBS_UPLOAD_SESSION_DIR", default=str(BASE_DIR / "upload-sessions")
+)
+JOBS_UPLOAD_SESSION_TTL = 60 * 60 * 24
+JOBS_DOCUMENT_TEXT_LIMIT = 200_000  # characters kept per document
+# Uncompressed bytes of a .docx/.odt text member read before giving up.
+JOBS_DOCUMENT_XML_LIMIT = 20 * 1024 * 1024
+
+# Chat (/ws/chat/). MESSAGING_BUS fans events out to sockets; the in-process
+# bus only reaches sockets served by the same process. A socket that falls
+# MESSAGING_SEND_QUEUE_SIZE events behind is disconnected.
+MESSAGING_BUS = config("MESSAGING_BUS", default="apps.messaging.bus.InProcessBus")
+MESSAGING_SEND_QUEUE_SIZE = 256
+MESSAGING_MAX_MESSAGE_LENGTH = 4000  # characters
+
+# Notifications are written by the process_notifications worker. Email (sent
+# immediately or as hourly/daily digests, per user preference) stays off until
+# an email backend is configured.
+NOTIFICATIONS_EMAIL_ENABLED = config(
+    "NOTIFICATIONS_EMAIL_ENABLED", cast=bool, default=False
+)
+
+# Live notifications and badge counts (/api/notifications/stream/, served by
+# config.asgi). Each process polls once per interval for all of its streams.
+NOTIFICATIONS_STREAM_POLL_INTERVAL = 2  # seconds
+NOTIFICATIONS_STREAM_HEARTBEAT = 15  # seconds
+NOTIFICATIONS_STREAM_QUEUE_SIZE = 100  # events
+NOTIFICATIONS_STREAM_REPLAY = 100  # missed notifications sent on reconnect
+
+# Login: identifiers that matched no user are remembered in the shared cache
+# so that repeated attempts skip the database (the password hasher still runs).
+AUTH_NEGATIVE_CACHE_TTL = 60  # seconds
+
+# JWT authentication caches User columns per user id in the shared cache,
+# invalidated on User saves and deletes.
+AUTH_USER_CACHE_TTL = 60 * 15  # seconds
@@ -1,3 +1,24 @@
+from decouple import config
+from django.core.exceptions import ImproperlyConfigured
+
 from .base import *
 
 DEBUG = False
+
+# The response cache (config.cache) needs a cache shared by every process;
+# set CACHE_PROCESS_LOCAL=true only when a single process serves the API.
+LOCAL_CACHE = "django.core.cache.backends.locmem.LocMemCache"
+if CACHES["default"]["BACKEND"] == LOCAL_CACHE and not config(
+    "CACHE_PROCESS_LOCAL", cast=bool, default=False
+):
+    raise ImproperlyConfigured(
+        "Set REDIS_URL, or CACHE_BACKEND to a cache shared between processes."
+    )
+
+# JSON only; set BROWSABLE_API=true to keep the HTML API browser.
+if not config("BROWSABLE_API", cast=bool, default=False):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = [
+        renderer
+        for renderer in REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"]
+        if renderer != "rest_framework.renderers.BrowsableAPIRenderer"
+    ]
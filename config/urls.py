@@ -51,6 +51,10 @@ urlpatterns = [
     # API Apps
     path("api/accounts/", include("apps.accounts.urls")),
     path("api/directory/", include("apps.directory.urls")),
+    path("api/", include("apps.events.urls")),
+    path("api/", include("apps.jobs.urls")),
+    path("api/messaging/", include("apps.messaging.urls")),
+    path("api/", include("apps.notifications.urls")),
 ]
 
 